@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks do Project Launcher
+
+Mede a partida a frio, o carregamento de configurações sintéticas, a
+abertura de níveis da árvore de opções (precisa de display: no Linux sem
+interface o script inicia um Xvfb, se estiver instalado) e a execução de
+ponta a ponta com comandos falsos no lugar de npm/pip/wsl. Os resultados são
+gravados em JSON; com --baseline o script compara com uma execução anterior
+(feita com as mesmas opções) e sai com código 1 se algo piorou ou se alguma
+métrica do baseline não foi medida desta vez.
+
+Uso:
+    python benchmark.py [--output resultado.json] [--baseline anterior.json]
+                        [--tolerance 0.25] [--quick]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from launcher.config import load_config, split_config, validate_config
+from launcher.palette import OptionIndex
+
+LAUNCHER = os.path.join(ROOT, "project_launcher.py")
+
+# Diferença mínima (segundos) para contar como regressão, evita ruído em medidas curtas
+MIN_REGRESSION = 0.005
+
+
+def median_time(func, repeat):
+    """Mediana do tempo de `repeat` execuções de `func`"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def synthetic_config(total_options, width=50, project_path="."):
+    """Configuração com `total_options` opções executáveis em grupos de `width`"""
+    options = {}
+    for group in range(max(1, total_options // width)):
+        leaves = {}
+        for leaf in range(min(width, total_options - group * width)):
+            leaves[f"Serviço {group}-{leaf}"] = {
+                "type": "execute",
+                "actions": [
+                    {"type": "open_cursor", "path": f"svc-{leaf}"},
+                    {"type": "run_command", "command": "npm install", "path": f"svc-{leaf}"}
+                ]
+            }
+        options[f"Grupo {group}"] = {"type": "options", "options": leaves}
+    return {"Benchmark": {"path": project_path, "options": options}}
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def bench_cold_start(workdir, repeat):
+    """Partida a frio do modo linha de comando e importação da interface"""
+    config = os.path.join(workdir, "config.json")
+    write_json(config, synthetic_config(10, project_path=workdir))
+    
+    def cli_list():
+        subprocess.run([sys.executable, LAUNCHER, "--config", config, "list"],
+                       check=True, stdout=subprocess.DEVNULL)
+    
+    def gui_import():
+        subprocess.run([sys.executable, "-c", "import project_launcher"],
+                       check=True, cwd=ROOT, stdout=subprocess.DEVNULL)
+    
+    return {
+        "cold_start.cli_list": median_time(cli_list, repeat),
+        "cold_start.gui_import": median_time(gui_import, repeat),
+    }
+
+
+def bench_load_config(workdir, sizes, repeat):
+    """Leitura, validação e indexação de configurações de vários tamanhos"""
+    results = {}
+    for size in sizes:
+        path = os.path.join(workdir, f"config_{size}.json")
+        write_json(path, synthetic_config(size, project_path=workdir))
+        
+        def load():
+            config = load_config(path)
+            validate_config(config)
+            projects, _ = split_config(config)
+            OptionIndex(projects)
+        
+        results[f"load_config.{size}"] = median_time(load, repeat)
+    return results
+
+
+def start_virtual_display():
+    """Inicia um Xvfb quando não há display no Linux (retorna o processo ou None)"""
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY") or not shutil.which("Xvfb"):
+        return None
+    
+    # O próprio Xvfb escolhe um display livre e escreve o número no pipe
+    read_fd, write_fd = os.pipe()
+    process = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-nolisten", "tcp",
+                                "-screen", "0", "1280x1024x24"],
+                               pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        display = pipe.readline().strip()
+    if not display:
+        process.wait()
+        return None
+    os.environ["DISPLAY"] = f":{display}"
+    print(f"✓ Xvfb iniciado no display :{display}")
+    return process
+
+
+def bench_tree_open(workdir, widths, repeat):
+    """Abertura de níveis largos na árvore de opções (precisa de display)"""
+    try:
+        import tkinter as tk
+        tk.Tk().destroy()
+    except Exception as e:
+        print(f"⚠️ tree_open ignorado (sem display): {e}")
+        return {}
+    
+    from project_launcher import ProjectLauncher
+    
+    results = {}
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        write_json("config.json", synthetic_config(10, project_path=workdir))
+        app = ProjectLauncher()
+        for width in widths:
+            app.projects = synthetic_config(width, width=width, project_path=workdir)
+            
+            def render():
+                app.options_tree.delete(*app.options_tree.get_children())
+                app.tree_loaded = {}
+                app.sync_tree()
+                app.expand_option("Benchmark/Grupo 0")
+                app.root.update_idletasks()
+            
+            results[f"tree_open.{width}"] = median_time(render, repeat)
+        app.on_close()
+    finally:
+        os.chdir(previous_dir)
+    return results
+
+
+def make_stub_commands(bin_dir):
+    """Cria npm/pip/wsl falsos que terminam na hora"""
+    os.makedirs(bin_dir, exist_ok=True)
+    for name in ("npm", "pip", "wsl"):
+        if sys.platform == "win32":
+            with open(os.path.join(bin_dir, f"{name}.cmd"), 'w') as f:
+                f.write("@exit /b 0\n")
+        else:
+            path = os.path.join(bin_dir, name)
+            with open(path, 'w') as f:
+                f.write("#!/bin/sh\nexit 0\n")
+            os.chmod(path, 0o755)
+
+
+def bench_run_actions(workdir, repeat):
+    """Execução de ponta a ponta (linha de comando) com comandos falsos"""
+    bin_dir = os.path.join(workdir, "bin")
+    make_stub_commands(bin_dir)
+    for service in ("front", "back", "api"):
+        os.makedirs(os.path.join(workdir, service), exist_ok=True)
+    
+    def option(mode, parallel):
+        actions = []
+        for service in ("front", "back", "api"):
+            command = "pip install -r requirements.txt" if service == "api" else "npm install"
+            action = {"type": "run_command", "command": command, "path": service, "mode": mode}
+            if parallel:
+                action["depends_on"] = []
+            actions.append(action)
+        actions.append({"type": "run_wsl", "commands": ["wsl --version"], "path": "api", "mode": mode})
+        return {"type": "execute", "actions": actions}
+    
+    config = {
+        # Sem login: o /etc/profile reescreve o PATH e esconderia os comandos falsos
+        "_settings": {"session_shell": ["bash", "-s"]},
+        "Benchmark": {"path": workdir, "options": {
+            "Sequencial": option("managed", False),
+            "Paralelo": option("managed", True),
+            "Sessao": option("session", False),
+        }},
+    }
+    config_path = os.path.join(workdir, "config_run.json")
+    write_json(config_path, config)
+    
+    env = dict(os.environ)
+    env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+    env["XDG_CACHE_HOME"] = os.path.join(workdir, "cache")
+    
+    results = {}
+    for name in ("Sequencial", "Paralelo", "Sessao"):
+        def run():
+            subprocess.run([sys.executable, LAUNCHER, "--config", config_path, "run",
+                            f"Benchmark/{name}", "--json"],
+                           check=True, env=env, stdout=subprocess.DEVNULL)
+        results[f"run_actions.{name.lower()}"] = median_time(run, repeat)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Lista as métricas que pioraram mais que `tolerance` em relação ao baseline"""
+    regressions = []
+    for name, previous in baseline.get("results", {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current > previous * (1 + tolerance) and current - previous > MIN_REGRESSION:
+            regressions.append((name, previous, current))
+    return regressions
+
+
+def missing_metrics(results, baseline):
+    """Métricas do baseline que esta execução não mediu (ex.: sem display)"""
+    return [name for name in baseline.get("results", {}) if name not in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Project Launcher")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="Arquivo JSON de saída (padrão: benchmark_results.json)")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Piora relativa aceita antes de falhar (padrão: 0.25 = 25%%)")
+    parser.add_argument("--quick", action="store_true",
+                        help="Menos repetições e configurações menores")
+    args = parser.parse_args()
+    
+    print("=== Benchmarks do Project Launcher ===\n")
+    repeat = 3 if args.quick else 7
+    sizes = [10, 100, 1000, 10000] if args.quick else [10, 100, 1000, 10000, 50000]
+    widths = [100, 1000] if args.quick else [100, 1000, 10000]
+    
+    workdir = tempfile.mkdtemp(prefix="launcher-bench-")
+    display = start_virtual_display()
+    results = {}
+    try:
+        for label, bench in (
+            ("Partida a frio", lambda: bench_cold_start(workdir, repeat)),
+            ("Carregamento de configurações", lambda: bench_load_config(workdir, sizes, repeat)),
+            ("Renderização de opções", lambda: bench_tree_open(workdir, widths, repeat)),
+            ("Execução de ações", lambda: bench_run_actions(workdir, repeat)),
+        ):
+            print(f"{label}...")
+            measured = bench()
+            for name, seconds in measured.items():
+                print(f"  {name:<32} {seconds * 1000:10.2f} ms")
+            results.update(measured)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if display is not None:
+            display.terminate()
+            display.wait()
+    
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    write_json(args.output, report)
+    print(f"\n✓ Resultados gravados em: {args.output}")
+    
+    if not args.baseline:
+        return True
+    
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    missing = missing_metrics(results, baseline)
+    if not regressions and not missing:
+        print(f"✓ Nenhuma regressão em relação a {args.baseline}")
+        return True
+    
+    if regressions:
+        print(f"✗ Regressões em relação a {args.baseline}:")
+        for name, previous, current in regressions:
+            print(f"  {name}: {previous * 1000:.2f} ms → {current * 1000:.2f} ms "
+                  f"(+{(current / previous - 1) * 100:.0f}%)")
+    if missing:
+        # Uma métrica que não rodou não pode passar como "sem regressão"
+        print(f"✗ Métricas de {args.baseline} que não foram medidas (sem display? opções diferentes?):")
+        for name in missing:
+            print(f"  {name}")
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
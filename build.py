@@ -4,24 +4,25 @@
 Script para build do executável
 """
 
+import argparse
 import os
 import sys
 import subprocess
 import shutil
 from pathlib import Path
 
+from build_common import (DEFAULT_MODE, add_clean_argument, add_mode_argument, build_key,
+                          built_executable, cached_build, clean_work_dir, pyinstaller_available,
+                          pyinstaller_command, report_metrics, save_build)
+
 def install_requirements():
     """Instala as dependências necessárias"""
     print("Instalando dependências...")
     try:
-        # Verificar se PyInstaller já está instalado
-        try:
-            subprocess.check_call([sys.executable, "-c", "import pyinstaller"], 
-                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Verificar se PyInstaller já está instalado (sem abrir outro processo)
+        if pyinstaller_available():
             print("✓ PyInstaller já está instalado")
             return True
-        except subprocess.CalledProcessError:
-            pass
         
         # Instalar PyInstaller
         print("Instalando PyInstaller...")
@@ -35,65 +36,53 @@ def install_requirements():
         print(f"✗ Erro inesperado: {e}")
         return False
 
-def build_executable():
-    """Constrói o executável"""
-    print("Construindo executável...")
+def build_executable(mode=DEFAULT_MODE, clean=False):
+    """Constrói o executável
     
-    # Comando PyInstaller
-    cmd = [
-        sys.executable, "-m", "PyInstaller",
-        "--onefile",  # Arquivo único
-        "--windowed",  # Sem console (GUI)
-        "--name=ProjectLauncher",  # Nome do executável
-        "--add-data=config.json;.",  # Incluir arquivo de config
-        "project_launcher.py"
-    ]
+    Retorna o comando do PyInstaller que gerou o executável (o principal ou o
+    do método alternativo), ou None se nenhum funcionou.
+    """
+    print(f"Construindo executável ({mode})...")
     
-    # Adicionar ícone se existir
-    if os.path.exists("icon.ico"):
-        cmd.insert(-1, "--icon=icon.ico")
+    # Comando PyInstaller
+    cmd = pyinstaller_command(mode, clean=clean)
     
     try:
         print(f"Executando: {' '.join(cmd)}")
         subprocess.check_call(cmd)
         print("✓ Executável criado com sucesso!")
-        return True
+        return cmd
     except subprocess.CalledProcessError as e:
         print(f"✗ Erro ao criar executável: {e}")
         print("Tentando método alternativo...")
-        return build_executable_alternative()
+        return build_executable_alternative(mode)
     except Exception as e:
         print(f"✗ Erro inesperado: {e}")
-        return False
+        return None
 
-def build_executable_alternative():
-    """Método alternativo para construir executável"""
+def build_executable_alternative(mode=DEFAULT_MODE):
+    """Método alternativo para construir executável (retorna o comando ou None)"""
     print("Tentando método alternativo...")
     
     try:
         # Comando mais simples
-        cmd = [
-            sys.executable, "-m", "PyInstaller",
-            "--onefile",
-            "--name=ProjectLauncher",
-            "project_launcher.py"
-        ]
+        cmd = pyinstaller_command(mode, windowed=False, add_config=False)
         
         print(f"Executando: {' '.join(cmd)}")
         subprocess.check_call(cmd)
         print("✓ Executável criado com sucesso (método alternativo)!")
-        return True
+        return cmd
     except Exception as e:
         print(f"✗ Erro no método alternativo: {e}")
-        return False
+        return None
 
-def cleanup():
+def cleanup(mode=DEFAULT_MODE):
     """Limpa arquivos temporários"""
     print("Limpando arquivos temporários...")
     
-    # Diretórios e arquivos para remover (NÃO remover dist!)
+    # Diretórios e arquivos para remover (NÃO remover dist nem build, que
+    # guarda a análise do PyInstaller para o próximo build)
     cleanup_items = [
-        "build",
         "ProjectLauncher.spec",
         "__pycache__"
     ]
@@ -107,13 +96,19 @@ def cleanup():
             print(f"✓ Removido: {item}")
     
     # Verificar se o executável foi criado
-    if os.path.exists("dist/ProjectLauncher.exe"):
-        print("✓ Executável mantido em: dist/ProjectLauncher.exe")
+    executable = built_executable(mode)
+    if os.path.exists(executable):
+        print(f"✓ Executável mantido em: {executable}")
     else:
         print("⚠️ Executável não encontrado em dist/")
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Build do Project Launcher")
+    add_mode_argument(parser)
+    add_clean_argument(parser)
+    args = parser.parse_args()
+    
     print("=== Build do Project Launcher ===\n")
     
     # Verificar se o arquivo principal existe
@@ -125,21 +120,44 @@ def main():
     if not install_requirements():
         return False
     
+    if args.clean:
+        clean_work_dir()
+    
+    # Nada mudou desde o último build: não há o que fazer
+    executable = built_executable(args.mode)
+    key = build_key(pyinstaller_command(args.mode))
+    if not args.clean and cached_build(key):
+        print(f"✓ Nada mudou desde o último build: {executable}")
+        print("  (use --clean para reconstruir do zero)")
+        return True
+    
     # Construir executável
-    if not build_executable():
+    built_with = build_executable(args.mode, args.clean)
+    if built_with is None:
         return False
     
     # Limpar arquivos temporários
-    cleanup()
+    cleanup(args.mode)
+    
+    # Medir partida e tamanho, comparando com o build anterior
+    if os.path.exists(executable):
+        # O carimbo é do comando que rodou de fato: depois do método
+        # alternativo, o próximo build tenta o principal de novo
+        save_build(build_key(built_with), executable)
+        report_metrics(args.mode, executable,
+                       os.path.dirname(executable) if args.mode == "onedir" else executable)
     
     print("\n=== Build Concluído ===")
-    print("✓ Executável criado em: dist/ProjectLauncher.exe")
+    print(f"✓ Executável criado em: {executable}")
     print("✓ Arquivo de configuração: config.json")
     print("\nPara usar:")
-    print("1. Copie o ProjectLauncher.exe para onde desejar")
-    print("2. Copie o config.json para o mesmo diretório")
+    if args.mode == "onedir":
+        print(f"1. Copie a pasta {os.path.dirname(executable)} inteira para onde desejar")
+    else:
+        print(f"1. Copie o {os.path.basename(executable)} para onde desejar")
+    print("2. Copie o config.json para o mesmo diretório do executável")
     print("3. Edite o config.json com seus projetos")
-    print("4. Execute o ProjectLauncher.exe")
+    print(f"4. Execute o {os.path.basename(executable)}")
     
     return True
 
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Funções compartilhadas por build.py e build_simple.py
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+APP_NAME = "ProjectLauncher"
+
+# onedir não desempacota nada na partida (bem mais rápido que onefile)
+MODES = ("onedir", "onefile")
+DEFAULT_MODE = "onedir"
+
+# Módulos que o launcher não usa: ficam fora do pacote
+EXCLUDED_MODULES = [
+    # Biblioteca padrão
+    "unittest", "doctest", "pydoc", "pydoc_data", "pdb", "test", "lib2to3",
+    "distutils", "setuptools", "pip", "xmlrpc", "curses", "dbm",
+    "multiprocessing", "lzma", "bz2",
+    # Partes do Tk que a interface não usa
+    "tkinter.test", "tkinter.tix", "tkinter.dnd", "turtle", "turtledemo", "idlelib",
+]
+
+# Métricas de cada build, para comparar com o anterior
+METRICS_FILE = "build_metrics.json"
+MAX_METRICS = 20
+
+# Execuções para medir a partida (mediana)
+STARTUP_RUNS = 5
+
+# Pasta de trabalho do PyInstaller, mantida entre builds para reaproveitar a análise
+WORK_DIR = "build"
+STAMP_FILE = os.path.join(WORK_DIR, "launcher_build.json")
+
+# Entradas do build: se nenhuma mudar, o build anterior continua valendo
+SOURCE_FILES = ["project_launcher.py", "build_common.py", "config.json", "icon.ico"]
+SOURCE_DIRS = ["launcher"]
+
+
+def add_mode_argument(parser):
+    parser.add_argument("--mode", choices=MODES, default=DEFAULT_MODE,
+                        help=f"Formato do pacote (padrão: {DEFAULT_MODE}, partida mais rápida)")
+
+
+def executable_name():
+    return APP_NAME + (".exe" if sys.platform == "win32" else "")
+
+
+def pyinstaller_available():
+    """Verifica o PyInstaller sem abrir outro processo"""
+    import importlib.util
+    return importlib.util.find_spec("PyInstaller") is not None
+
+
+def pyinstaller_version():
+    from importlib import metadata
+    try:
+        return metadata.version("pyinstaller")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def pyinstaller_command(mode, windowed=True, add_config=True, clean=False):
+    """Monta o comando do PyInstaller para o modo escolhido"""
+    cmd = [
+        sys.executable, "-m", "PyInstaller",
+        f"--{mode}",
+        f"--name={APP_NAME}",
+        f"--workpath={WORK_DIR}",
+        "--noconfirm",
+    ]
+    if clean:
+        cmd.append("--clean")  # Descarta também o cache do próprio PyInstaller
+    if windowed:
+        cmd.append("--windowed")  # Sem console (GUI)
+    for module in EXCLUDED_MODULES:
+        cmd.append(f"--exclude-module={module}")
+    
+    # Incluir arquivo de config se existir
+    if add_config and os.path.exists("config.json"):
+        cmd.append(f"--add-data=config.json{os.pathsep}.")
+    
+    # Adicionar ícone se existir
+    if os.path.exists("icon.ico"):
+        cmd.append("--icon=icon.ico")
+    
+    cmd.append("project_launcher.py")
+    return cmd
+
+
+def source_files():
+    """Arquivos que entram no build, em ordem estável"""
+    files = [path for path in SOURCE_FILES if os.path.isfile(path)]
+    for directory in SOURCE_DIRS:
+        for folder, dirs, names in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            files.extend(os.path.join(folder, name) for name in sorted(names)
+                         if name.endswith(".py"))
+    return files
+
+
+def build_key(cmd):
+    """Hash das fontes, do config.json, do Python, do PyInstaller e do comando"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "python": sys.version,
+        "pyinstaller": pyinstaller_version(),
+        "command": [arg for arg in cmd if arg != "--clean"],
+    }, sort_keys=True).encode("utf-8"))
+    for path in source_files():
+        digest.update(path.replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def cached_build(key):
+    """Retorna o resultado do último build se as entradas não mudaram (senão None)"""
+    try:
+        with open(STAMP_FILE, 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return None
+    output = stamp.get("output")
+    if stamp.get("key") == key and output and os.path.exists(output):
+        return output
+    return None
+
+
+def save_build(key, output):
+    """Registra as entradas e o resultado do build que acabou de terminar"""
+    os.makedirs(WORK_DIR, exist_ok=True)
+    with open(STAMP_FILE, 'w', encoding='utf-8') as f:
+        json.dump({"key": key, "output": output,
+                   "timestamp": datetime.now().isoformat(timespec="seconds")}, f, indent=2)
+
+
+def clean_work_dir():
+    """Apaga a pasta de trabalho (build do zero)"""
+    if os.path.exists(WORK_DIR):
+        shutil.rmtree(WORK_DIR)
+        print(f"✓ Removido: {WORK_DIR}")
+
+
+def add_clean_argument(parser):
+    parser.add_argument("--clean", action="store_true",
+                        help="Descarta o cache de build e reconstrói do zero")
+
+
+def built_executable(mode, dist="dist"):
+    """Caminho do executável gerado pelo PyInstaller"""
+    if mode == "onedir":
+        return os.path.join(dist, APP_NAME, executable_name())
+    return os.path.join(dist, executable_name())
+
+
+def bundle_size(path):
+    """Tamanho em bytes de um arquivo ou de uma pasta inteira"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(folder, name))
+    return total
+
+
+def measure_startup(executable, runs=STARTUP_RUNS):
+    """Mediana do tempo de partida do executável (modo linha de comando, sem janela)"""
+    with tempfile.TemporaryDirectory(prefix="launcher-build-") as workdir:
+        config = os.path.join(workdir, "config.json")
+        with open(config, 'w', encoding='utf-8') as f:
+            json.dump({"Build": {"path": workdir, "options": {}}}, f)
+        
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([os.path.abspath(executable), "--config", config, "list"],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           cwd=workdir, timeout=120)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def format_size(size):
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def format_change(current, previous):
+    if not previous:
+        return ""
+    return f" ({(current / previous - 1) * 100:+.0f}%)"
+
+
+def report_metrics(mode, executable, bundle):
+    """Mede partida e tamanho do build e compara com o build anterior"""
+    print("\nMedindo o build...")
+    metrics = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "mode": mode,
+        "size": bundle_size(bundle),
+    }
+    try:
+        metrics["startup"] = measure_startup(executable)
+    except Exception as e:
+        print(f"⚠️ Não foi possível medir a partida: {e}")
+    
+    history = []
+    if os.path.exists(METRICS_FILE):
+        try:
+            with open(METRICS_FILE, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+    previous = history[-1] if history else None
+    
+    print(f"✓ Tamanho do pacote ({mode}): {format_size(metrics['size'])}"
+          + format_change(metrics["size"], previous and previous.get("size")))
+    if "startup" in metrics:
+        print(f"✓ Tempo de partida: {metrics['startup'] * 1000:.0f} ms"
+              + format_change(metrics["startup"], previous and previous.get("startup")))
+    if previous:
+        startup = previous.get("startup")
+        print(f"  Build anterior ({previous.get('mode')}, {previous.get('timestamp')}): "
+              f"{format_size(previous.get('size', 0))}"
+              + (f", {startup * 1000:.0f} ms" if startup else ""))
+    
+    history.append(metrics)
+    with open(METRICS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history[-MAX_METRICS:], f, indent=2)
+    return metrics
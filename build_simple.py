@@ -4,12 +4,17 @@
 Script simples para build do executável
 """
 
+import argparse
 import os
 import sys
 import subprocess
 import shutil
 from datetime import datetime
 
+from build_common import (DEFAULT_MODE, APP_NAME, add_clean_argument, add_mode_argument,
+                          build_key, built_executable, cached_build, clean_work_dir,
+                          pyinstaller_command, report_metrics, save_build)
+
 def cleanup_temp_files():
     """Limpa apenas arquivos temporários, mantém a pasta dist"""
     print("Limpando arquivos temporários...")
@@ -31,44 +36,48 @@ def cleanup_temp_files():
     
     print("✓ Pasta dist/ mantida com o executável")
 
-def move_and_rename_executable():
-    """Move o executável para a raiz e renomeia com a data atual"""
+def move_and_rename_executable(mode=DEFAULT_MODE):
+    """Move o executável (ou a pasta, no modo onedir) para a raiz com a data atual"""
     print("Movendo e renomeando executável...")
     
     try:
-        # Obter data atual no formato dd/mm/yyyy
+        # Obter data atual (dd-mm-yyyy; "/" não pode aparecer em nomes de arquivo)
         now = datetime.now()
-        date_str = now.strftime("%d/%m/%Y")
+        date_str = now.strftime("%d-%m-%Y")
         
         # Nome do arquivo final
-        new_name = f"Iniciador de Projetos - {date_str}.exe"
+        new_name = f"Iniciador de Projetos - {date_str}"
         
-        # Caminhos
-        source = "dist/ProjectLauncher.exe"
-        destination = new_name
+        if mode == "onedir":
+            # A pasta inteira vai junto: o executável depende dos arquivos ao lado
+            source = os.path.join("dist", APP_NAME)
+            destination = new_name
+            if os.path.exists(destination):
+                shutil.rmtree(destination)
+        else:
+            source = built_executable(mode)
+            destination = new_name + os.path.splitext(source)[1]
         
         # Mover arquivo
         shutil.move(source, destination)
-        print(f"✓ Executável movido para: {new_name}")
+        print(f"✓ Executável movido para: {destination}")
         
-        # Copiar config.json para a raiz se existir
-        if os.path.exists("config.json"):
-            shutil.copy2("config.json", "config.json")
-            print("✓ config.json mantido na raiz")
-        
-        return True
+        return destination
         
     except Exception as e:
         print(f"✗ Erro ao mover executável: {e}")
-        return False
+        return None
 
 def cleanup_all_files():
-    """Limpa todos os arquivos temporários e a pasta dist"""
+    """Limpa os arquivos temporários e a pasta dist
+    
+    A pasta build fica: ela guarda a análise do PyInstaller e deixa o
+    próximo build incremental (use --clean para apagá-la).
+    """
     print("Limpando arquivos temporários...")
     
     # Arquivos e pastas para remover
     cleanup_items = [
-        "build",
         "dist",
         "ProjectLauncher.spec",
         "__pycache__"
@@ -88,6 +97,11 @@ def cleanup_all_files():
     print("✓ Limpeza concluída")
 
 def main():
+    parser = argparse.ArgumentParser(description="Build simples do Project Launcher")
+    add_mode_argument(parser)
+    add_clean_argument(parser)
+    args = parser.parse_args()
+    
     print("=== Build Simples do Project Launcher ===\n")
     
     # Verificar se o arquivo principal existe
@@ -109,38 +123,44 @@ def main():
             print(f"✗ Erro ao instalar PyInstaller: {e}")
             return False
     
-    # Construir executável
-    print("\nConstruindo executável...")
-    
-    # Comando básico
-    cmd = [
-        sys.executable, "-m", "PyInstaller",
-        "--onefile",
-        "--windowed",
-        "--name=ProjectLauncher",
-        "project_launcher.py"
-    ]
+    if args.clean:
+        clean_work_dir()
     
-    # Adicionar arquivo de config se existir
-    if os.path.exists("config.json"):
-        cmd.insert(-1, "--add-data=config.json;.")
+    # Nada mudou desde o último build: o resultado anterior continua valendo
+    cmd = pyinstaller_command(args.mode, clean=args.clean)
+    key = build_key(cmd)
+    previous = None if args.clean else cached_build(key)
+    if previous:
+        print(f"\n✓ Nada mudou desde o último build: {previous}")
+        print("  (use --clean para reconstruir do zero)")
+        return True
     
-    # Adicionar ícone se existir
-    if os.path.exists("icon.ico"):
-        cmd.insert(-1, "--icon=icon.ico")
+    # Construir executável
+    print(f"\nConstruindo executável ({args.mode})...")
+    executable = built_executable(args.mode)
     
     try:
         print(f"Executando: {' '.join(cmd)}")
         subprocess.check_call(cmd)
         print("\n✓ Executável criado com sucesso!")
-        print("✓ Localização: dist/ProjectLauncher.exe")
+        print(f"✓ Localização: {executable}")
         
         # Verificar se foi criado
-        if os.path.exists("dist/ProjectLauncher.exe"):
+        if os.path.exists(executable):
             print("✓ Arquivo executável encontrado!")
             
             # Mover e renomear executável para a raiz
-            move_and_rename_executable()
+            destination = move_and_rename_executable(args.mode)
+            if destination is None:
+                return False
+            save_build(key, destination)
+            
+            # Medir partida e tamanho, comparando com o build anterior
+            if args.mode == "onedir":
+                report_metrics(args.mode, os.path.join(destination, os.path.basename(executable)),
+                               destination)
+            else:
+                report_metrics(args.mode, destination, destination)
             
             # Limpar arquivos temporários e pasta dist
             cleanup_all_files()
@@ -150,7 +170,10 @@ def main():
             print("✓ Pasta dist/ removida")
             print("✓ Arquivos temporários limpos")
             print("\nPara usar:")
-            print("1. Execute o arquivo 'Iniciador de Projetos - [data].exe'")
+            if args.mode == "onedir":
+                print(f"1. Execute o {os.path.basename(executable)} dentro da pasta '{destination}'")
+            else:
+                print(f"1. Execute o arquivo '{destination}'")
             print("2. Edite config.json conforme necessário")
             
             return True
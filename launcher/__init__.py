@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+Núcleo do Launcher de Projetos (sem dependência de interface gráfica)
+"""
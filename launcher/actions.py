@@ -0,0 +1,704 @@
+# -*- coding: utf-8 -*-
+"""
+Ações executáveis (abrir editores, ferramentas, terminais e comandos)
+
+Todas as funções recebem um callback opcional `status` que recebe mensagens
+de andamento (na interface gráfica é o `status_var.set`).
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from launcher import probes
+from launcher.executor import ConcurrencyLimit, DEFAULT_MAX_HEAVY
+from launcher.monitor import ResourceMonitor, DEFAULT_INTERVAL, monitor_limits
+from launcher.packages import package_config, package_env, shell_exports
+from launcher.paths import cache_dir
+from launcher.processes import ProcessManager, DEFAULT_GRACE, stop_trees
+from launcher.sessions import SessionManager, DEFAULT_IDLE_TIMEOUT, session_argv
+from launcher.stamps import StampCache
+from launcher.store import ServiceStore
+from launcher.tmux import TmuxTarget, TmuxError, SHELL_COMMAND, session_name
+from launcher.tools import ToolRegistry, EDITORS, TERMINALS
+
+# Modos de execução de run_command/run_wsl
+MODE_TERMINAL = "terminal"  # Nova janela de terminal (padrão)
+MODE_MANAGED = "managed"    # Processo gerenciado com saída no launcher
+MODE_SESSION = "session"    # Sessão de shell persistente do projeto (espera terminar)
+MODE_TMUX = "tmux"          # Janela na sessão tmux do projeto (um terminal só, sob demanda)
+MODES = (MODE_TERMINAL, MODE_MANAGED, MODE_SESSION, MODE_TMUX)
+
+# Ações que esperam um serviço ficar pronto
+PROBE_TYPES = ("wait_port", "wait_http", "wait_file", "wait_output")
+
+# Retornado por ActionRunner.run quando a ação foi pulada pelo cache
+SKIPPED = "skipped"
+
+# Ação pesada em terminal/tmux: a vaga volta quando o comando cria o marcador
+# de término (ou o shell dele morre); sem os dois (janela fechada no Windows)
+# volta depois deste prazo
+DONE_POLL = 0.5
+HEAVY_DONE_TIMEOUT = 3600
+
+
+def _ignore_status(message):
+    pass
+
+
+def resolve_path(project_path, sub_path=""):
+    """Monta o caminho completo de uma ação"""
+    return os.path.join(project_path, sub_path) if sub_path else project_path
+
+
+def probe_target(action):
+    """O que uma sonda de prontidão está esperando, para mensagens"""
+    action_type = action.get("type")
+    if action_type == "wait_port":
+        return f"porta {action.get('host', 'localhost')}:{action.get('port')}"
+    if action_type == "wait_http":
+        return f"{action.get('url')}"
+    if action_type == "wait_file":
+        return f"arquivo {action.get('path')}"
+    return f"saída de '{action.get('service')}'"
+
+
+def describe_action(action):
+    """Descrição curta de uma ação para status e logs"""
+    action_type = action.get("type")
+    if action_type == "open_cursor":
+        return f"Abrindo projeto: {action.get('path', '')}"
+    if action_type == "open_postman":
+        return "Abrindo Postman..."
+    if action_type == "open_dbeaver":
+        return "Abrindo DBeaver..."
+    if action_type == "open_tool":
+        return f"Abrindo {action.get('tool', '')}..."
+    if action_type == "open_terminal":
+        return f"Abrindo terminal em: {action.get('path', '')}"
+    if action_type == "run_command":
+        return f"Executando: {action.get('command', '')}"
+    if action_type == "run_wsl":
+        return f"Executando no WSL: {action.get('commands', '')}"
+    if action_type == "wait":
+        return f"Aguardando {action.get('seconds', 1)} segundos..."
+    if action_type in PROBE_TYPES:
+        return f"Aguardando {probe_target(action)}..."
+    return f"Ação desconhecida: {action_type}"
+
+
+def action_mode(project, action):
+    """Modo de execução de uma ação (da ação, do projeto ou o padrão)"""
+    mode = action.get("mode") or project.get("mode") or MODE_TERMINAL
+    if mode not in MODES:
+        raise ValueError(f"Modo de execução inválido: {mode}")
+    return mode
+
+
+def is_heavy(action):
+    """Se a ação disputa CPU/disco e deve passar pelo limite global
+    
+    Por padrão, run_command/run_wsl com "cache_inputs" (instalações); "heavy"
+    na ação força um lado ou outro (ex.: builds).
+    """
+    if action.get("type") not in ("run_command", "run_wsl"):
+        return False
+    if "heavy" in action:
+        return bool(action["heavy"])
+    return bool(action.get("cache_inputs"))
+
+
+def done_script(command, done):
+    """Script POSIX que cria o marcador `done` quando `command` termina
+    
+    Com qualquer resultado. O PID do shell vai para "<done>.pid": se a janela
+    for fechada no meio, o shell morre sem criar o marcador.
+    """
+    return f"echo $$ > {shlex.quote(done + '.pid')}; {command}; touch {shlex.quote(done)}"
+
+
+def command_finished(done):
+    """O comando com marcador `done` terminou (ou o shell dele morreu)?"""
+    if os.path.exists(done):
+        return True
+    try:
+        with open(done + ".pid") as file:
+            pid = int(file.read())
+    except (OSError, ValueError):
+        return False  # Ainda não começou (ou sem PID: Windows)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass
+    return False
+
+
+def wsl_command_string(wsl_commands):
+    """Junta a lista de comandos do WSL em uma única linha"""
+    if isinstance(wsl_commands, list):
+        # Se for lista de comandos, juntar com && para executar sequencialmente
+        return " && ".join(wsl_commands)
+    return wsl_commands
+
+
+def project_label(project):
+    """Nome curto do projeto (pasta), usado no consumo por projeto"""
+    return os.path.basename(project["path"].rstrip("/\\"))
+
+
+def service_name(project, action):
+    """Nome do serviço (aba de log) de uma ação gerenciada"""
+    if action.get("name"):
+        return action["name"]
+    command = action.get("command") or wsl_command_string(action.get("commands", ""))
+    location = action.get("path") or os.path.basename(project["path"].rstrip("/\\"))
+    return f"{location}: {command}"
+
+
+class ActionRunner:
+    """Executa ações de projetos compartilhando os processos gerenciados"""
+    
+    def __init__(self, processes=None, status=None, stamps=None, tools=None, sessions=None):
+        self.processes = processes or ProcessManager(store=ServiceStore())
+        self.status = status or _ignore_status
+        self.stamps = stamps or StampCache()
+        self.tools = tools or default_tools()
+        self.sessions = sessions or SessionManager()
+        self.session_shell = None
+        self.tmux = TmuxTarget(self.tools)
+        # Vagas para ações pesadas, compartilhadas por todas as opções em execução
+        self.heavy = ConcurrencyLimit()
+        # Caminhos já abertos no editor nesta sessão (o plano não reabre)
+        self.opened_editors = set()
+        # CPU/memória dos serviços e sessões (começa no primeiro serviço)
+        self.monitor = ResourceMonitor(self.monitored)
+        self.monitor_defaults = {}
+        # "_settings.cache": padrões dos caches de pacotes compartilhados
+        self.cache_settings = {}
+    
+    def configure(self, settings):
+        """Aplica os ajustes globais ("_settings" do config.json)"""
+        self.tools.configure(settings.get("tools"))
+        idle_timeout = settings.get("session_idle_timeout")
+        # Carregado sem validar (primeira leitura do config): valor inválido fica no padrão
+        valid = type(idle_timeout) in (int, float) and idle_timeout > 0
+        self.sessions.idle_timeout = idle_timeout if valid else DEFAULT_IDLE_TIMEOUT
+        self.session_shell = settings.get("session_shell")
+        self.heavy.limit = settings.get("max_heavy_actions") or DEFAULT_MAX_HEAVY
+        self.monitor_defaults = settings.get("monitor") or {}
+        self.monitor.interval = self.monitor_defaults.get("interval", DEFAULT_INTERVAL)
+        self.cache_settings = settings.get("cache") or {}
+    
+    def monitored(self):
+        """Serviços gerenciados e sessões em execução (para o monitor)"""
+        return self.processes.running() + [session for session in self.sessions.all() if session.running]
+    
+    def stop_all(self, grace=DEFAULT_GRACE):
+        """Encerra serviços gerenciados e sessões, todos ao mesmo tempo"""
+        targets = self.processes.running() + [session for session in self.sessions.all() if session.running]
+        stop_trees([target.pid for target in targets], grace)
+    
+    def services_of(self, target):
+        """Serviços gerenciados em execução de uma opção, grupo ou projeto
+        
+        `target` é um caminho como "Projeto", "Projeto/Grupo" ou
+        "Projeto/Grupo/Opção"; vale tudo que foi iniciado por ele ou abaixo dele.
+        """
+        target = target.strip("/")
+        prefix = target + "/"
+        return [process for process in self.processes.running()
+                if process.option and (process.option == target or process.option.startswith(prefix))]
+    
+    def stop(self, target, project=None, grace=DEFAULT_GRACE):
+        """Encerra o que uma opção ou projeto iniciou, em paralelo
+        
+        Com `project` (dados do projeto no config) também entram a sessão de
+        shell e a sessão tmux do projeto. Retorna os nomes encerrados.
+        """
+        targets = self.services_of(target)
+        if project is not None:
+            names = (target.strip("/"), os.path.normcase(os.path.abspath(project["path"])))
+            targets += [session for session in self.sessions.all()
+                        if session.running and session.project in names]
+        stop_trees([item.pid for item in targets], grace)
+        stopped = [item.name for item in targets]
+        
+        if project is not None:
+            session = session_name(project["path"])
+            try:
+                if self.tmux.has_session(session):
+                    self.tmux.kill(session)
+                    stopped.append(f"tmux: {session}")
+            except TmuxError:
+                pass  # Sem tmux instalado não há sessão para encerrar
+        return stopped
+    
+    def run(self, project, action, status=None, force=False, option=None):
+        """Executa uma única ação de `project` (dados do projeto no config)
+        
+        Retorna SKIPPED se a ação foi pulada pelo cache de carimbos, o
+        ManagedProcess se iniciou um serviço gerenciado, ou None. `force`
+        ignora o cache; `option` ("Projeto/Opção") fica anotado nos serviços
+        iniciados, para "parar opção/projeto".
+        """
+        status = status or self.status
+        project_path = project["path"]
+        action_type = action.get("type")
+        
+        # Atualizar status com ação atual
+        status(describe_action(action))
+        if action_type == "open_cursor":
+            open_cursor(project_path, action.get("path", ""), status, self.tools)
+            self.opened_editors.add(os.path.normpath(resolve_path(project_path, action.get("path", ""))))
+        elif action_type == "open_postman":
+            open_postman(status, self.tools)
+        elif action_type == "open_dbeaver":
+            open_dbeaver(status, self.tools)
+        elif action_type == "open_tool":
+            args = list(action.get("args", []))
+            if action.get("path") is not None:
+                args.append(resolve_path(project_path, action["path"]))
+            open_tool(action.get("tool", ""), args, project_path if os.path.isdir(project_path) else None,
+                      status, self.tools)
+        elif action_type == "open_terminal":
+            if action_mode(project, action) == MODE_TMUX:
+                self.open_tmux_shell(project, action, status)
+            else:
+                open_terminal(project_path, action.get("path", ""), status, self.tools)
+        elif action_type in ("run_command", "run_wsl"):
+            return self.run_process_action(project, action, status, force, option)
+        elif action_type == "wait":
+            time.sleep(action.get("seconds", 1))
+        elif action_type in PROBE_TYPES:
+            self.run_probe(project, action)
+            status(f"Pronto: {probe_target(action)}")
+    
+    def run_probe(self, project, action):
+        """Executa uma sonda de prontidão (wait_port/wait_http/wait_file/wait_output)"""
+        action_type = action.get("type")
+        timing = {
+            "timeout": action.get("timeout", probes.DEFAULT_TIMEOUT),
+            "interval": action.get("interval", probes.DEFAULT_INTERVAL),
+        }
+        
+        if action_type == "wait_port":
+            probes.wait_port(action.get("host", "localhost"), int(action["port"]), **timing)
+        elif action_type == "wait_http":
+            probes.wait_http(action["url"], int(action.get("status", 200)), **timing)
+        elif action_type == "wait_file":
+            probes.wait_file(resolve_path(project["path"], action["path"]), **timing)
+        elif action_type == "wait_output":
+            process = self.processes.get(action["service"])
+            if process is None:
+                raise Exception(f"Serviço gerenciado não encontrado: {action['service']}")
+            probes.wait_output(process, action["pattern"], **timing)
+    
+    def run_process_action(self, project, action, status, force=False, option=None):
+        """Executa run_command/run_wsl, pulando se o carimbo ainda vale"""
+        project_path = project["path"]
+        full_path = resolve_path(project_path, action.get("path", ""))
+        
+        stamp = None
+        if action.get("cache_inputs") and os.path.exists(full_path):
+            if not force and self.stamps.is_fresh(project_path, full_path, action):
+                status(f"Sem mudanças, pulando: {service_name(project, action)}")
+                return SKIPPED
+            stamp = self.stamps.prepare(project_path, full_path, action)
+        
+        heavy = is_heavy(action)
+        if heavy and not self.heavy.try_acquire():
+            status(f"Aguardando vaga ({self.heavy.limit} ações pesadas ao mesmo tempo): "
+                   f"{service_name(project, action)}")
+            self.heavy.acquire()
+        
+        # Terminal e tmux não esperam o comando: ele avisa o fim por um marcador
+        done = None
+        if heavy and action_mode(project, action) in (MODE_TERMINAL, MODE_TMUX):
+            done = os.path.join(cache_dir("running"), uuid.uuid4().hex)
+        
+        result = None
+        started = False
+        try:
+            result = self._start_process_action(project, action, status, stamp, option, done)
+            started = True
+            return result
+        finally:
+            if heavy:
+                if hasattr(result, "add_exit_callback"):
+                    # Serviço gerenciado: a vaga só é liberada quando ele termina
+                    result.add_exit_callback(lambda process, code: self.heavy.release())
+                elif done and started:
+                    self._release_when_done(done)
+                else:
+                    self.heavy.release()
+    
+    def _release_when_done(self, done):
+        """Libera a vaga pesada quando o marcador de término aparecer"""
+        def watch():
+            deadline = time.monotonic() + HEAVY_DONE_TIMEOUT
+            while not command_finished(done) and time.monotonic() < deadline:
+                time.sleep(DONE_POLL)
+            for path in (done, done + ".pid"):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.heavy.release()
+        threading.Thread(target=watch, name="heavy-done", daemon=True).start()
+    
+    def _start_process_action(self, project, action, status, stamp=None, option=None, done=None):
+        project_path = project["path"]
+        mode = action_mode(project, action)
+        if mode == MODE_SESSION:
+            self.run_in_session(project, action, status, stamp, option)
+            return None
+        if mode == MODE_TMUX:
+            self.run_in_tmux(project, action, status, stamp, done)
+            return None
+        
+        managed = mode == MODE_MANAGED
+        if action.get("type") == "run_command":
+            if managed:
+                return self.start_managed_command(project, action, status, stamp, option)
+            else:
+                run_command(project_path, action.get("path", ""), action.get("command", ""),
+                            status, stamp, self.tools, env=self.cache_env(project, action), done=done)
+        else:
+            if managed:
+                return self.start_managed_wsl(project, action, status, stamp, option)
+            else:
+                run_wsl_command(project_path, action.get("path", ""), action.get("commands", ""),
+                                status, stamp, self.tools, env=self.cache_env(project, action), done=done)
+    
+    def run_in_session(self, project, action, status, stamp=None, option=None):
+        """Executa o comando na sessão de shell do projeto e espera terminar"""
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        
+        # A sessão é do projeto do config: duas pastas "app" em lugares
+        # diferentes não podem dividir o mesmo bash (ambiente, fila e prazo)
+        if option:
+            project_name = option.split("/", 1)[0]
+        else:
+            project_name = os.path.normcase(os.path.abspath(project["path"]))
+        if action.get("type") == "run_wsl":
+            command = wsl_command_string(action.get("commands", ""))
+        else:
+            command = action.get("command", "")
+        
+        wsl = action.get("type") == "run_wsl" and sys.platform == "win32"
+        if wsl:
+            name = f"sessão WSL: {project_name}"
+            argv = session_argv((self.tools.resolve("wsl") or ["wsl"])[0], self.session_shell)
+        else:
+            name = f"sessão: {project_name}"
+            argv = session_argv(shell=self.session_shell)
+        
+        session = self.sessions.get(name, argv, project["path"], wsl=wsl)
+        session.project = project_name
+        self.monitor.start()
+        status(f"Executando na {name}: {command}")
+        code = session.run(command, full_path, timeout=action.get("timeout"),
+                           env=self.cache_env(project, action))
+        if code != 0:
+            raise Exception(f"Comando falhou (código {code}): {command}")
+        
+        if stamp:
+            self.stamps.mark(stamp)
+        status(f"Concluído na {name}: {command}")
+    
+    def run_in_tmux(self, project, action, status, stamp=None, done=None):
+        """Executa o comando em uma janela da sessão tmux do projeto (sem esperar)
+        
+        Com `done`, o comando cria esse marcador ao terminar.
+        """
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        
+        if action.get("type") == "run_wsl":
+            command = wsl_command_string(action.get("commands", ""))
+        else:
+            command = action.get("command", "")
+        script = f"{command} && touch {shlex.quote(stamp)}" if stamp else command
+        if done:
+            script = done_script(script, done)
+        
+        session = session_name(project["path"])
+        self.tmux.run(session, service_name(project, action), script, full_path,
+                      env=self.cache_env(project, action))
+        status(f"Executando no tmux ({session}): {command}")
+    
+    def open_tmux_shell(self, project, action, status):
+        """Abre (ou reaproveita) uma janela de shell na sessão tmux e anexa"""
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        
+        session = session_name(project["path"])
+        window = self.tmux.run(session, f"shell: {action.get('path') or '.'}", SHELL_COMMAND,
+                               full_path, restart=False)
+        self.attach_tmux(project, window, status)
+    
+    def attach_tmux(self, project, window=None, status=None):
+        """Mostra a sessão tmux do projeto
+        
+        Só abre um terminal se nenhum estiver anexado à sessão; se já houver
+        um, basta trocar para a janela pedida.
+        """
+        status = status or self.status
+        session = session_name(project["path"])
+        if not self.tmux.has_session(session):
+            raise Exception(f"A sessão tmux '{session}' ainda não existe (nenhum comando rodou nela)")
+        if window:
+            self.tmux.select(window)
+        if self.tmux.attached(session):
+            status(f"Sessão tmux '{session}' já está aberta em um terminal")
+            return
+        
+        attach = self.tmux.attach_command(session)
+        if sys.platform == "darwin":
+            script = attach.replace("\\", "\\\\").replace('"', '\\"')
+            subprocess.Popen(["osascript", "-e", f'tell application "Terminal" to do script "{script}"'])
+        elif sys.platform == "win32":
+            raise Exception("O modo tmux não está disponível no Windows")
+        else:
+            subprocess.Popen(linux_terminal_argv(f"exec {attach}", self.tools))
+        status(f"Anexando à sessão tmux '{session}'...")
+    
+    def wsl_argv(self, command):
+        """argv que roda `command` no bash do WSL (no Linux/macOS, no bash local)"""
+        if sys.platform == "win32":
+            return (self.tools.resolve("wsl") or ["wsl"]) + ["-d", "Ubuntu", "-e", "bash", "-c", command]
+        return ["bash", "-c", command]
+    
+    def cache_env(self, project, action):
+        """Variáveis dos caches de pacotes compartilhados ({} se o projeto não usa)
+        
+        No run_wsl do Windows os caminhos são de dentro da distro.
+        """
+        config = package_config(project, self.cache_settings)
+        if config is None or action.get("cache") is False:
+            return {}
+        return package_env(config, wsl=action.get("type") == "run_wsl" and sys.platform == "win32")
+    
+    def process_args(self, project, action):
+        """(args, shell, env) que o modo gerenciado usaria para run_command/run_wsl
+        
+        `env` é None quando o processo herda o ambiente do launcher; no
+        run_wsl as variáveis dos caches vão no próprio comando do bash.
+        """
+        variables = self.cache_env(project, action)
+        if action.get("type") == "run_wsl":
+            command = shell_exports(variables) + wsl_command_string(action.get("commands", ""))
+            return self.wsl_argv(command), False, None
+        return action.get("command", ""), True, dict(os.environ, **variables) if variables else None
+    
+    def _stamp_on_success(self, stamp):
+        """Callback de término que grava o carimbo se o processo deu certo"""
+        if stamp is None:
+            return None
+        
+        def on_exit(process, returncode):
+            if returncode == 0:
+                self.stamps.mark(stamp)
+        return on_exit
+    
+    def start_managed_command(self, project, action, status, stamp=None, option=None):
+        """Inicia run_command como processo gerenciado"""
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        
+        args, shell, env = self.process_args(project, action)
+        process = self.processes.start(
+            service_name(project, action), args, full_path,
+            shell=shell, env=env, max_lines=action.get("log_lines"),
+            on_exit=self._stamp_on_success(stamp),
+            project=option.split("/", 1)[0] if option else project_label(project),
+            limits=monitor_limits(self.monitor_defaults, action),
+            option=option, ports=action.get("ports")
+        )
+        self.monitor.start()
+        status(f"Serviço iniciado: {process.name} (PID {process.pid})")
+        return process
+    
+    def start_managed_wsl(self, project, action, status, stamp=None, option=None):
+        """Inicia run_wsl como processo gerenciado"""
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if not os.path.exists(full_path):
+            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        
+        args, _, _ = self.process_args(project, action)
+        process = self.processes.start(
+            service_name(project, action), args, full_path,
+            max_lines=action.get("log_lines"),
+            on_exit=self._stamp_on_success(stamp),
+            project=option.split("/", 1)[0] if option else project_label(project),
+            limits=monitor_limits(self.monitor_defaults, action),
+            option=option, ports=action.get("ports")
+        )
+        self.monitor.start()
+        status(f"Serviço iniciado: {process.name} (PID {process.pid})")
+        return process
+
+
+def open_cursor(project_path, sub_path="", status=None, tools=None):
+    """Abre o projeto no Cursor (ou no VS Code, se o Cursor não estiver instalado)"""
+    status = status or _ignore_status
+    tools = tools or default_tools()
+    full_path = resolve_path(project_path, sub_path)
+    
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+    
+    name, argv = tools.first(EDITORS)
+    if argv is None:
+        raise Exception(f"Não foi possível abrir o editor (Cursor/VS Code não encontrados). Caminho: {full_path}")
+    
+    subprocess.Popen(argv + [full_path])
+    status(f"Abrindo {full_path} no {'Cursor' if name == 'cursor' else 'VS Code'}...")
+
+
+def open_tool(name, args=(), cwd=None, status=None, tools=None, label=None):
+    """Abre uma ferramenta do registro"""
+    status = status or _ignore_status
+    tools = tools or default_tools()
+    label = label or name
+    status(f"Abrindo {label}...")
+    
+    try:
+        tools.open(name, args, cwd)
+    except Exception as e:
+        raise Exception(f"Não foi possível abrir o {label}: {str(e)}")
+    status(f"{label} aberto com sucesso!")
+
+
+def open_postman(status=None, tools=None):
+    """Abre o Postman"""
+    open_tool("postman", status=status, tools=tools, label="Postman")
+
+
+def open_dbeaver(status=None, tools=None):
+    """Abre o DBeaver"""
+    open_tool("dbeaver", status=status, tools=tools, label="DBeaver")
+
+
+def linux_terminal_argv(script, tools=None):
+    """Comando para abrir um emulador de terminal rodando `script` no bash"""
+    tools = tools or default_tools()
+    name, argv = tools.first(TERMINALS)
+    if argv is None:
+        raise Exception("Nenhum emulador de terminal encontrado (gnome-terminal, konsole, xfce4-terminal, xterm)")
+    return argv + tools.spec(name).get("exec_args", []) + ["bash", "-c", script]
+
+
+def open_terminal(project_path, sub_path="", status=None, tools=None):
+    """Abre um terminal no diretório do projeto"""
+    status = status or _ignore_status
+    full_path = resolve_path(project_path, sub_path)
+    
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+    
+    status(f"Abrindo terminal em: {full_path}")
+    
+    # Abrir terminal no diretório
+    if sys.platform == "win32":
+        cmd = f'start cmd /k "cd /d "{full_path}""'
+    elif sys.platform == "darwin":  # macOS
+        cmd = f'osascript -e "tell application \\"Terminal\\" to do script \\"cd \\"{full_path}\\"\\""'
+    else:  # Linux
+        subprocess.Popen(linux_terminal_argv("exec bash", tools), cwd=full_path)
+        return
+    
+    subprocess.Popen(cmd, shell=True)
+
+
+def run_command(project_path, sub_path, command, status=None, stamp=None, tools=None, env=None, done=None):
+    """Executa um comando no terminal
+    
+    Se `stamp` for informado, o terminal grava esse carimbo quando o comando
+    termina com sucesso; `done` é criado quando ele termina, com qualquer
+    resultado. `env` são variáveis extras para o comando.
+    """
+    status = status or _ignore_status
+    full_path = resolve_path(project_path, sub_path)
+    
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+    
+    status(f"Executando: {command} em {full_path}")
+    
+    # Executar comando em nova janela do terminal
+    if sys.platform == "win32":
+        if stamp:
+            command = f'{command} && type nul > "{stamp}"'
+        if done:
+            command = f'{command} & type nul > "{done}"'
+        cmd = f'start cmd /k "cd /d "{full_path}" && {command}"'
+        subprocess.Popen(cmd, shell=True, env=dict(os.environ, **env) if env else None)
+    else:
+        if stamp:
+            command = f"{command} && touch {shlex.quote(stamp)}"
+        if done:
+            command = done_script(command, done)
+        # No próprio script: o emulador de terminal pode já estar rodando e não herdar o ambiente
+        subprocess.Popen(linux_terminal_argv(f"{shell_exports(env)}{command}; exec bash", tools), cwd=full_path)
+
+
+def run_wsl_command(project_path, sub_path, wsl_commands, status=None, stamp=None, tools=None, env=None,
+                    done=None):
+    """Executa comandos no WSL Ubuntu (grava `stamp` se terminarem com sucesso)
+    
+    `done` é criado quando os comandos terminam, com qualquer resultado.
+    """
+    status = status or _ignore_status
+    tools = tools or default_tools()
+    full_path = resolve_path(project_path, sub_path)
+    
+    if not os.path.exists(full_path):
+        raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+    
+    # Preparar comandos para WSL
+    command_string = wsl_command_string(wsl_commands)
+    
+    status(f"Executando no WSL: {command_string}")
+    command_string = shell_exports(env) + command_string
+    
+    if stamp and sys.platform == "win32":
+        command_string = f"{command_string} && touch \\\"$(wslpath '{stamp}')\\\""
+    elif stamp:
+        command_string = f"{command_string} && touch {shlex.quote(stamp)}"
+    if done and sys.platform == "win32":
+        command_string = f"{command_string}; touch \\\"$(wslpath '{done}')\\\""
+    elif done:
+        command_string = done_script(command_string, done)
+    
+    # Executar no WSL Ubuntu
+    if sys.platform == "win32":
+        # Abrir WSL Ubuntu e executar comandos
+        wsl = (tools.resolve("wsl") or ["wsl"])[0]
+        cmd = f'start cmd /k "cd /d "{full_path}" && "{wsl}" -d Ubuntu -e bash -c "{command_string}; exec bash""'
+        subprocess.Popen(cmd, shell=True)
+    else:
+        # Para Linux, usar bash normal
+        subprocess.Popen(linux_terminal_argv(f"{command_string}; exec bash", tools), cwd=full_path)
+
+
+_default_tools = None
+
+
+def default_tools():
+    """Registro de ferramentas compartilhado pelo processo"""
+    global _default_tools
+    if _default_tools is None:
+        _default_tools = ToolRegistry()
+    return _default_tools
@@ -0,0 +1,708 @@
+# -*- coding: utf-8 -*-
+"""
+Modo sem interface gráfica (não importa o tkinter)
+
+Uso:
+    project_launcher.py list [--json]
+    project_launcher.py tree [--json]
+    project_launcher.py run "Projeto/Opção/Sub-opção" [...] [--json]
+    project_launcher.py tools [--refresh] [--json]
+    project_launcher.py attach "Projeto"
+    project_launcher.py services [--json]
+    project_launcher.py stop "Projeto[/Opção]" [...] [--grace SEGUNDOS] [--json]
+    project_launcher.py remote {list,run,status,stop,logs,subscribe} [ALVO ...] [--json]
+    project_launcher.py stats ["Projeto[/Opção]"] [--slowest N] [--json]
+    project_launcher.py prewarm [--dry-run] [--force] [--json]
+    project_launcher.py cache {report,populate} ["Projeto" ...] [--dry-run] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from launcher.config import CONFIG_FILE, load_config, split_config, resolve_option, iter_options, iter_executable_options
+from launcher.logpump import PUMP_COMMAND
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+COMMANDS = ("run", "list", "tree", "tools", "attach", "services", "stop", "remote", "stats", "prewarm", "cache")
+
+# Evita que linhas de threads diferentes se misturem na saída
+_output_lock = threading.Lock()
+
+
+def emit(as_json, event, message=None, **fields):
+    """Escreve um evento (linha JSON ou texto simples) na saída padrão"""
+    if as_json:
+        record = {"event": event}
+        if message is not None:
+            record["message"] = message
+        record.update(fields)
+        message = json.dumps(record, ensure_ascii=False)
+    if message is not None:
+        with _output_lock:
+            print(message, flush=True)
+
+
+def cmd_list(projects, settings, args):
+    """Lista os caminhos de todas as opções executáveis"""
+    paths = [path for path, _ in iter_executable_options(projects)]
+    if args.json:
+        print(json.dumps(paths, ensure_ascii=False))
+    else:
+        for path in paths:
+            print(path)
+    return EXIT_OK
+
+
+def cmd_tree(projects, settings, args):
+    """Mostra a árvore de projetos e opções"""
+    if args.json:
+        tree = [{"path": path, "depth": depth, "type": data.get("type", "execute")}
+                for path, depth, data in iter_options(projects)]
+        print(json.dumps(tree, ensure_ascii=False))
+        return EXIT_OK
+    
+    for path, depth, data in iter_options(projects):
+        name = path.rsplit("/", 1)[-1] if depth else path
+        icon = "📁" if data.get("type") == "options" else "▶️"
+        print(f"{'  ' * depth}{icon} {name}")
+    return EXIT_OK
+
+
+def cmd_run(projects, settings, args):
+    """Executa opções pelo caminho completo (várias rodam juntas, como um lote)"""
+    # Importados aqui para "list" e "tree" não pagarem subprocess/threads
+    from launcher.actions import ActionRunner
+    from launcher.executor import ActionExecutor, BatchExecutor
+    from launcher.history import RunHistory
+    from launcher.plan import build_plan, describe_plan
+    from launcher.preflight import preflight
+    from launcher.trace import Tracer
+    
+    selected = []
+    for option_path in args.option:
+        try:
+            project_name, option_data = resolve_option(projects, option_path)
+        except KeyError as e:
+            emit(args.json, "error", str(e.args[0]), ok=False)
+            return EXIT_USAGE
+        
+        if option_data.get("type", "execute") != "execute":
+            emit(args.json, "error", "Esta opção não pode ser executada diretamente", ok=False,
+                 option=option_path)
+            return EXIT_USAGE
+        selected.append((option_path, option_data))
+    
+    plan = build_plan(projects, selected, optimize=not args.no_optimize,
+                      default_mode=settings.get("mode"))
+    option_field = args.option[0] if len(args.option) == 1 else args.option
+    started = time.monotonic()
+    runner = ActionRunner(status=lambda message: emit(args.json, "status", message))
+    runner.configure(settings)
+    
+    # Tudo é verificado antes de qualquer ação começar
+    problems = preflight(plan, runner.tools)
+    
+    if args.dry_run:
+        if args.json:
+            print(json.dumps({"plan": [entry.to_dict() for entry in plan], "problems": problems},
+                             ensure_ascii=False))
+        else:
+            print(describe_plan(plan))
+            if problems:
+                print("\nProblemas encontrados:")
+                for problem in problems:
+                    print(f"  ✗ {problem}")
+        return EXIT_FAILED if problems else EXIT_OK
+    
+    if problems:
+        for problem in problems:
+            emit(args.json, "error", problem, ok=False)
+        emit(args.json, "result", f"Verificação prévia falhou: {len(problems)} problema(s); nada foi executado",
+             ok=False, option=option_field, problems=problems,
+             duration=round(time.monotonic() - started, 3))
+        return EXIT_FAILED
+    
+    def on_output(process, stream, line):
+        emit(args.json, "output", f"[{process.name}] {line}" if not args.json else None,
+             service=process.name, stream=stream, line=line)
+    
+    def on_exit(process, returncode):
+        emit(args.json, "exit", f"Serviço '{process.name}' terminou (código {returncode})",
+             service=process.name, pid=process.pid, returncode=returncode)
+    
+    def on_limit(process, message):
+        emit(args.json, "limit", message, service=process.name, pid=process.pid)
+    
+    runner.processes.output_listeners.append(on_output)
+    runner.processes.exit_listeners.append(on_exit)
+    runner.monitor.limit_listeners.append(on_limit)
+    
+    def on_progress(done, total, action):
+        emit(args.json, "progress", None, done=done, total=total, action=action.get("type"))
+    
+    def run_in(entry):
+        return lambda action: runner.run(entry.project, action, force=args.force, option=entry.option_path)
+    
+    for entry in plan:
+        for note in entry.notes:
+            emit(args.json, "plan", f"{entry.option_path}: {note}", option=entry.option_path, note=note)
+    
+    history = RunHistory()
+    tracer = Tracer(history=history)
+    spans = []
+    executors = []
+    try:
+        for entry, (_, option_data) in zip(plan, selected):
+            span = tracer.option_span(entry.option_path, entry.project_name)
+            spans.append(span)
+            executors.append(ActionExecutor(
+                entry.actions,
+                run_in(entry),
+                max_workers=option_data.get("max_workers"),
+                tracer=tracer, parent_span=span
+            ))
+    except ValueError as e:
+        emit(args.json, "result", f"Erro ao executar ações: {str(e)}", ok=False,
+             option=option_field, duration=0)
+        return EXIT_FAILED
+    
+    batch = BatchExecutor(executors, on_progress)
+    try:
+        try:
+            errors = batch.run()
+            for span, error in zip(spans, errors):
+                tracer.finish_option(span, error)
+            failures = [(path, error) for (path, _), error in zip(selected, errors) if error]
+            if failures:
+                runner.stop_all()
+                if len(selected) > 1:
+                    for path, error in failures:
+                        emit(args.json, "error", f"{path}: {str(error)}", ok=False, option=path)
+                message = "; ".join(str(error) for _, error in failures)
+                emit(args.json, "result", f"Erro ao executar ações: {message}", ok=False,
+                     option=option_field, actions=batch.done,
+                     duration=round(time.monotonic() - started, 3))
+                return EXIT_FAILED
+            
+            runner.sessions.stop_all()
+            wait_managed(runner.processes)
+        except KeyboardInterrupt as e:
+            for span in spans:
+                if not span.finished:
+                    tracer.finish_option(span, e)
+            runner.stop_all()
+            emit(args.json, "result", "Interrompido pelo usuário", ok=False,
+                 option=option_field, duration=round(time.monotonic() - started, 3))
+            return EXIT_FAILED
+    finally:
+        if args.trace:
+            write_trace(tracer, args.trace, args.json)
+        history.close()
+    
+    failed = [process.name for process in runner.processes.all() if process.returncode]
+    if failed:
+        emit(args.json, "result", f"Serviços com erro: {', '.join(failed)}", ok=False,
+             option=option_field, actions=batch.done, duration=round(time.monotonic() - started, 3))
+        return EXIT_FAILED
+    
+    emit(args.json, "result", "Ações executadas com sucesso!", ok=True,
+         option=option_field, actions=batch.done, duration=round(time.monotonic() - started, 3))
+    return EXIT_OK
+
+
+def write_trace(tracer, path, as_json):
+    """Grava o trace da execução (formato Chrome trace-event)"""
+    try:
+        tracer.export(path)
+    except OSError as e:
+        emit(as_json, "error", f"Não foi possível gravar o trace: {e}", ok=False)
+        return
+    emit(as_json, "trace", f"Trace gravado em: {path}", path=path)
+
+
+def wait_managed(processes):
+    """Acompanha os serviços gerenciados até todos terminarem (Ctrl+C encerra)"""
+    for process in processes.all():
+        # Espera em fatias curtas para o Ctrl+C ser atendido no Windows
+        while not process.exited.wait(0.2):
+            pass
+
+
+def cmd_tools(projects, settings, args):
+    """Mostra onde cada ferramenta foi encontrada"""
+    from launcher.tools import ToolRegistry
+    
+    registry = ToolRegistry()
+    registry.configure(settings.get("tools"))
+    if args.refresh:
+        registry.forget()
+    
+    found = {name: registry.resolve(name) for name in sorted(registry.specs)}
+    if args.json:
+        print(json.dumps(found, ensure_ascii=False))
+    else:
+        for name, argv in found.items():
+            print(f"{name}: {' '.join(argv) if argv else '(não encontrada)'}")
+    return EXIT_OK
+
+
+def cmd_attach(projects, settings, args):
+    """Anexa este terminal à sessão tmux do projeto (dentro do tmux, troca de sessão)"""
+    from launcher.tmux import TmuxTarget, TmuxError, session_name
+    from launcher.tools import ToolRegistry
+    
+    project_name = args.project.split("/", 1)[0].strip()
+    if project_name not in projects:
+        print(f"Projeto não encontrado: {project_name}", file=sys.stderr)
+        return EXIT_USAGE
+    
+    registry = ToolRegistry()
+    registry.configure(settings.get("tools"))
+    tmux = TmuxTarget(registry)
+    session = session_name(projects[project_name]["path"])
+    try:
+        if not tmux.has_session(session):
+            print(f"A sessão tmux '{session}' ainda não existe (nenhum comando rodou nela)",
+                  file=sys.stderr)
+            return EXIT_FAILED
+        command = "switch-client" if os.environ.get("TMUX") else "attach-session"
+        argv = tmux.argv() + [command, "-t", f"={session}"]
+    except TmuxError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_FAILED
+    
+    os.execvp(argv[0], argv)
+
+
+def cmd_services(projects, settings, args):
+    """Lista os serviços gerenciados em execução (de qualquer instância do launcher)"""
+    from launcher.store import ServiceStore
+    
+    records = ServiceStore().alive()
+    if args.json:
+        print(json.dumps([{key: record.get(key) for key in ("name", "pid", "option", "project", "ports")}
+                          for record in records], ensure_ascii=False))
+        return EXIT_OK
+    
+    for record in records:
+        ports = f"  portas {', '.join(str(port) for port in record['ports'])}" if record.get("ports") else ""
+        print(f"{record['pid']:>7}  {record.get('option') or '-'}  {record.get('name')}{ports}")
+    if not records:
+        print("Nenhum serviço gerenciado em execução")
+    return EXIT_OK
+
+
+def cmd_stop(projects, settings, args):
+    """Encerra, em paralelo, o que opções ou projetos iniciaram"""
+    from launcher.processes import DEFAULT_GRACE, stop_trees
+    from launcher.store import ServiceStore
+    from launcher.tmux import TmuxTarget, TmuxError, session_name
+    from launcher.tools import ToolRegistry
+    
+    store = ServiceStore()
+    records = store.alive()
+    selected = []
+    for target in args.target:
+        target = target.strip("/")
+        for record in records:
+            option = record.get("option") or ""
+            if (option == target or option.startswith(target + "/")) and record not in selected:
+                selected.append(record)
+    
+    started = time.monotonic()
+    grace = DEFAULT_GRACE if args.grace is None else args.grace
+    forced = stop_trees([record.get("group", record["pid"]) for record in selected], grace)
+    for record in selected:
+        store.forget(record)
+        how = " (forçado)" if record.get("group", record["pid"]) in forced else ""
+        emit(args.json, "stopped", f"Encerrado{how}: {record.get('name')} (PID {record['pid']})",
+             service=record.get("name"), pid=record["pid"], option=record.get("option"),
+             forced=bool(how))
+    
+    # Projetos inteiros: a sessão tmux também sai
+    registry = ToolRegistry()
+    registry.configure(settings.get("tools"))
+    tmux = TmuxTarget(registry)
+    sessions = []
+    for target in args.target:
+        project = projects.get(target.strip("/"))
+        if project is None:
+            continue
+        session = session_name(project["path"])
+        try:
+            if tmux.has_session(session):
+                tmux.kill(session)
+                sessions.append(session)
+                emit(args.json, "stopped", f"Encerrada a sessão tmux: {session}", session=session)
+        except TmuxError:
+            pass
+    
+    if not selected and not sessions:
+        emit(args.json, "result", "Nada em execução para encerrar", ok=True, stopped=0)
+        return EXIT_OK
+    emit(args.json, "result", f"{len(selected) + len(sessions)} encerrado(s) em "
+         f"{time.monotonic() - started:.1f}s", ok=True, stopped=len(selected) + len(sessions),
+         duration=round(time.monotonic() - started, 3))
+    return EXIT_OK
+
+
+def print_remote(record):
+    """Mostra uma resposta do servidor de controle como texto"""
+    event = record.get("event")
+    if record.get("ok") is False:
+        print(f"Erro: {record.get('error') or 'falhou'}", file=sys.stderr)
+        for path, error in (record.get("errors") or {}).items():
+            print(f"  {path}: {error}", file=sys.stderr)
+        for problem in record.get("problems") or ():
+            print(f"  {problem}", file=sys.stderr)
+    elif event == "status":
+        print(record["message"])
+    elif event == "progress":
+        print(f"Progresso: {record['done']}/{record['total']}")
+    elif event == "log":
+        print(record["line"], file=sys.stderr if record.get("stream") == "stderr" else sys.stdout)
+    elif event == "exit":
+        print(f"Serviço '{record['service']}' terminou (código {record.get('returncode')})")
+    elif event == "result" and "batch" in record:
+        print("Ações executadas com sucesso!")
+    elif "options" in record and event is None:
+        for path in record["options"]:
+            print(path)
+    elif "services" in record:
+        for service in record["services"]:
+            state = "rodando" if service["running"] else f"terminou ({service.get('returncode')})"
+            usage = ""
+            if service.get("cpu") is not None:
+                usage = f"  {service['cpu']:.0f}% {service['rss'] // (1024 * 1024)} MB"
+            print(f"{service['pid']:>7}  {service.get('option') or '-'}  {service['name']}  {state}{usage}")
+    elif "stopped" in record:
+        print(f"Encerrados: {', '.join(record['stopped'])}" if record["stopped"] else "Nada em execução para encerrar")
+    elif "lines" in record:
+        for stream, line in record["lines"]:
+            print(line, file=sys.stderr if stream == "stderr" else sys.stdout)
+
+
+def cmd_remote(projects, settings, args):
+    """Envia um comando ao launcher aberto pelo servidor de controle"""
+    from launcher.control import ControlError, REPLY_TIMEOUT, request
+    
+    message = {"cmd": args.action}
+    if args.action == "run":
+        message.update(options=args.target, force=args.force, wait=not args.no_wait)
+    elif args.action == "stop":
+        message["targets"] = args.target
+    elif args.action == "logs":
+        if len(args.target) != 1:
+            print("Informe um serviço: remote logs NOME", file=sys.stderr)
+            return EXIT_USAGE
+        message.update(service=args.target[0], follow=args.follow)
+    
+    # subscribe e logs --follow esperam eventos sem prazo; o resto tem resposta
+    # (ou sinal de vida) garantida
+    open_ended = args.action == "subscribe" or (args.action == "logs" and args.follow)
+    ok = True
+    try:
+        for record in request(message, timeout=None if open_ended else REPLY_TIMEOUT):
+            if record.get("event") == "heartbeat":
+                continue
+            if record.get("ok") is False:
+                ok = False
+            if args.json:
+                with _output_lock:
+                    print(json.dumps(record, ensure_ascii=False), flush=True)
+            else:
+                print_remote(record)
+                sys.stdout.flush()
+    except ControlError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return EXIT_FAILED
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK if ok else EXIT_FAILED
+
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def cmd_stats(projects, settings, args):
+    """Mostra p50/p95 por opção, regressões e as ações mais lentas do histórico"""
+    from launcher.history import RunHistory
+    
+    history = RunHistory()
+    stats = history.option_stats(args.option.strip("/") if args.option else None)
+    slowest = history.slowest_actions(args.slowest)
+    if args.json:
+        print(json.dumps({"options": [item.to_dict() for item in stats], "slowest_actions": slowest},
+                         ensure_ascii=False))
+        return EXIT_OK
+    
+    if not stats:
+        print("Nenhuma execução no histórico ainda")
+        return EXIT_OK
+    
+    width = max(len(item.option) for item in stats)
+    print(f"{'Opção':<{width}}  {'p50':>8}  {'p95':>8}  {'última':>8}  {'cache':>5}  execuções")
+    for item in stats:
+        flag = ""
+        if item.regressed:
+            flag = f"  ⚠ regrediu: {format_seconds(item.recent)} (base {format_seconds(item.baseline)})"
+        failures = f" + {item.failures} com erro" if item.failures else ""
+        cache = "-" if item.hit_rate is None else f"{item.hit_rate:.0%}"
+        print(f"{item.option:<{width}}  {format_seconds(item.p50):>8}  {format_seconds(item.p95):>8}  "
+              f"{format_seconds(item.last):>8}  {cache:>5}  {item.runs}{failures}{flag}")
+    
+    if slowest:
+        print("\nAções mais lentas:")
+        for action in slowest:
+            cache = f", pulada {action['hit_rate']:.0%} das vezes" if action["hit_rate"] else ""
+            print(f"  {format_seconds(action['mean']):>8} (máx. {format_seconds(action['max'])})  "
+                  f"{action['option']}: {action['action']} [{action['count']}x{cache}]")
+    return EXIT_OK
+
+
+def cmd_prewarm(projects, settings, args):
+    """Pré-aquece agora as opções mais prováveis para este horário (ex.: por um agendador)"""
+    from launcher.actions import ActionRunner
+    from launcher.history import RunHistory
+    from launcher.prewarm import PrewarmScheduler
+    
+    runner = ActionRunner(status=lambda message: emit(args.json, "status", message))
+    runner.configure(settings)
+    scheduler = PrewarmScheduler(runner, RunHistory(), lambda: projects,
+                                 status=lambda message: emit(args.json, "status", message))
+    scheduler.settings = dict(settings.get("prewarm") or {})
+    
+    planned = scheduler.plan()
+    if args.dry_run:
+        if args.json:
+            print(json.dumps([{"option": option, "score": round(score, 2),
+                               "steps": [step.to_dict() for step in steps]}
+                              for option, score, steps in planned], ensure_ascii=False))
+        elif not planned:
+            print("Nada a pré-aquecer (histórico curto ou tudo em dia)")
+        for option, score, steps in ([] if args.json else planned):
+            print(f"{option} (pontuação {score:.1f})")
+            for step in steps:
+                print(f"  - {step.description}")
+        return EXIT_OK
+    
+    reason = None if args.force else scheduler.busy()
+    if reason:
+        emit(args.json, "result", f"Pré-aquecimento adiado: {reason}", ok=True, steps=0)
+        return EXIT_OK
+    
+    done = []
+    worker = threading.Thread(target=lambda: done.extend(scheduler.run_round(force=True)))
+    worker.start()
+    try:
+        while worker.is_alive():
+            worker.join(0.2)
+    except KeyboardInterrupt:
+        # As instalações rodam em outro grupo de processos: o Ctrl+C não chega nelas
+        scheduler.cancel(wait=True)
+        emit(args.json, "result", "Interrompido pelo usuário", ok=False, steps=len(done))
+        return EXIT_FAILED
+    emit(args.json, "result", f"{len(done)} passo(s) pré-aquecido(s)", ok=True, steps=len(done))
+    return EXIT_OK
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def format_ratio(hits, total):
+    return f"{hits}/{total} ({hits / total:.0%})" if total else "-"
+
+
+def cmd_cache(projects, settings, args):
+    """Pré-popula os caches de pacotes compartilhados ou mostra o uso deles"""
+    from launcher.history import RunHistory
+    from launcher.packages import KINDS, cache_report, package_config, populate_steps, run_populate_step
+    
+    defaults = settings.get("cache") or {}
+    names = [name.split("/", 1)[0].strip() for name in args.project] or list(projects)
+    missing = [name for name in names if name not in projects]
+    if missing:
+        print(f"Projeto não encontrado: {', '.join(missing)}", file=sys.stderr)
+        return EXIT_USAGE
+    selected = {name: projects[name] for name in names}
+    
+    if args.action == "report":
+        report = cache_report(selected, defaults, RunHistory())
+        if args.json:
+            print(json.dumps(report, ensure_ascii=False))
+            return EXIT_OK
+        print(f"Caches em {report['root']}")
+        for kind in KINDS:
+            usage = report["usage"][kind]
+            print(f"  {kind:<10}  {format_bytes(usage['bytes']):>9}  {usage['files']} arquivo(s)")
+        if not report["projects"]:
+            print('\nNenhum projeto usa os caches compartilhados ("cache": true no projeto)')
+            return EXIT_OK
+        width = max(len(item["project"]) for item in report["projects"])
+        print(f"\n{'Projeto':<{width}}  {'npm':>15}  {'wheelhouse':>15}  instalações puladas")
+        for item in report["projects"]:
+            coverage = {kind: format_ratio(value["cached"], value["total"])
+                        for kind, value in item["coverage"].items()}
+            installs = format_ratio(item["installs"]["skipped"], item["installs"]["runs"])
+            print(f"{item['project']:<{width}}  {coverage.get('npm', '-'):>15}  "
+                  f"{coverage.get('wheelhouse', '-'):>15}  {installs}")
+        return EXIT_OK
+    
+    planned = []
+    for name, project in selected.items():
+        config = package_config(project, defaults)
+        if config is not None:
+            planned.extend((name, config, step) for step in populate_steps(project, config))
+    if args.dry_run:
+        if args.json:
+            print(json.dumps([dict(step.to_dict(), project=name, argv=step.argv)
+                              for name, _, step in planned], ensure_ascii=False))
+        elif not planned:
+            print("Nada a popular (nenhum projeto com \"cache\", lockfile ou requirements)")
+        for name, _, step in ([] if args.json else planned):
+            print(f"{name}: {' '.join(step.argv)}  (em {step.folder})")
+        return EXIT_OK
+    
+    failures = 0
+    for name, config, step in planned:
+        ok, output = run_populate_step(step, config, lambda message: emit(args.json, "status", message))
+        if not ok:
+            failures += 1
+            emit(args.json, "error", f"Falhou: {step.description}\n{output}".rstrip(),
+                 project=name, kind=step.kind)
+    emit(args.json, "result", f"{len(planned) - failures} de {len(planned)} passo(s) concluído(s)",
+         ok=not failures, steps=len(planned), failures=failures)
+    return EXIT_FAILED if failures else EXIT_OK
+
+
+def build_parser():
+    """Cria o parser de argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(
+        prog="project_launcher.py",
+        description="Launcher de Projetos (modo linha de comando)"
+    )
+    parser.add_argument("--config", default=CONFIG_FILE,
+                        help="Arquivo de configuração (padrão: config.json)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    run_parser = subparsers.add_parser("run", help="Executa uma opção")
+    run_parser.add_argument("option", nargs="+",
+                            help='Caminho da opção, ex.: "Projeto/Opção/Sub-opção" '
+                                 '(várias opções rodam juntas)')
+    run_parser.add_argument("--json", action="store_true", help="Saída em linhas JSON")
+    run_parser.add_argument("--force", action="store_true",
+                            help="Ignora o cache e reexecuta instalações")
+    run_parser.add_argument("--dry-run", action="store_true",
+                            help="Só mostra o plano otimizado, sem executar nada")
+    run_parser.add_argument("--no-optimize", action="store_true",
+                            help="Executa as ações como estão, sem remover repetições nem unir comandos")
+    run_parser.add_argument("--trace", metavar="ARQUIVO",
+                            help="Grava a linha do tempo das ações (Chrome trace-event JSON)")
+    run_parser.set_defaults(handler=cmd_run)
+    
+    list_parser = subparsers.add_parser("list", help="Lista as opções executáveis")
+    list_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    list_parser.set_defaults(handler=cmd_list)
+    
+    tree_parser = subparsers.add_parser("tree", help="Mostra a árvore de opções")
+    tree_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    tree_parser.set_defaults(handler=cmd_tree)
+    
+    tools_parser = subparsers.add_parser("tools", help="Mostra as ferramentas encontradas")
+    tools_parser.add_argument("--refresh", action="store_true",
+                              help="Procura as ferramentas de novo (ignora o cache)")
+    tools_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    tools_parser.set_defaults(handler=cmd_tools)
+    
+    attach_parser = subparsers.add_parser("attach", help="Abre a sessão tmux de um projeto")
+    attach_parser.add_argument("project", help="Nome do projeto (ou caminho de uma opção dele)")
+    attach_parser.set_defaults(handler=cmd_attach)
+    
+    services_parser = subparsers.add_parser("services", help="Lista os serviços gerenciados em execução")
+    services_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    services_parser.set_defaults(handler=cmd_services)
+    
+    stop_parser = subparsers.add_parser("stop", help="Encerra o que opções ou projetos iniciaram")
+    stop_parser.add_argument("target", nargs="+",
+                             help='Projeto, grupo ou opção, ex.: "Projeto" ou "Projeto/Opção"')
+    stop_parser.add_argument("--grace", type=float, default=None,
+                             help="Segundos entre o SIGTERM e o SIGKILL (padrão: 5)")
+    stop_parser.add_argument("--json", action="store_true", help="Saída em linhas JSON")
+    stop_parser.set_defaults(handler=cmd_stop)
+    
+    remote_parser = subparsers.add_parser("remote", help="Envia um comando ao launcher aberto")
+    remote_parser.add_argument("action", choices=("list", "run", "status", "stop", "logs", "subscribe"))
+    remote_parser.add_argument("target", nargs="*",
+                               help="Opções (run), projetos/opções (stop) ou o serviço (logs)")
+    remote_parser.add_argument("--force", action="store_true", help="Ignora o cache (run)")
+    remote_parser.add_argument("--no-wait", action="store_true",
+                               help="Só dispara, sem esperar o resultado (run)")
+    remote_parser.add_argument("--follow", action="store_true",
+                               help="Acompanha o log até o serviço terminar (logs)")
+    remote_parser.add_argument("--json", action="store_true", help="Respostas em linhas JSON")
+    # Não lê o config.json: quem responde é o launcher aberto
+    remote_parser.set_defaults(handler=cmd_remote, needs_config=False)
+    
+    stats_parser = subparsers.add_parser("stats", help="Tempos das execuções (p50/p95, regressões)")
+    stats_parser.add_argument("option", nargs="?", help="Só este projeto, grupo ou opção")
+    stats_parser.add_argument("--slowest", type=int, default=10, metavar="N",
+                              help="Quantas das ações mais lentas mostrar (padrão: 10)")
+    stats_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    stats_parser.set_defaults(handler=cmd_stats, needs_config=False)
+    
+    prewarm_parser = subparsers.add_parser("prewarm", help="Pré-aquece as opções mais prováveis agora")
+    prewarm_parser.add_argument("--dry-run", action="store_true",
+                                help="Só mostra as opções e os passos, sem executar")
+    prewarm_parser.add_argument("--force", action="store_true",
+                                help="Roda mesmo na bateria ou com a CPU ocupada")
+    prewarm_parser.add_argument("--json", action="store_true", help="Saída em linhas JSON")
+    prewarm_parser.set_defaults(handler=cmd_prewarm)
+    
+    cache_parser = subparsers.add_parser("cache", help="Caches de pacotes compartilhados entre projetos")
+    cache_parser.add_argument("action", choices=("report", "populate"),
+                              help="report: espaço e cobertura; populate: baixa as dependências")
+    cache_parser.add_argument("project", nargs="*", help="Só estes projetos (padrão: todos)")
+    cache_parser.add_argument("--dry-run", action="store_true",
+                              help="Só mostra os comandos, sem executar (populate)")
+    cache_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    cache_parser.set_defaults(handler=cmd_cache)
+    
+    return parser
+
+
+def main(argv=None):
+    """Ponto de entrada do modo linha de comando; retorna o código de saída"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == [PUMP_COMMAND]:
+        # Bomba de log de um serviço gerenciado (iniciada pelo próprio launcher)
+        from launcher.logpump import main as pump_main
+        return pump_main(argv[1:])
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, "handler", None):
+        parser.print_help()
+        return EXIT_USAGE
+    
+    if not getattr(args, "needs_config", True):
+        return args.handler({}, {}, args)
+    try:
+        projects, settings = split_config(load_config(args.config))
+    except Exception as e:
+        print(f"Erro ao carregar configurações: {str(e)}", file=sys.stderr)
+        return EXIT_FAILED
+    
+    return args.handler(projects, settings, args)
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura do config.json e navegação pela árvore de opções
+"""
+
+import json
+import os
+
+CONFIG_FILE = "config.json"
+
+# Separador usado nos caminhos de opções ("Projeto/Opção/Sub-opção")
+PATH_SEPARATOR = "/"
+
+# Chaves do topo que começam com "_" não são projetos (ex.: "_settings")
+SETTINGS_KEY = "_settings"
+
+OPTION_TYPES = ("execute", "options")
+ACTION_TYPES = (
+    "open_cursor", "open_postman", "open_dbeaver", "open_tool", "open_terminal",
+    "run_command", "run_wsl", "wait",
+    "wait_port", "wait_http", "wait_file", "wait_output",
+)
+
+DEFAULT_CONFIG = {
+    "Super Pagamentos": {
+        "path": "C:/projetos/super-pagamentos",
+        "options": {
+            "Front Dashboard": {
+                "type": "execute",
+                "actions": [
+                    {"type": "open_cursor", "path": "front-dashboard"},
+                    {"type": "run_command", "command": "npm install", "path": "front-dashboard"},
+                    {"type": "run_command", "command": "npm start", "path": "front-dashboard"}
+                ]
+            },
+            "Back Dashboard": {
+                "type": "execute",
+                "actions": [
+                    {"type": "open_cursor", "path": "back-dashboard"},
+                    {"type": "run_command", "command": "npm install", "path": "back-dashboard"},
+                    {"type": "run_command", "command": "npm run dev", "path": "back-dashboard"}
+                ]
+            },
+            "Back API": {
+                "type": "execute",
+                "actions": [
+                    {"type": "open_cursor", "path": "back-api"},
+                    {"type": "run_command", "command": "pip install -r requirements.txt", "path": "back-api"},
+                    {"type": "run_command", "command": "python app.py", "path": "back-api"}
+                ]
+            },
+            "Todos": {
+                "type": "execute",
+                "actions": [
+                    {"type": "open_cursor", "path": "front-dashboard"},
+                    {"type": "open_cursor", "path": "back-dashboard"},
+                    {"type": "open_cursor", "path": "back-api"},
+                    {"type": "run_command", "command": "npm install", "path": "front-dashboard"},
+                    {"type": "run_command", "command": "npm install", "path": "back-dashboard"},
+                    {"type": "run_command", "command": "pip install -r requirements.txt", "path": "back-api"}
+                ]
+            }
+        }
+    }
+}
+
+
+def load_config(config_file=CONFIG_FILE):
+    """Carrega configurações do arquivo JSON (cria o padrão se não existir)"""
+    if not os.path.exists(config_file):
+        return create_default_config(config_file)
+    
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def create_default_config(config_file=CONFIG_FILE):
+    """Cria arquivo de configuração padrão"""
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(DEFAULT_CONFIG, f, indent=4, ensure_ascii=False)
+    
+    return json.loads(json.dumps(DEFAULT_CONFIG))
+
+
+def split_config(config):
+    """Separa a configuração em (projetos, ajustes globais de "_settings")"""
+    projects = {name: data for name, data in config.items() if not name.startswith("_")}
+    return projects, config.get(SETTINGS_KEY, {})
+
+
+def validate_config(config):
+    """Valida a estrutura da configuração
+    
+    Lança ValueError listando todos os problemas encontrados.
+    """
+    # Importados aqui para "list"/"tree" da linha de comando não carregarem o executor
+    from launcher.actions import MODES
+    from launcher.monitor import LIMIT_ACTIONS
+    from launcher.executor import build_action_graph
+    from launcher.packages import KINDS, OFFLINE_MODES
+    
+    problems = []
+    if not isinstance(config, dict):
+        raise ValueError("A configuração deve ser um objeto com os projetos")
+    projects, settings = split_config(config)
+    
+    def check_options(options, prefix):
+        if not isinstance(options, dict):
+            problems.append(f"{prefix}: 'options' deve ser um objeto")
+            return
+        for name, data in options.items():
+            path = f"{prefix}{PATH_SEPARATOR}{name}"
+            if not isinstance(data, dict):
+                problems.append(f"{path}: opção deve ser um objeto")
+                continue
+            option_type = data.get("type", "execute")
+            if option_type not in OPTION_TYPES:
+                problems.append(f"{path}: tipo de opção inválido: {option_type}")
+            elif option_type == "options":
+                check_options(data.get("options", {}), path)
+            else:
+                check_actions(data.get("actions"), path)
+    
+    def check_actions(actions, path):
+        if not isinstance(actions, list):
+            problems.append(f"{path}: 'actions' deve ser uma lista")
+            return
+        for index, action in enumerate(actions):
+            if not isinstance(action, dict):
+                problems.append(f"{path}: ação {index + 1} deve ser um objeto")
+                return
+            if action.get("type") not in ACTION_TYPES:
+                problems.append(f"{path}: ação {index + 1} com tipo inválido: {action.get('type')}")
+        try:
+            build_action_graph(actions)
+        except ValueError as e:
+            problems.append(f"{path}: {str(e)}")
+    
+    def check_cache(cache, path):
+        if not isinstance(cache, dict):
+            problems.append(f"{path}: deve ser um objeto")
+            return
+        kinds = cache.get("kinds", [])
+        if not isinstance(kinds, list) or any(kind not in KINDS for kind in kinds):
+            problems.append(f"{path}.kinds: deve ser uma lista com {', '.join(KINDS)}")
+        if cache.get("offline", False) not in OFFLINE_MODES:
+            problems.append(f"{path}.offline: deve ser false, \"prefer\" ou true")
+    
+    for project_name, project in projects.items():
+        if not isinstance(project, dict):
+            problems.append(f"{project_name}: projeto deve ser um objeto")
+            continue
+        if not isinstance(project.get("path"), str):
+            problems.append(f"{project_name}: 'path' ausente ou inválido")
+        if project.get("cache") not in (None, True, False):
+            check_cache(project["cache"], f"{project_name}.cache")
+        check_options(project.get("options", {}), project_name)
+    
+    if not isinstance(settings, dict):
+        problems.append(f"{SETTINGS_KEY}: deve ser um objeto")
+    else:
+        if not isinstance(settings.get("tools", {}), dict):
+            problems.append(f"{SETTINGS_KEY}.tools: deve ser um objeto")
+        if settings.get("mode") is not None and settings["mode"] not in MODES:
+            problems.append(f"{SETTINGS_KEY}.mode: modo inválido: {settings['mode']}")
+        monitor = settings.get("monitor", {})
+        if not isinstance(monitor, dict):
+            problems.append(f"{SETTINGS_KEY}.monitor: deve ser um objeto")
+        elif monitor.get("limit_action", "warn") not in LIMIT_ACTIONS:
+            problems.append(f"{SETTINGS_KEY}.monitor.limit_action: deve ser 'warn' ou 'stop'")
+        control = settings.get("control", {})
+        if not isinstance(control, dict):
+            problems.append(f"{SETTINGS_KEY}.control: deve ser um objeto")
+        elif control.get("port") is not None and (type(control["port"]) is not int
+                                                   or not 0 <= control["port"] <= 65535):
+            problems.append(f"{SETTINGS_KEY}.control.port: deve ser uma porta (0 a 65535)")
+        if not isinstance(settings.get("prewarm", {}), dict):
+            problems.append(f"{SETTINGS_KEY}.prewarm: deve ser um objeto")
+        if "cache" in settings:
+            check_cache(settings["cache"], f"{SETTINGS_KEY}.cache")
+        max_heavy = settings.get("max_heavy_actions")
+        if max_heavy is not None and (type(max_heavy) is not int or max_heavy < 1):
+            problems.append(f"{SETTINGS_KEY}.max_heavy_actions: deve ser um inteiro positivo")
+        idle_timeout = settings.get("session_idle_timeout")
+        if idle_timeout is not None and (type(idle_timeout) not in (int, float) or idle_timeout <= 0):
+            problems.append(f"{SETTINGS_KEY}.session_idle_timeout: deve ser um número positivo de segundos")
+    
+    if problems:
+        raise ValueError("; ".join(problems))
+
+
+def split_option_path(option_path):
+    """Divide "Projeto/Opção/Sub-opção" em partes (ignorando barras extras)"""
+    return [part.strip() for part in option_path.split(PATH_SEPARATOR) if part.strip()]
+
+
+def resolve_option(projects, option_path):
+    """Resolve um caminho de opção e retorna (projeto, dados da opção)
+    
+    Lança KeyError com mensagem amigável se alguma parte não existir.
+    """
+    parts = split_option_path(option_path)
+    if not parts:
+        raise KeyError("Caminho de opção vazio")
+    
+    project_name = parts[0]
+    if project_name not in projects:
+        raise KeyError(f"Projeto não encontrado: {project_name}")
+    
+    node = {"type": "options", "options": projects[project_name].get("options", {})}
+    for depth, name in enumerate(parts[1:], start=1):
+        options = node.get("options", {}) if node.get("type") == "options" else {}
+        if name not in options:
+            prefix = PATH_SEPARATOR.join(parts[:depth])
+            raise KeyError(f"Opção não encontrada em '{prefix}': {name}")
+        node = options[name]
+    
+    return project_name, node
+
+
+def iter_options(projects):
+    """Percorre todas as opções como (caminho, profundidade, dados)"""
+    def walk(options, prefix, depth):
+        for name, data in options.items():
+            path = f"{prefix}{PATH_SEPARATOR}{name}"
+            yield path, depth, data
+            if data.get("type") == "options":
+                yield from walk(data.get("options", {}), path, depth + 1)
+    
+    for project_name, project in projects.items():
+        yield project_name, 0, {"type": "options", "options": project.get("options", {})}
+        yield from walk(project.get("options", {}), project_name, 1)
+
+
+def iter_executable_options(projects):
+    """Percorre apenas as opções executáveis como (caminho, dados)"""
+    for path, depth, data in iter_options(projects):
+        if depth and data.get("type", "execute") == "execute":
+            yield path, data
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor de controle local: editores, hooks do git e atalhos do tmux
+disparam opções no launcher que já está aberto
+
+Opcional ("_settings.control"). Escuta em um socket Unix no cache do usuário
+(permissão só do dono) ou, no Windows ou com "port", em uma porta de
+loopback protegida por um token. O endereço e o token ficam em
+"control.json" no cache, onde `project_launcher.py remote` os encontra.
+
+O protocolo é uma linha JSON por mensagem nos dois sentidos. Cada pedido
+recebe zero ou mais eventos e termina em uma resposta com "final":
+
+    → {"id": 1, "cmd": "run", "options": ["Projeto/Opção"]}
+    ← {"id": 1, "event": "accepted", "ok": true, "options": ["Projeto/Opção"]}
+    ← {"id": 1, "event": "status", "batch": 3, "message": "Executando ações..."}
+    ← {"id": 1, "event": "progress", "batch": 3, "done": 2, "total": 5}
+    ← {"id": 1, "event": "result", "batch": 3, "ok": true, "errors": {}, "final": true}
+
+Enquanto um "run" espera o lote, o servidor manda {"event": "heartbeat"} a
+cada `HEARTBEAT_INTERVAL` segundos sem outros eventos: o cliente desiste se
+passar `REPLY_TIMEOUT` sem receber nada.
+
+Comandos: list, run, status, stop, logs (com "follow" acompanha até o
+serviço terminar) e subscribe (eventos de todas as execuções, inclusive as
+da interface, até a conexão fechar). Cada conexão atende um pedido por vez;
+conexões diferentes andam em paralelo.
+
+O laço asyncio roda em uma thread própria e nunca toca em widgets: as
+execuções são entregues à interface por `submit`, que as agenda na thread
+do Tk.
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import socket
+import threading
+
+from launcher.config import iter_executable_options, resolve_option, split_option_path
+from launcher.paths import cache_dir
+
+ADDRESS_FILE = "control.json"
+SOCKET_FILE = "control.sock"
+
+# Porta de loopback padrão quando não há socket Unix (Windows)
+DEFAULT_PORT = 47800
+
+COMMANDS = ("list", "run", "status", "stop", "logs", "subscribe")
+
+# Maior linha aceita de um cliente
+MAX_LINE = 1024 * 1024
+
+# Eventos guardados por assinante lento antes de descartar os mais antigos
+SUBSCRIBER_QUEUE = 1000
+
+# Intervalo entre leituras do log com "follow" (segundos)
+LOG_FOLLOW_INTERVAL = 0.2
+
+# Sinal de vida de um "run" em andamento e quanto o cliente espera por uma
+# resposta antes de desistir (segundos)
+HEARTBEAT_INTERVAL = 10
+REPLY_TIMEOUT = 60
+
+
+class ControlError(Exception):
+    """O servidor de controle não pôde ser iniciado ou contatado"""
+
+
+def control_address(settings):
+    """Endereço configurado: {"socket": caminho} ou {"host": ..., "port": ...}"""
+    if settings.get("port") is not None or not hasattr(socket, "AF_UNIX"):
+        return {"host": "127.0.0.1", "port": int(settings.get("port", DEFAULT_PORT))}
+    return {"socket": settings.get("socket") or os.path.join(cache_dir(), SOCKET_FILE)}
+
+
+def read_address():
+    """Endereço e token do servidor em execução (de "control.json") ou None"""
+    try:
+        with open(os.path.join(cache_dir(), ADDRESS_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_address(address):
+    path = os.path.join(cache_dir(), ADDRESS_FILE)
+    tmp = f"{path}.tmp"
+    # O token dá controle do launcher: só o dono pode ler
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(address, f)
+    os.replace(tmp, path)
+
+
+def _clear_stale_socket(path):
+    """Apaga o socket deixado por um launcher que caiu (lança ControlError se outro atende)"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)
+    else:
+        raise ControlError(f"outro launcher já atende em {path}")
+    finally:
+        probe.close()
+
+
+def _offer(queue, record):
+    """Entrega um evento sem bloquear; assinante lento perde os mais antigos"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(record)
+
+
+class ControlServer:
+    """Servidor de controle em uma thread com laço asyncio próprio
+    
+    `projects()` retorna os projetos atuais (mudam quando o config.json é
+    recarregado); `submit(options, force, listener)` agenda a execução de
+    [(caminho, dados da opção)] e chama `listener(evento)` a cada status e
+    progresso, terminando com um evento "result".
+    """
+    
+    def __init__(self, projects, runner, submit, settings=None):
+        self.projects = projects
+        self.runner = runner
+        self.submit = submit
+        self.settings = settings or {}
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.address = None
+        self.token = None
+        self.subscribers = set()
+        self.clients = set()
+    
+    def start(self):
+        """Abre o socket e começa a atender; retorna o endereço como texto"""
+        ready = threading.Event()
+        errors = []
+        
+        def serve():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self._listen())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            self.loop = loop
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+        
+        self.thread = threading.Thread(target=serve, name="control", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if errors:
+            error = errors[0]
+            raise error if isinstance(error, ControlError) else ControlError(str(error))
+        self.runner.processes.exit_listeners.append(self._on_exit)
+        return self.describe()
+    
+    async def _listen(self):
+        address = control_address(self.settings)
+        if "socket" in address:
+            path = address["socket"]
+            _clear_stale_socket(path)
+            self.server = await asyncio.start_unix_server(self._client, path=path, limit=MAX_LINE)
+            os.chmod(path, 0o600)
+        else:
+            self.server = await asyncio.start_server(self._client, address["host"], address["port"],
+                                                     limit=MAX_LINE)
+            address["port"] = self.server.sockets[0].getsockname()[1]
+            # Qualquer usuário da máquina alcança a porta: sem token não há controle
+            self.token = secrets.token_hex(16)
+        self.token = self.settings.get("token") or self.token
+        self.address = address
+        _write_address(dict(address, token=self.token, pid=os.getpid()))
+    
+    def describe(self):
+        if self.address is None:
+            return ""
+        if "socket" in self.address:
+            return self.address["socket"]
+        return f"{self.address['host']}:{self.address['port']}"
+    
+    def stop(self):
+        """Fecha o servidor e as conexões abertas"""
+        if self.runner.processes.exit_listeners.count(self._on_exit):
+            self.runner.processes.exit_listeners.remove(self._on_exit)
+        loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout=2)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        self.thread.join(timeout=2)
+        
+        for path in (self.address.get("socket"), os.path.join(cache_dir(), ADDRESS_FILE)):
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    
+    async def _close(self):
+        self.server.close()
+        clients = list(self.clients)
+        for task in clients:
+            task.cancel()
+        # Espera os clientes fecharem as conexões (o finally de cada um)
+        await asyncio.gather(*clients, return_exceptions=True)
+    
+    def publish(self, record):
+        """Envia um evento aos assinantes (de qualquer thread)"""
+        loop = self.loop
+        if loop is None or not self.subscribers:
+            return
+        try:
+            loop.call_soon_threadsafe(self._fan_out, dict(record))
+        except RuntimeError:
+            pass  # Laço já encerrado
+    
+    def _fan_out(self, record):
+        for queue in self.subscribers:
+            _offer(queue, record)
+    
+    def _on_exit(self, process, returncode):
+        self.publish({"event": "exit", "service": process.name, "option": process.option,
+                      "returncode": returncode})
+    
+    async def _client(self, reader, writer):
+        # O trabalho roda em uma tarefa própria, que o _close cancela: o
+        # cancelamento termina nela, sem passar pelo callback do asyncio.streams
+        task = asyncio.ensure_future(self._serve(reader, writer))
+        self.clients.add(task)
+        try:
+            await asyncio.wait([task])
+            if not task.cancelled():
+                task.result()
+        finally:
+            task.cancel()
+            self.clients.discard(task)
+    
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    await self._send(writer, {"ok": False, "error": "Pedido deve ser um objeto JSON",
+                                              "final": True})
+                    continue
+                await self._handle(request, writer)
+        except (ConnectionError, ValueError):
+            pass  # Cliente saiu ou linha grande demais
+        finally:
+            writer.close()
+    
+    async def _send(self, writer, record):
+        writer.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+    
+    async def _handle(self, request, writer):
+        request_id = request.get("id")
+        
+        async def send(record):
+            if request_id is not None:
+                record = dict(record, id=request_id)
+            await self._send(writer, record)
+        
+        if self.token and not secrets.compare_digest(str(request.get("token", "")), self.token):
+            await send({"ok": False, "error": "Token inválido", "final": True})
+            return
+        command = request.get("cmd")
+        if command not in COMMANDS:
+            await send({"ok": False, "error": f"Comando desconhecido: {command} "
+                                              f"(use {', '.join(COMMANDS)})", "final": True})
+            return
+        try:
+            await getattr(self, f"_cmd_{command}")(request, send)
+        except (KeyError, TypeError, ValueError) as e:
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            await send({"ok": False, "error": message, "final": True})
+    
+    async def _cmd_list(self, request, send):
+        await send({"ok": True, "options": [path for path, _ in iter_executable_options(self.projects())],
+                    "final": True})
+    
+    async def _cmd_run(self, request, send):
+        paths = request.get("options")
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths:
+            raise ValueError("Informe 'options' com o caminho de ao menos uma opção")
+        
+        projects = self.projects()
+        options = []
+        for path in paths:
+            _, data = resolve_option(projects, path)
+            if data.get("type", "execute") != "execute":
+                raise ValueError(f"'{path}' não é uma opção executável")
+            options.append((path, data))
+        
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        
+        def listener(record):
+            loop.call_soon_threadsafe(events.put_nowait, dict(record))
+        
+        wait = request.get("wait", True)
+        self.submit(options, bool(request.get("force")), listener)
+        await send({"event": "accepted", "ok": True, "options": paths, "final": not wait})
+        while wait:
+            try:
+                record = await asyncio.wait_for(events.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                record = {"event": "heartbeat"}
+            if record.get("event") == "result":
+                record["final"] = True
+                wait = False
+            await send(record)
+    
+    async def _cmd_status(self, request, send):
+        _, usage = self.runner.monitor.snapshot()
+        services = []
+        for process in self.runner.processes.all() + self.runner.sessions.all():
+            item = usage.get(process.name)
+            services.append({
+                "name": process.name,
+                "pid": process.pid,
+                "project": getattr(process, "project", None),
+                "option": getattr(process, "option", None),
+                "running": process.running,
+                "returncode": None if process.running else getattr(process, "returncode", None),
+                "cpu": round(item.cpu, 1) if item else None,
+                "rss": item.rss if item else None,
+            })
+        await send({"ok": True, "services": services, "final": True})
+    
+    async def _cmd_stop(self, request, send):
+        targets = request.get("targets")
+        if isinstance(targets, str):
+            targets = [targets]
+        if not targets:
+            raise ValueError("Informe 'targets' com projetos ou opções")
+        
+        projects = self.projects()
+        
+        def stop():
+            stopped = []
+            for target in targets:
+                parts = split_option_path(target)
+                project = projects.get(parts[0]) if len(parts) == 1 else None
+                stopped.extend(self.runner.stop(target, project))
+            return stopped
+        
+        # Espera o prazo de encerramento fora do laço (outros clientes continuam)
+        stopped = await asyncio.get_running_loop().run_in_executor(None, stop)
+        await send({"ok": True, "stopped": stopped, "final": True})
+    
+    async def _cmd_logs(self, request, send):
+        name = request.get("service")
+        process = self.runner.processes.get(name) or next(
+            (session for session in self.runner.sessions.all() if session.name == name), None)
+        if process is None:
+            raise KeyError(f"Serviço não encontrado: {name}")
+        
+        lines, seen = process.output.since(int(request.get("since", 0)))
+        follow = bool(request.get("follow"))
+        await send({"ok": True, "lines": lines, "next": seen, "running": process.running,
+                    "final": not follow})
+        while follow:
+            await asyncio.sleep(LOG_FOLLOW_INTERVAL)
+            ended = not process.running
+            lines, seen = process.output.since(seen)
+            for stream, line in lines:
+                await send({"event": "log", "stream": stream, "line": line})
+            if ended:
+                await send({"event": "result", "ok": True, "returncode": getattr(process, "returncode", None),
+                            "next": seen, "final": True})
+                break
+    
+    async def _cmd_subscribe(self, request, send):
+        events = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE)
+        self.subscribers.add(events)
+        try:
+            await send({"event": "subscribed", "ok": True})
+            while True:
+                await send(await events.get())
+        finally:
+            self.subscribers.discard(events)
+
+
+def request(message, address=None, timeout=None):
+    """Envia um pedido ao launcher aberto e gera as respostas até a final
+    
+    Usa o endereço e o token de "control.json" se `address` não for dado.
+    Lança ControlError se não houver launcher atendendo ou se passar
+    `timeout` segundos sem resposta (None espera sem limite).
+    """
+    address = address or read_address()
+    if not address:
+        raise ControlError("Nenhum launcher com o servidor de controle ativo "
+                           "(ative \"_settings.control\" e abra o launcher)")
+    try:
+        if address.get("socket"):
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.settimeout(timeout)
+            client.connect(address["socket"])
+        else:
+            client = socket.create_connection((address["host"], address["port"]), timeout=timeout)
+    except OSError as e:
+        raise ControlError(f"Launcher não responde em {address.get('socket') or address.get('port')}: {e}")
+    
+    message = dict(message)
+    if address.get("token"):
+        message.setdefault("token", address["token"])
+    with client, client.makefile('r', encoding='utf-8') as replies:
+        try:
+            client.sendall((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+            for line in replies:
+                record = json.loads(line)
+                yield record
+                if record.get("final"):
+                    return
+        except socket.timeout:
+            raise ControlError(f"O launcher não respondeu em {timeout} s")
+    raise ControlError("Conexão encerrada pelo launcher")
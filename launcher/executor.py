@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Execução das ações de uma opção como um grafo de dependências
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Número padrão de ações executadas ao mesmo tempo (ações são quase sempre
+# espera por processos externos, então não depende do número de CPUs)
+DEFAULT_MAX_WORKERS = 4
+
+# Ações pesadas (instalações, builds) ao mesmo tempo em todo o launcher: essas
+# sim disputam CPU e disco
+DEFAULT_MAX_HEAVY = os.cpu_count() or 2
+
+
+def action_id(action, index):
+    """Retorna o id de uma ação (explícito ou derivado da posição)"""
+    return str(action.get("id", f"#{index + 1}"))
+
+
+def build_action_graph(actions):
+    """Monta o grafo de dependências de uma lista de ações
+    
+    Se nenhuma ação declarar "depends_on", cada ação depende da anterior e a
+    ordem original é mantida. Caso contrário, ações sem "depends_on" não têm
+    dependências e podem rodar em paralelo.
+    
+    Retorna (ids, deps) com os ids em ordem topológica estável.
+    """
+    ids = []
+    for index, action in enumerate(actions):
+        node_id = action_id(action, index)
+        if node_id in ids:
+            raise ValueError(f"ID de ação duplicado: {node_id}")
+        ids.append(node_id)
+    
+    explicit = any("depends_on" in action for action in actions)
+    deps = {}
+    for index, action in enumerate(actions):
+        node_id = ids[index]
+        if not explicit:
+            deps[node_id] = [ids[index - 1]] if index else []
+            continue
+        
+        depends_on = action.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        node_deps = []
+        for dep in depends_on:
+            dep = str(dep)
+            if dep not in ids:
+                raise ValueError(f"Ação '{node_id}' depende de ação inexistente: {dep}")
+            if dep not in node_deps:
+                node_deps.append(dep)
+        deps[node_id] = node_deps
+    
+    # Ordenação topológica (Kahn) mantendo a ordem da lista como desempate
+    remaining = {node_id: set(node_deps) for node_id, node_deps in deps.items()}
+    order = []
+    while len(order) < len(ids):
+        ready = [node_id for node_id in ids
+                 if node_id in remaining and not remaining[node_id]]
+        if not ready:
+            cycle = ", ".join(node_id for node_id in ids if node_id in remaining)
+            raise ValueError(f"Dependência circular entre ações: {cycle}")
+        for node_id in ready:
+            del remaining[node_id]
+            order.append(node_id)
+        for node_deps in remaining.values():
+            node_deps.difference_update(ready)
+    
+    return order, deps
+
+
+class ActionExecutor:
+    """Executa ações respeitando dependências em um pool limitado de threads"""
+    
+    def __init__(self, actions, run_action, max_workers=None, on_progress=None,
+                 tracer=None, parent_span=None):
+        self.order, self.deps = build_action_graph(actions)
+        self.actions = {action_id(action, index): action
+                        for index, action in enumerate(actions)}
+        self.run_action = run_action
+        self.max_workers = max(1, int(max_workers or DEFAULT_MAX_WORKERS))
+        self.on_progress = on_progress
+        # Rastreamento opcional (launcher.trace.Tracer): um span por ação
+        self.tracer = tracer
+        self.parent_span = parent_span
+    
+    @property
+    def total(self):
+        return len(self.order)
+    
+    def run(self):
+        """Executa o grafo e retorna o número de ações concluídas
+        
+        No primeiro erro nenhuma nova ação é iniciada; as que já estão
+        rodando terminam e o erro é propagado.
+        """
+        remaining = {node_id: set(node_deps) for node_id, node_deps in self.deps.items()}
+        dependents = {node_id: [] for node_id in self.order}
+        for node_id in self.order:
+            for dep in self.deps[node_id]:
+                dependents[dep].append(node_id)
+        
+        ready = [node_id for node_id in self.order if not remaining[node_id]]
+        running = {}
+        done = 0
+        error = None
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="acao") as pool:
+            while running or (ready and error is None):
+                while ready and error is None:
+                    node_id = ready.pop(0)
+                    future = pool.submit(self._run_node, node_id, self._queue_span(node_id))
+                    running[future] = node_id
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node_id = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        if error is None:
+                            error = exc
+                        continue
+                    
+                    done += 1
+                    if self.on_progress:
+                        self.on_progress(done, self.total, self.actions[node_id])
+                    
+                    for child in dependents[node_id]:
+                        remaining[child].discard(node_id)
+                        if not remaining[child]:
+                            ready.append(child)
+                # Mantém a ordem da configuração entre ações liberadas juntas
+                ready.sort(key=self.order.index)
+        
+        if error is not None:
+            raise error
+        return done
+    
+    def _queue_span(self, node_id):
+        if self.tracer is None:
+            return None
+        return self.tracer.action_span(self.parent_span, self.actions[node_id], node_id)
+    
+    def _run_node(self, node_id, span):
+        """Executa uma ação na thread do pool, fechando o span dela"""
+        action = self.actions[node_id]
+        if span is None:
+            return self.run_action(action)
+        
+        self.tracer.started(span)
+        try:
+            result = self.run_action(action)
+        except BaseException as e:
+            self.tracer.finish_action(span, error=e)
+            raise
+        self.tracer.finish_action(span, result)
+        return result
+
+
+class ConcurrencyLimit:
+    """Semáforo com limite ajustável, compartilhado por todas as execuções"""
+    
+    def __init__(self, limit=DEFAULT_MAX_HEAVY):
+        self.condition = threading.Condition()
+        self._limit = max(1, int(limit))
+        self.active = 0
+    
+    @property
+    def limit(self):
+        return self._limit
+    
+    @limit.setter
+    def limit(self, value):
+        with self.condition:
+            self._limit = max(1, int(value))
+            self.condition.notify_all()
+    
+    def try_acquire(self):
+        """Ocupa uma vaga se houver uma livre agora"""
+        with self.condition:
+            if self.active < self._limit:
+                self.active += 1
+                return True
+            return False
+    
+    def acquire(self):
+        with self.condition:
+            while self.active >= self._limit:
+                self.condition.wait()
+            self.active += 1
+    
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify()
+
+
+class BatchExecutor:
+    """Executa as ações de várias opções ao mesmo tempo, somando o progresso
+    
+    Cada opção continua com seu próprio ActionExecutor (dependências e erro
+    isolados); `on_progress(done, total, action)` recebe os totais do lote.
+    """
+    
+    def __init__(self, executors, on_progress=None):
+        self.executors = list(executors)
+        self.on_progress = on_progress
+        self.done = 0
+        self.lock = threading.Lock()
+        for executor in self.executors:
+            executor.on_progress = self._progress_for(executor.on_progress)
+    
+    @property
+    def total(self):
+        return sum(executor.total for executor in self.executors)
+    
+    def _progress_for(self, own_progress):
+        def on_progress(done, total, action):
+            if own_progress:
+                own_progress(done, total, action)
+            with self.lock:
+                self.done += 1
+                if self.on_progress:
+                    self.on_progress(self.done, self.total, action)
+        return on_progress
+    
+    def run(self):
+        """Executa todas as opções e retorna o erro de cada uma (None se deu certo)"""
+        if not self.executors:
+            return []
+        with ThreadPoolExecutor(max_workers=len(self.executors),
+                                thread_name_prefix="opcao") as pool:
+            futures = [pool.submit(executor.run) for executor in self.executors]
+        return [future.exception() for future in futures]
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico das execuções em SQLite, para saber onde otimizar o config.json
+
+Cada execução de opção vira uma linha em "history.sqlite3" no cache do
+usuário (duração até ficar pronta, resultado, ações puladas pelo cache) e
+cada ação dela outra (tempo na fila, duração, resultado). A gravação é feita
+por uma thread própria: quem executa as ações só coloca o span em uma fila,
+sem esperar o disco.
+
+Das execuções com sucesso saem o p50/p95 de cada opção e o aviso de
+regressão: a mediana das últimas `RECENT_RUNS` comparada com a das
+`BASELINE_RUNS` anteriores (a linha de base anda junto com o histórico).
+"""
+
+import math
+import os
+import queue
+import sqlite3
+import threading
+
+from launcher.paths import cache_dir
+
+HISTORY_FILE = "history.sqlite3"
+
+# Execuções guardadas por opção (as mais antigas são apagadas)
+MAX_RUNS_PER_OPTION = 200
+
+# Execuções usadas no p50/p95
+WINDOW_RUNS = 50
+
+# Regressão: mediana das últimas execuções contra a das anteriores
+RECENT_RUNS = 3
+BASELINE_RUNS = 20
+MIN_BASELINE_RUNS = 5
+REGRESSION_FACTOR = 1.5
+MIN_REGRESSION_SECONDS = 0.5  # Ruído de décimos de segundo não é regressão
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    option TEXT NOT NULL,
+    project TEXT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    outcome TEXT NOT NULL,
+    actions INTEGER NOT NULL,
+    skipped INTEGER NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_option ON runs (option, id);
+CREATE TABLE IF NOT EXISTS actions (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    type TEXT,
+    outcome TEXT,
+    queued REAL NOT NULL,
+    duration REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS actions_run ON actions (run_id);
+"""
+
+
+def percentile(values, p):
+    """Percentil por posição mais próxima de uma lista já ordenada"""
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def median(values):
+    return percentile(sorted(values), 50)
+
+
+class OptionStats:
+    """Tempos de uma opção no histórico (segundos)"""
+    
+    def __init__(self, option, runs, failures, p50, p95, last, recent, baseline, hit_rate):
+        self.option = option
+        self.runs = runs  # Execuções com sucesso na janela
+        self.failures = failures
+        self.p50 = p50
+        self.p95 = p95
+        self.last = last
+        self.recent = recent
+        self.baseline = baseline
+        self.hit_rate = hit_rate  # Fração das ações puladas pelo cache
+    
+    @property
+    def regressed(self):
+        return (self.baseline is not None and self.recent is not None
+                and self.recent > self.baseline * REGRESSION_FACTOR
+                and self.recent - self.baseline >= MIN_REGRESSION_SECONDS)
+    
+    def to_dict(self):
+        return {
+            "option": self.option, "runs": self.runs, "failures": self.failures,
+            "p50": self.p50, "p95": self.p95, "last": self.last,
+            "recent": self.recent, "baseline": self.baseline,
+            "hit_rate": self.hit_rate, "regressed": self.regressed,
+        }
+
+
+def _run_row(span, started):
+    """Dados de um span de opção já encerrado, prontos para a fila de gravação"""
+    actions = []
+    for child in list(span.children):
+        if child.start is None:
+            continue  # Nem chegou a rodar (uma ação anterior falhou)
+        ready = child.ready or child.end or child.start
+        actions.append((child.name, child.args.get("type"), child.outcome,
+                        child.start - child.queued, ready - child.start, child.args.get("error")))
+    return {
+        "option": span.name,
+        "project": span.args.get("project"),
+        "started": started,
+        "duration": span.end - span.start,
+        "outcome": span.outcome,
+        "error": span.args.get("error"),
+        "actions": actions,
+    }
+
+
+class RunHistory:
+    """Histórico em SQLite gravado em segundo plano"""
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.pending = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self._thread = None
+    
+    def _path(self):
+        return self.path or os.path.join(cache_dir(), HISTORY_FILE)
+    
+    def _connect(self):
+        connection = sqlite3.connect(self._path(), timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")  # Leituras não esperam a gravação
+        connection.execute("PRAGMA foreign_keys=ON")
+        connection.executescript(SCHEMA)
+        return connection
+    
+    def record(self, span, started):
+        """Enfileira uma execução de opção encerrada (`started` em hora de parede)"""
+        self.pending.put(_run_row(span, started))
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="history", daemon=True)
+                self._thread.start()
+    
+    def close(self, timeout=5):
+        """Espera a fila ser gravada (o modo linha de comando sai logo depois)"""
+        with self.lock:
+            thread = self._thread
+        if thread is not None:
+            self.pending.put(None)
+            thread.join(timeout)
+    
+    def _writer(self):
+        try:
+            connection = self._connect()
+        except sqlite3.Error:
+            connection = None  # Sem disco para o histórico: as execuções seguem normalmente
+        while True:
+            run = self.pending.get()
+            if run is None:
+                break
+            if connection is None:
+                continue
+            try:
+                self._insert(connection, run)
+            except sqlite3.Error:
+                pass
+        with self.lock:
+            self._thread = None
+        if connection is not None:
+            connection.close()
+    
+    def _insert(self, connection, run):
+        actions = run["actions"]
+        with connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (option, project, started, duration, outcome, actions, skipped, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run["option"], run["project"], run["started"], run["duration"], run["outcome"],
+                 len(actions), sum(1 for action in actions if action[2] == "skipped"), run["error"])
+            )
+            connection.executemany(
+                "INSERT INTO actions (run_id, name, type, outcome, queued, duration, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(cursor.lastrowid,) + action for action in actions]
+            )
+            connection.execute(
+                "DELETE FROM runs WHERE option = ? AND id <= ("
+                "SELECT id FROM runs WHERE option = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (run["option"], run["option"], MAX_RUNS_PER_OPTION)
+            )
+    
+    def _query(self, sql, parameters=()):
+        if not os.path.exists(self._path()):
+            return []
+        connection = self._connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+    
+    def launches(self, since):
+        """(opção, início em hora de parede) das execuções desde `since`"""
+        return self._query("SELECT option, started FROM runs WHERE started >= ? ORDER BY started", (since,))
+    
+    def action_counts(self):
+        """{(opção, ação): (execuções, puladas pelo cache)} de todo o histórico"""
+        rows = self._query(
+            "SELECT runs.option, actions.name, COUNT(*), SUM(actions.outcome = 'skipped') "
+            "FROM actions JOIN runs ON runs.id = actions.run_id GROUP BY runs.option, actions.name"
+        )
+        return {(option, name): (count, skipped) for option, name, count, skipped in rows}
+    
+    def option_stats(self, prefix=None):
+        """OptionStats de cada opção com histórico (mais lentas primeiro)"""
+        # Comparação exata do começo: "_" e "%" nos nomes não são curingas
+        rows = self._query(
+            "SELECT option, duration, outcome, actions, skipped FROM runs "
+            "WHERE ? IS NULL OR option = ? OR substr(option, 1, length(?) + 1) = ? || '/' "
+            "ORDER BY option, id DESC",
+            (prefix, prefix, prefix, prefix)
+        )
+        grouped = {}
+        for option, duration, outcome, actions, skipped in rows:
+            grouped.setdefault(option, []).append((duration, outcome, actions, skipped))
+        
+        stats = []
+        for option, runs in grouped.items():
+            durations = [duration for duration, outcome, _, _ in runs if outcome == "ok"]
+            window = sorted(durations[:WINDOW_RUNS])
+            baseline = durations[RECENT_RUNS:RECENT_RUNS + BASELINE_RUNS]
+            total_actions = sum(actions for _, _, actions, _ in runs[:WINDOW_RUNS])
+            stats.append(OptionStats(
+                option, len(window),
+                sum(1 for _, outcome, _, _ in runs[:WINDOW_RUNS] if outcome != "ok"),
+                percentile(window, 50), percentile(window, 95),
+                durations[0] if durations else None,
+                median(durations[:RECENT_RUNS]) if durations else None,
+                median(baseline) if len(baseline) >= MIN_BASELINE_RUNS else None,
+                sum(skipped for _, _, _, skipped in runs[:WINDOW_RUNS]) / total_actions if total_actions else None,
+            ))
+        stats.sort(key=lambda item: item.p50 or 0, reverse=True)
+        return stats
+    
+    def slowest_actions(self, limit=10):
+        """Ações mais lentas de todos os projetos (média das vezes em que rodaram)
+        
+        Retorna dicts com opção, ação, tipo, execuções, média, máximo e a
+        fração das vezes em que o cache pulou a ação.
+        """
+        rows = self._query(
+            "SELECT runs.option, actions.name, actions.type, COUNT(*), "
+            "AVG(CASE WHEN actions.outcome != 'skipped' THEN actions.duration END), "
+            "MAX(actions.duration), AVG(actions.outcome = 'skipped'), AVG(actions.queued) "
+            "FROM actions JOIN runs ON runs.id = actions.run_id "
+            "GROUP BY runs.option, actions.name "
+            "HAVING AVG(CASE WHEN actions.outcome != 'skipped' THEN actions.duration END) IS NOT NULL "
+            "ORDER BY 5 DESC LIMIT ?",
+            (limit,)
+        )
+        return [{"option": option, "action": name, "type": action_type, "count": count,
+                 "mean": mean, "max": longest, "hit_rate": hit_rate, "queued": queued}
+                for option, name, action_type, count, mean, longest, hit_rate, queued in rows]
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Bomba de log dos serviços gerenciados
+
+O serviço não escreve direto no arquivo de log: escreve em pipes de um
+processo pequeno (o próprio launcher com `log-pump`), que repassa a saída
+para segmentos numerados ("<log>.0", "<log>.1"...). Um segmento só é criado
+depois que o anterior foi fechado, então quem lê sabe que um segmento acabou
+quando o próximo aparece; dos antigos ficam só os `KEEP_SEGMENTS` mais
+recentes. Assim o log tem tamanho limitado sem truncar um arquivo em que
+alguém está escrevendo (o que perde saída e, no Windows, nem é possível).
+
+A bomba fica no grupo de processos do serviço e, como ele, sobrevive ao
+launcher. Ela ignora os sinais de término: sai quando o serviço sai, depois
+de gravar o que ele escreveu ao encerrar. Só importa a biblioteca padrão,
+para iniciar rápido.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+PUMP_COMMAND = "log-pump"
+
+# Tamanho de um segmento (troca na primeira quebra de linha depois dele)
+SEGMENT_BYTES = 4 * 1024 * 1024
+
+# Segmentos guardados por log (o atual e os anteriores, para reanexar com histórico)
+KEEP_SEGMENTS = 2
+
+CHUNK = 64 * 1024
+
+
+def segment_path(base, index):
+    return f"{base}.{index}"
+
+
+def segments(base):
+    """Índices dos segmentos de um log que existem, em ordem"""
+    folder, name = os.path.split(base)
+    prefix = name + "."
+    try:
+        entries = os.listdir(folder)
+    except OSError:
+        return []
+    return sorted(int(entry[len(prefix):]) for entry in entries
+                  if entry.startswith(prefix) and entry[len(prefix):].isdigit())
+
+
+def remove_log(base):
+    """Apaga todos os segmentos de um log"""
+    for index in segments(base):
+        try:
+            os.remove(segment_path(base, index))
+        except OSError:
+            pass
+
+
+def pump_argv(args, shell, logs):
+    """Comando que inicia a bomba para o serviço `args` (logs: {stream: base})"""
+    spec = json.dumps({"args": args, "shell": shell, "logs": logs})
+    if getattr(sys, "frozen", False):
+        return [sys.executable, PUMP_COMMAND, spec]
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_launcher.py")
+    return [sys.executable, script, PUMP_COMMAND, spec]
+
+
+class SegmentWriter:
+    """Grava uma saída em segmentos, trocando de segmento entre linhas"""
+    
+    def __init__(self, base):
+        self.base = base
+        self.index = 0
+        self.size = 0
+        self.stale = []  # Segmentos antigos que ainda não puderam ser apagados
+        self.file = open(segment_path(base, 0), "ab", buffering=0)
+    
+    def write(self, data):
+        if self.size + len(data) >= SEGMENT_BYTES and b"\n" in data:
+            # Corta depois de uma quebra de linha: nenhum caractere fica dividido entre segmentos
+            cut = data.rindex(b"\n") + 1
+            self.file.write(data[:cut])
+            self._next()
+            data = data[cut:]
+        self.file.write(data)
+        self.size += len(data)
+    
+    def _next(self):
+        self.file.close()  # Fechado antes de o próximo existir
+        self.index += 1
+        self.size = 0
+        self.file = open(segment_path(self.base, self.index), "ab", buffering=0)
+        self.stale.append(self.index - KEEP_SEGMENTS)
+        # No Windows um segmento aberto pelo leitor não pode ser apagado: tenta de novo na próxima troca
+        self.stale = [index for index in self.stale if index >= 0 and not self._remove(index)]
+    
+    def _remove(self, index):
+        try:
+            os.remove(segment_path(self.base, index))
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+    
+    def close(self):
+        self.file.close()
+
+
+def _copy(pipe, base):
+    writer = SegmentWriter(base)
+    try:
+        while True:
+            data = os.read(pipe.fileno(), CHUNK)
+            if not data:
+                break
+            try:
+                writer.write(data)
+            except OSError:
+                pass  # Disco cheio: continua esvaziando o pipe para o serviço não travar
+    finally:
+        writer.close()
+
+
+def main(argv):
+    """Ponto de entrada da bomba (`project_launcher.py log-pump SPEC`)"""
+    spec = json.loads(argv[0])
+    # Um handler (e não SIG_IGN) volta ao padrão no exec: o serviço recebe os sinais normalmente
+    for name in ("SIGTERM", "SIGINT", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), lambda signum, frame: None)
+    
+    kwargs = {"creationflags": subprocess.CREATE_NO_WINDOW} if sys.platform == "win32" else {}
+    child = subprocess.Popen(spec["args"], shell=spec.get("shell", False), stdin=subprocess.DEVNULL,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs)
+    copiers = [threading.Thread(target=_copy, args=(pipe, spec["logs"][stream]))
+               for stream, pipe in (("stdout", child.stdout), ("stderr", child.stderr))]
+    for copier in copiers:
+        copier.start()
+    returncode = child.wait()
+    for copier in copiers:
+        copier.join()
+    # Morto por sinal: código de shell (128 + sinal)
+    return returncode if returncode >= 0 else 128 - returncode
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Consumo de CPU e memória dos serviços iniciados pelo launcher
+
+Uma thread lê, a cada `interval` segundos, a árvore de processos de cada
+serviço gerenciado e de cada sessão de shell: o processo, os filhos e tudo que
+ficou na mesma sessão do sistema (o launcher inicia cada serviço em uma sessão
+própria, então até netos "órfãos" continuam contando). No Linux os dados vêm
+do /proc, em uma só varredura para todos os serviços; nos outros sistemas é
+usado o psutil, se estiver instalado (sem ele o monitoramento fica desligado).
+
+CPU é em porcentagem de um núcleo (200% = dois núcleos ocupados), como no top.
+
+Limites opcionais, no serviço ou em "_settings.monitor", avisam ou encerram
+um serviço que fique acima do limite por `limit_seconds` seguidos:
+
+    "_settings": {"monitor": {"interval": 2, "cpu_limit": 150,
+                              "memory_limit": 2048, "limit_action": "warn"}}
+"""
+
+import os
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Intervalo entre amostras (segundos)
+DEFAULT_INTERVAL = 2.0
+
+# Tempo acima do limite até avisar/encerrar (picos de compilação não contam)
+DEFAULT_LIMIT_SECONDS = 30
+
+LIMIT_ACTIONS = ("warn", "stop")
+LIMIT_KEYS = ("cpu_limit", "memory_limit", "limit_seconds", "limit_action")
+
+MB = 1024 * 1024
+
+_PROC = "/proc"
+
+
+class Usage:
+    """Consumo de um serviço (ou a soma de um projeto) na última amostra"""
+    
+    def __init__(self, project=None, cpu=0.0, rss=0, children=0, over_limit=False):
+        self.project = project
+        self.cpu = cpu  # % de um núcleo
+        self.rss = rss  # bytes
+        self.children = children
+        self.over_limit = over_limit
+    
+    def add(self, other):
+        self.cpu += other.cpu
+        self.rss += other.rss
+        self.children += other.children
+        self.over_limit = self.over_limit or other.over_limit
+
+
+def by_project(usage):
+    """Soma {serviço: Usage} por projeto: {projeto: Usage}"""
+    totals = {}
+    for item in usage.values():
+        total = totals.setdefault(item.project, Usage(item.project))
+        total.add(item)
+    return totals
+
+
+def monitor_available():
+    """Se dá para medir os processos neste sistema"""
+    return os.path.isdir(_PROC) and sys.platform.startswith("linux") or psutil is not None
+
+
+def monitor_limits(defaults, action):
+    """Limites de um serviço ("_settings.monitor" sobrescrito pela ação)
+    
+    Retorna None se não houver limite de CPU nem de memória.
+    """
+    limits = {key: value for key, value in (defaults or {}).items() if key in LIMIT_KEYS}
+    limits.update({key: action[key] for key in LIMIT_KEYS if key in action})
+    if not limits.get("cpu_limit") and not limits.get("memory_limit"):
+        return None
+    return limits
+
+
+def _read_proc_table():
+    """Uma varredura do /proc: {pid: (ppid, sessão, CPU em segundos, rss em bytes)}"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    page = os.sysconf("SC_PAGE_SIZE")
+    table = {}
+    for entry in os.listdir(_PROC):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"{_PROC}/{entry}/stat", "rb") as f:
+                data = f.read()
+        except OSError:
+            continue  # Terminou durante a varredura
+        # O nome do processo (2º campo) pode ter espaços e parênteses
+        fields = data[data.rindex(b")") + 2:].split()
+        table[int(entry)] = (int(fields[1]), int(fields[3]),
+                             (int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * page)
+    return table
+
+
+def _proc_trees(pids):
+    """Árvores dos serviços pelo /proc: {pid do serviço: {pid: (CPU s, rss)}}"""
+    table = _read_proc_table()
+    children = {}
+    for pid, (ppid, _, _, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    
+    trees = {}
+    for root in pids:
+        if root not in table:
+            continue
+        # Descendentes mais quem ficou na sessão do serviço (órfãos adotados pelo init)
+        pending = [root] + [pid for pid, (_, sid, _, _) in table.items() if sid == root]
+        members = set()
+        while pending:
+            pid = pending.pop()
+            if pid not in members:
+                members.add(pid)
+                pending.extend(children.get(pid, ()))
+        trees[root] = {pid: table[pid][2:] for pid in members}
+    return trees
+
+
+def _psutil_trees(pids):
+    """Árvores dos serviços pelo psutil (Windows/macOS)"""
+    trees = {}
+    for root in pids:
+        try:
+            process = psutil.Process(root)
+            members = [process] + process.children(recursive=True)
+        except psutil.Error:
+            continue
+        tree = {}
+        for member in members:
+            try:
+                with member.oneshot():
+                    times = member.cpu_times()
+                    tree[member.pid] = (times.user + times.system, member.memory_info().rss)
+            except psutil.Error:
+                pass
+        if tree:
+            trees[root] = tree
+    return trees
+
+
+def read_trees(pids):
+    """{pid do serviço: {pid: (CPU em segundos, rss em bytes)}} dos que estão vivos"""
+    if os.path.isdir(_PROC) and sys.platform.startswith("linux"):
+        return _proc_trees(pids)
+    if psutil is not None:
+        return _psutil_trees(pids)
+    return {}
+
+
+class ResourceMonitor:
+    """Amostra o consumo dos processos devolvidos por `sources()`
+    
+    `sources` retorna objetos com `name`, `pid`, `running` e, opcionalmente,
+    `project`, `limits` e `stop()` (ManagedProcess/ShellSession). A thread só
+    é criada no primeiro start() e fica parada enquanto não houver serviço.
+    """
+    
+    def __init__(self, sources, interval=DEFAULT_INTERVAL):
+        self.sources = sources
+        self.interval = interval
+        self.limit_listeners = []  # listener(process, mensagem)
+        self.usage = {}  # nome do serviço -> Usage
+        self.generation = 0  # Muda a cada amostra (a interface só redesenha se mudou)
+        self.lock = threading.Lock()
+        self._previous = {}  # nome -> (pid, instante, {pid: CPU s})
+        self._breaches = {}  # nome -> [início do estouro, já avisado]
+        self._thread = None
+    
+    def start(self):
+        """Começa a amostrar em segundo plano (idempotente)"""
+        if self._thread is None and monitor_available():
+            self._thread = threading.Thread(target=self._loop, name="monitor", daemon=True)
+            self._thread.start()
+    
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception:
+                # Uma leitura com erro não pode parar o monitoramento
+                pass
+    
+    def sample(self):
+        """Lê uma amostra de todos os serviços em execução"""
+        processes = [process for process in self.sources() if process.running]
+        now = time.monotonic()
+        trees = read_trees([process.pid for process in processes]) if processes else {}
+        
+        usage, previous = {}, {}
+        for process in processes:
+            tree = trees.get(process.pid)
+            if not tree:
+                continue
+            cpu_times = {pid: cpu for pid, (cpu, _) in tree.items()}
+            cpu = 0.0
+            last = self._previous.get(process.name)
+            if last is not None and last[0] == process.pid and now > last[1]:
+                # Filhos novos contam a CPU toda: nasceram depois da última amostra
+                used = sum(max(0.0, seconds - last[2].get(pid, 0.0)) for pid, seconds in cpu_times.items())
+                cpu = 100.0 * used / (now - last[1])
+            previous[process.name] = (process.pid, now, cpu_times)
+            
+            item = Usage(getattr(process, "project", None), cpu,
+                         sum(rss for _, rss in tree.values()), len(tree) - 1)
+            item.over_limit = self._check_limits(process, item, now)
+            usage[process.name] = item
+        
+        self._previous = previous
+        for name in list(self._breaches):
+            if name not in usage:
+                del self._breaches[name]
+        with self.lock:
+            self.usage = usage
+            self.generation += 1
+    
+    def _check_limits(self, process, usage, now):
+        """Avisa (ou encerra) quem passou do limite por tempo demais"""
+        limits = getattr(process, "limits", None)
+        if not limits:
+            return False
+        over = []
+        if limits.get("cpu_limit") and usage.cpu > limits["cpu_limit"]:
+            over.append(f"CPU {usage.cpu:.0f}% (limite {limits['cpu_limit']}%)")
+        if limits.get("memory_limit") and usage.rss > limits["memory_limit"] * MB:
+            over.append(f"memória {usage.rss / MB:.0f} MB (limite {limits['memory_limit']} MB)")
+        if not over:
+            self._breaches.pop(process.name, None)
+            return False
+        
+        breach = self._breaches.setdefault(process.name, [now, False])
+        elapsed = now - breach[0]
+        if breach[1] or elapsed < limits.get("limit_seconds", DEFAULT_LIMIT_SECONDS):
+            return True
+        
+        # Um aviso por estouro; volta a avisar se sair do limite e passar de novo
+        breach[1] = True
+        stop = limits.get("limit_action") == "stop"
+        message = f"Serviço '{process.name}' acima do limite há {elapsed:.0f}s: {', '.join(over)}"
+        if stop:
+            message += "; encerrando"
+        for listener in self.limit_listeners:
+            try:
+                listener(process, message)
+            except Exception:
+                pass
+        if stop:
+            process.stop()
+        return True
+    
+    def snapshot(self):
+        """(geração, {serviço: Usage}) da última amostra"""
+        with self.lock:
+            return self.generation, dict(self.usage)
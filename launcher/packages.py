@@ -0,0 +1,391 @@
+# -*- coding: utf-8 -*-
+"""
+Caches de pacotes compartilhados entre projetos e worktrees
+
+Vários projetos do config.json (e worktrees do mesmo repositório) instalam
+quase as mesmas dependências. Com "cache" no projeto, os comandos que o
+launcher roda recebem variáveis de ambiente que apontam o cache do npm, o
+store do pnpm, o cache do pip e uma pasta de wheels (PIP_FIND_LINKS) para um
+lugar só, no cache do usuário: o que um projeto baixou os outros reaproveitam.
+
+`populate` enche esses caches a partir dos lockfiles e requirements dos
+projetos (em cópias temporárias, sem mexer nas pastas de verdade), para as
+instalações funcionarem sem rede; `report` mostra o espaço em disco de cada
+cache e quanto das dependências de cada projeto já está nele.
+
+    "_settings": {"cache": {"dir": "D:\\\\caches", "offline": "prefer"}},
+    "Projeto": {"path": "...", "cache": true}
+"""
+
+import base64
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from launcher.paths import cache_dir
+
+KINDS = ("npm", "pnpm", "pip", "wheelhouse")
+
+# Pasta de cada cache dentro da raiz
+FOLDERS = {"npm": "npm", "pnpm": "pnpm-store", "pip": "pip", "wheelhouse": "wheels"}
+
+# Raiz dentro da distro para run_wsl no Windows (o disco do Windows é lento no WSL)
+WSL_ROOT = "$HOME/.cache/project-launcher/packages"
+
+# "offline": False (rede normal), "prefer" (cache primeiro) ou True (sem rede)
+OFFLINE_MODES = (False, "prefer", True)
+
+NPM_LOCKFILES = ("package-lock.json", "npm-shrinkwrap.json")
+PNPM_LOCKFILE = "pnpm-lock.yaml"
+# Arquivos copiados para a pasta temporária da pré-população
+NPM_FILES = ("package.json", ".npmrc") + NPM_LOCKFILES
+PNPM_FILES = ("package.json", ".npmrc", "pnpm-workspace.yaml", PNPM_LOCKFILE)
+
+DEFAULT_REQUIREMENTS = "requirements.txt"
+REQUIREMENTS_PATTERN = re.compile(r"^requirements.*\.txt$")
+PIN_PATTERN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*===?\s*([^\s;#]+)")
+
+
+def package_config(project, settings=None):
+    """Caches de um projeto ("cache" do projeto com os padrões de _settings.cache)
+    
+    `"cache": true` liga todos os tipos; um objeto escolhe `kinds` e `offline`.
+    Retorna None se o projeto não usa os caches compartilhados.
+    """
+    value = project.get("cache")
+    if not value:
+        return None
+    defaults = settings or {}
+    config = value if isinstance(value, dict) else {}
+    kinds = config.get("kinds", defaults.get("kinds", KINDS))
+    return {
+        "kinds": [kind for kind in KINDS if kind in kinds],
+        "offline": config.get("offline", defaults.get("offline", False)),
+        "dir": defaults.get("dir"),
+        "python": defaults.get("python"),
+    }
+
+
+def cache_root(config=None):
+    """Raiz dos caches compartilhados (criada se não existir)"""
+    root = (config or {}).get("dir")
+    if not root:
+        return cache_dir("packages")
+    root = os.path.expanduser(os.path.expandvars(root))
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def kind_dir(config, kind, wsl=False):
+    """Pasta de um tipo de cache (`wsl`: caminho dentro da distro, com $HOME)"""
+    if wsl:
+        return f"{WSL_ROOT}/{FOLDERS[kind]}"
+    path = os.path.join(cache_root(config), FOLDERS[kind])
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def package_env(config, wsl=False):
+    """Variáveis de ambiente que apontam as ferramentas para os caches"""
+    kinds = config["kinds"]
+    env = {}
+    if "npm" in kinds:
+        env["npm_config_cache"] = kind_dir(config, "npm", wsl)
+    if "pnpm" in kinds:
+        env["npm_config_store_dir"] = kind_dir(config, "pnpm", wsl)
+    if "pip" in kinds:
+        env["PIP_CACHE_DIR"] = kind_dir(config, "pip", wsl)
+    if "wheelhouse" in kinds:
+        env["PIP_FIND_LINKS"] = kind_dir(config, "wheelhouse", wsl)
+    
+    offline = config["offline"]
+    if offline is True:
+        env["npm_config_offline"] = "true"
+        if "wheelhouse" in kinds:
+            env["PIP_NO_INDEX"] = "1"  # Só a wheelhouse
+    elif offline == "prefer":
+        env["npm_config_prefer_offline"] = "true"
+    return env
+
+
+def shell_exports(env):
+    """Prefixo de shell POSIX que exporta `env` (caminhos do WSL mantêm o $HOME)"""
+    if not env:
+        return ""
+    assignments = []
+    for name, value in env.items():
+        if value.startswith("$HOME/"):
+            assignments.append(f"{name}=$HOME/{shlex.quote(value[len('$HOME/'):])}")
+        else:
+            assignments.append(f"{name}={shlex.quote(value)}")
+    return f"export {' '.join(assignments)}; "
+
+
+def requirement_files(full_path, action):
+    """requirements*.txt de uma ação (dos "cache_inputs" ou o requirements.txt da pasta)"""
+    names = [name for name in action.get("cache_inputs", [])
+             if REQUIREMENTS_PATTERN.match(os.path.basename(name))]
+    if not names:
+        names = [DEFAULT_REQUIREMENTS]
+    return [os.path.join(full_path, name) for name in names if os.path.isfile(os.path.join(full_path, name))]
+
+
+def package_folders(project):
+    """Pastas das ações run_command/run_wsl do projeto que rodam no próprio sistema
+    
+    run_wsl no Windows fica de fora: as dependências de lá são as da distro.
+    Retorna {pasta: ação}, a primeira ação de cada pasta.
+    """
+    from launcher.actions import resolve_path
+    from launcher.config import iter_executable_options
+    
+    folders = {}
+    for _, option_data in iter_executable_options({"projeto": project}):
+        for action in option_data.get("actions", []):
+            if action.get("type") not in ("run_command", "run_wsl") or action.get("cache") is False:
+                continue
+            if action.get("type") == "run_wsl" and sys.platform == "win32":
+                continue
+            full_path = os.path.normpath(resolve_path(project["path"], action.get("path", "")))
+            if os.path.isdir(full_path):
+                folders.setdefault(full_path, action)
+    return folders
+
+
+def find_lockfile(folder, names):
+    for name in names:
+        if os.path.isfile(os.path.join(folder, name)):
+            return os.path.join(folder, name)
+    return None
+
+
+class PopulateStep:
+    """Um comando que enche um cache a partir de uma pasta de projeto"""
+    
+    def __init__(self, kind, folder, argv, description, files=()):
+        self.kind = kind
+        self.folder = folder
+        self.argv = argv
+        self.description = description
+        self.files = files  # Copiados para uma pasta temporária, onde o comando roda
+    
+    def to_dict(self):
+        return {"kind": self.kind, "folder": self.folder, "description": self.description}
+
+
+def populate_steps(project, config):
+    """Comandos que deixam as dependências do projeto nos caches"""
+    python = config.get("python") or shutil.which("python3") or shutil.which("python") or "python"
+    steps = []
+    for folder, action in package_folders(project).items():
+        if "npm" in config["kinds"] and find_lockfile(folder, NPM_LOCKFILES):
+            # npm ci em uma cópia do manifesto: baixa tudo do lockfile sem tocar no node_modules
+            steps.append(PopulateStep("npm", folder, [
+                shutil.which("npm") or "npm", "ci", "--ignore-scripts", "--no-audit", "--no-fund",
+                "--prefer-offline"], f"npm: {folder}", NPM_FILES))
+        if "pnpm" in config["kinds"] and find_lockfile(folder, (PNPM_LOCKFILE,)):
+            steps.append(PopulateStep("pnpm", folder, [shutil.which("pnpm") or "pnpm", "fetch", "--prefer-offline"],
+                                      f"pnpm: {folder}", PNPM_FILES))
+        if "wheelhouse" in config["kinds"]:
+            for requirements in requirement_files(folder, action):
+                steps.append(PopulateStep("wheelhouse", folder, [
+                    python, "-m", "pip", "wheel", "-r", requirements,
+                    "-w", kind_dir(config, "wheelhouse")], f"wheels: {requirements}"))
+    return steps
+
+
+def run_populate_step(step, config, status=None):
+    """Roda um passo com as variáveis dos caches; retorna (ok, últimas linhas de saída)"""
+    # Sem o modo offline: é aqui que os caches recebem o que baixar
+    env = dict(os.environ, **package_env(dict(config, offline=False)))
+    if status:
+        status(f"Populando {step.description}")
+    
+    workdir = tempfile.mkdtemp(prefix="launcher-cache-") if step.files else None
+    try:
+        if workdir:
+            for name in step.files:
+                if os.path.isfile(os.path.join(step.folder, name)):
+                    shutil.copy2(os.path.join(step.folder, name), workdir)
+        try:
+            result = subprocess.run(step.argv, cwd=workdir or step.folder, env=env,
+                                    stdin=subprocess.DEVNULL, capture_output=True,
+                                    text=True, encoding="utf-8", errors="replace")
+        except OSError as e:
+            return False, str(e)
+        output = (result.stdout + result.stderr).strip().splitlines()
+        return result.returncode == 0, "\n".join(output[-5:])
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def disk_usage(path):
+    """(bytes, arquivos) de uma pasta, sem seguir links"""
+    total = files = 0
+    pending = [path]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+                    files += 1
+            except OSError:
+                pass
+    return total, files
+
+
+def npm_packages(lockfile):
+    """Integridades dos pacotes baixados de um package-lock.json (v1 a v3)"""
+    try:
+        with open(lockfile, 'r', encoding='utf-8') as f:
+            lock = json.load(f)
+    except (OSError, ValueError):
+        return []
+    
+    integrities = []
+    packages = lock.get("packages")
+    if isinstance(packages, dict):
+        for path, data in packages.items():
+            if path and not data.get("link") and data.get("integrity"):
+                integrities.append(data["integrity"])
+        return integrities
+    
+    def walk(dependencies):
+        for data in (dependencies or {}).values():
+            if data.get("integrity"):
+                integrities.append(data["integrity"])
+            walk(data.get("dependencies"))
+    walk(lock.get("dependencies"))
+    return integrities
+
+
+def npm_cached(cache, integrity):
+    """Se o conteúdo com essa integridade está no cache do npm (cacache)"""
+    for item in integrity.split():
+        algorithm, _, digest = item.partition("-")
+        try:
+            hexdigest = base64.b64decode(digest).hex()
+        except ValueError:
+            continue
+        path = os.path.join(cache, "_cacache", "content-v2", algorithm,
+                            hexdigest[:2], hexdigest[2:4], hexdigest[4:])
+        if os.path.isfile(path):
+            return True
+    return False
+
+
+def normalize_name(name):
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+
+def wheelhouse_index(folder):
+    """{(nome normalizado, versão)} dos arquivos da wheelhouse"""
+    found = set()
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return found
+    for name in names:
+        if name.endswith(".whl"):
+            parts = name[:-4].split("-")
+        elif name.endswith((".tar.gz", ".zip")):
+            parts = re.sub(r"\.(tar\.gz|zip)$", "", name).rsplit("-", 1)
+        else:
+            continue
+        if len(parts) >= 2:
+            found.add((normalize_name(parts[0]), parts[1]))
+    return found
+
+
+def pinned_requirements(requirements):
+    """(nome, versão) das linhas "pacote==versão" de um requirements.txt"""
+    pins = []
+    try:
+        with open(requirements, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return pins
+    for line in lines:
+        match = PIN_PATTERN.match(line.strip())
+        if match:
+            pins.append((normalize_name(match.group(1)), match.group(2)))
+    return pins
+
+
+def coverage(project, config):
+    """Quanto das dependências de um projeto já está nos caches
+    
+    Retorna {tipo: (no cache, total)} para o npm (pacotes do lockfile) e a
+    wheelhouse (versões fixadas nos requirements). O store do pnpm muda de
+    formato entre versões e só entra no espaço em disco.
+    """
+    result = {}
+    folders = package_folders(project)
+    if "npm" in config["kinds"]:
+        cache = kind_dir(config, "npm")
+        hits = total = 0
+        for folder in folders:
+            lockfile = find_lockfile(folder, NPM_LOCKFILES)
+            for integrity in npm_packages(lockfile) if lockfile else []:
+                total += 1
+                hits += npm_cached(cache, integrity)
+        if total:
+            result["npm"] = (hits, total)
+    if "wheelhouse" in config["kinds"]:
+        wheels = wheelhouse_index(kind_dir(config, "wheelhouse"))
+        hits = total = 0
+        for folder, action in folders.items():
+            for requirements in requirement_files(folder, action):
+                for pin in pinned_requirements(requirements):
+                    total += 1
+                    hits += pin in wheels
+        if total:
+            result["wheelhouse"] = (hits, total)
+    return result
+
+
+def cache_report(projects, settings=None, history=None):
+    """Espaço em disco dos caches e cobertura/aproveitamento por projeto
+    
+    `settings` é o "_settings.cache". Com `history` (launcher.history.RunHistory) entra também a fração das
+    instalações com "cache_inputs" que foram puladas pelos carimbos.
+    """
+    from launcher.actions import describe_action
+    from launcher.config import iter_executable_options
+    
+    counts = history.action_counts() if history else {}
+    report = {"root": cache_root(settings), "usage": {}, "projects": []}
+    for kind in KINDS:
+        size, files = disk_usage(kind_dir(settings, kind))
+        report["usage"][kind] = {"path": kind_dir(settings, kind), "bytes": size, "files": files}
+    
+    for name, project in projects.items():
+        config = package_config(project, settings)
+        if config is None:
+            continue
+        runs = skipped = 0
+        for option_path, option_data in iter_executable_options({name: project}):
+            for action in option_data.get("actions", []):
+                if action.get("cache_inputs"):
+                    total, hits = counts.get((option_path, describe_action(action)), (0, 0))
+                    runs += total
+                    skipped += hits
+        report["projects"].append({
+            "project": name, "kinds": config["kinds"], "offline": config["offline"],
+            "coverage": {kind: {"cached": hits, "total": total}
+                         for kind, (hits, total) in coverage(project, config).items()},
+            "installs": {"runs": runs, "skipped": skipped},
+        })
+    return report
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de todas as opções executáveis para busca aproximada (paleta Ctrl+P)
+"""
+
+import heapq
+
+from launcher.config import iter_executable_options
+
+# Caracteres que iniciam uma "palavra" no caminho
+_WORD_BREAKS = " /-_."
+
+
+def _find_break(text, start):
+    for position in range(start, len(text)):
+        if text[position] in _WORD_BREAKS:
+            return position
+    return -1
+
+
+def fuzzy_score(query, text):
+    """Pontua `text` para `query` (ambos em minúsculas); None se não casar
+    
+    Todos os caracteres da busca precisam aparecer em ordem; um espaço casa
+    com qualquer separador ("super front" acha "super/frontend"). Sequências
+    contínuas, inícios de palavra e textos curtos ganham mais pontos.
+    """
+    score = 0
+    position = -1
+    previous = -2
+    for char in query:
+        if char == " ":
+            position = _find_break(text, position + 1)
+        else:
+            position = text.find(char, position + 1)
+        if position < 0:
+            return None
+        if position == previous + 1:
+            score += 5
+        if position == 0 or text[position - 1] in _WORD_BREAKS:
+            score += 3
+        previous = position
+    
+    if query in text:
+        score += 10
+        # Casamento no último nível do caminho vale mais
+        if query in text[text.rfind("/") + 1:]:
+            score += 10
+    return score - len(text) * 0.01
+
+
+class OptionIndex:
+    """Lista achatada de caminhos executáveis de todos os projetos"""
+    
+    def __init__(self, projects):
+        self.entries = [(path, path.lower()) for path, _ in iter_executable_options(projects)]
+        self._last_query = None
+        self._last_candidates = None
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def search(self, query, limit=50):
+        """Retorna até `limit` caminhos ordenados pela pontuação"""
+        query = query.lower().strip()
+        if not query:
+            return [path for path, _ in self.entries[:limit]]
+        
+        # Ao digitar mais uma letra, só quem casava antes pode casar agora
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_candidates
+        else:
+            candidates = range(len(self.entries))
+        
+        matches = []
+        for i in candidates:
+            score = fuzzy_score(query, self.entries[i][1])
+            if score is not None:
+                matches.append((score, -i))
+        
+        self._last_query = query
+        self._last_candidates = sorted(-i for _, i in matches)
+        
+        best = heapq.nlargest(limit, matches)
+        return [self.entries[-i][0] for _, i in best]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Diretórios do launcher fora da pasta do programa
+"""
+
+import os
+import sys
+
+APP_NAME = "project-launcher"
+
+
+def cache_dir(*parts):
+    """Diretório de cache do usuário (criado se não existir)"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        root = os.path.join(base, "ProjectLauncher", "Cache")
+    elif sys.platform == "darwin":
+        root = os.path.join(os.path.expanduser("~/Library/Caches"), "ProjectLauncher")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        root = os.path.join(base, APP_NAME)
+    
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
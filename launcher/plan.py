@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Planejamento da execução: junta as opções escolhidas e tira o trabalho repetido
+
+Antes de executar, as ações de cada opção passam por duas otimizações:
+
+- aberturas repetidas (mesmo editor/caminho, mesma ferramenta) são removidas,
+  inclusive entre opções do mesmo lote e contra editores já abertos nesta sessão;
+- comandos consecutivos no mesmo sub-caminho (e no mesmo modo) marcados com
+  "merge": true viram um só, ou seja, uma única janela de terminal ou
+  execução na sessão. Sem a marca eles continuam separados: unidos com "&&",
+  um servidor no primeiro comando impediria o seguinte de rodar.
+
+O modo padrão global ("_settings.mode") também é resolvido aqui: ações sem
+"mode" em projetos sem "mode" saem do plano com o modo explícito.
+"""
+
+import os
+
+from launcher.actions import MODE_MANAGED, action_mode, describe_action, resolve_path
+from launcher.config import PATH_SEPARATOR
+from launcher.executor import action_id
+
+# Chaves permitidas em comandos que podem ser unidos; qualquer outra (id,
+# depends_on, cache_inputs, name...) muda o significado e impede a junção
+MERGEABLE_KEYS = {
+    "run_command": {"type", "command", "path", "mode", "merge"},
+    "run_wsl": {"type", "commands", "path", "mode", "merge"},
+}
+
+
+class PlanEntry:
+    """Ações otimizadas de uma opção do lote"""
+    
+    def __init__(self, option_path, project_name, project, actions, original_count, notes):
+        self.option_path = option_path
+        self.project_name = project_name
+        self.project = project
+        self.actions = actions
+        self.original_count = original_count
+        self.notes = notes  # O que foi removido ou unido, para a pré-visualização
+    
+    def to_dict(self):
+        return {
+            "option": self.option_path,
+            "actions": [describe_action(action) for action in self.actions],
+            "original_count": self.original_count,
+            "notes": self.notes,
+        }
+
+
+def open_key(project, action):
+    """Identifica o que uma ação de abertura abre (None se não for abertura)"""
+    action_type = action.get("type")
+    if action_type == "open_cursor":
+        return ("open_cursor", os.path.normpath(resolve_path(project["path"], action.get("path", ""))))
+    if action_type in ("open_postman", "open_dbeaver"):
+        return (action_type,)
+    if action_type == "open_tool":
+        path = action.get("path")
+        full_path = os.path.normpath(resolve_path(project["path"], path)) if path is not None else None
+        return ("open_tool", action.get("tool"), tuple(action.get("args", [])), full_path)
+    if action_type == "open_terminal":
+        return ("open_terminal", os.path.normpath(resolve_path(project["path"], action.get("path", ""))))
+    return None
+
+
+def _depends_on(action):
+    depends_on = action.get("depends_on") or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    return [str(dep) for dep in depends_on]
+
+
+def drop_duplicate_opens(project, actions, seen, opened_editors, notes):
+    """Remove aberturas já feitas no lote (`seen`) ou editores já abertos na sessão
+    
+    Quem dependia de uma ação removida passa a depender das dependências dela.
+    """
+    explicit = any("depends_on" in action for action in actions)
+    if explicit:
+        # Fixa os ids: os implícitos ("#N") mudariam com as remoções
+        actions = [dict(action, id=action_id(action, index)) for index, action in enumerate(actions)]
+    
+    kept, replaced = [], {}
+    for action in actions:
+        key = open_key(project, action)
+        if key is None:
+            kept.append(action)
+            continue
+        if key in seen:
+            notes.append(f"Removido (repetido no lote): {describe_action(action)}")
+        elif key[0] == "open_cursor" and key[1] in opened_editors:
+            notes.append(f"Removido (já aberto nesta sessão): {describe_action(action)}")
+        else:
+            seen.add(key)
+            kept.append(action)
+            continue
+        if explicit:
+            replaced[str(action["id"])] = _depends_on(action)
+    
+    if not replaced:
+        return kept
+    
+    def rewire(dep, visiting=()):
+        if dep not in replaced or dep in visiting:
+            return [dep]
+        result = []
+        for parent in replaced[dep]:
+            result.extend(rewire(parent, visiting + (dep,)))
+        return result
+    
+    for action in kept:
+        if "depends_on" in action:
+            deps = []
+            for dep in _depends_on(action):
+                for new_dep in rewire(dep):
+                    if new_dep not in deps:
+                        deps.append(new_dep)
+            action["depends_on"] = deps
+    return kept
+
+
+def _mergeable(project, action):
+    allowed = MERGEABLE_KEYS.get(action.get("type"))
+    if allowed is None or not set(action) <= allowed or action.get("merge") is not True:
+        return False
+    try:
+        return action_mode(project, action) != MODE_MANAGED
+    except ValueError:
+        return False
+
+
+def merge_commands(project, actions, notes):
+    """Une comandos consecutivos do mesmo tipo, sub-caminho e modo
+    
+    Só comandos com "merge": true (os dois lados) e só em opções sem
+    "depends_on" (cadeia implícita), em que "consecutivo" significa "um
+    depois do outro". Serviços gerenciados não são unidos: cada um tem sua
+    aba de log.
+    """
+    if any("depends_on" in action for action in actions):
+        return actions
+    
+    merged = []
+    for action in actions:
+        previous = merged[-1] if merged else None
+        if (previous is not None and _mergeable(project, previous) and _mergeable(project, action)
+                and previous["type"] == action["type"]
+                and previous.get("path", "") == action.get("path", "")
+                and action_mode(project, previous) == action_mode(project, action)):
+            if action["type"] == "run_command":
+                combined = dict(previous, command=f"{previous.get('command', '')} && {action.get('command', '')}")
+            else:
+                commands = []
+                for item in (previous.get("commands", []), action.get("commands", [])):
+                    commands.extend(item if isinstance(item, list) else [item])
+                combined = dict(previous, commands=commands)
+            notes.append(f"Unidos em um só: {describe_action(previous)} + {describe_action(action)}")
+            merged[-1] = combined
+            continue
+        merged.append(action)
+    return merged
+
+
+# Ações que seguem o "mode" (do projeto ou global)
+MODE_TYPES = ("run_command", "run_wsl", "open_terminal")
+
+
+def apply_default_mode(project, actions, default_mode):
+    """Preenche o modo global nas ações que não escolheram nenhum"""
+    if not default_mode or project.get("mode"):
+        return
+    for action in actions:
+        if action.get("type") in MODE_TYPES and not action.get("mode"):
+            action["mode"] = default_mode
+
+
+def build_plan(projects, options, opened_editors=(), optimize=True, default_mode=None):
+    """Monta o plano de um lote de opções
+    
+    `options` é uma lista de (caminho da opção, dados da opção). Retorna uma
+    lista de PlanEntry na mesma ordem; a primeira ocorrência de uma abertura
+    repetida é a que fica. `default_mode` é o "_settings.mode".
+    """
+    entries, seen = [], set()
+    for option_path, option_data in options:
+        project_name = option_path.split(PATH_SEPARATOR, 1)[0]
+        project = projects[project_name]
+        actions = [dict(action) for action in option_data.get("actions", [])]
+        notes = []
+        apply_default_mode(project, actions, default_mode)
+        if optimize:
+            actions = drop_duplicate_opens(project, actions, seen, opened_editors, notes)
+            actions = merge_commands(project, actions, notes)
+        entries.append(PlanEntry(option_path, project_name, project, actions,
+                                 len(option_data.get("actions", [])), notes))
+    return entries
+
+
+def describe_plan(entries):
+    """Texto da pré-visualização do plano"""
+    lines = []
+    for entry in entries:
+        removed = entry.original_count - len(entry.actions)
+        summary = f" ({removed} a menos)" if removed else ""
+        lines.append(f"▶ {entry.option_path}{summary}")
+        for index, action in enumerate(entry.actions, start=1):
+            lines.append(f"   {index}. {describe_action(action)}")
+        if not entry.actions:
+            lines.append("   (nada a fazer)")
+        for note in entry.notes:
+            lines.append(f"   · {note}")
+    return "\n".join(lines)
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Verificação prévia do plano: caminhos, ferramentas, portas e campos
+
+Roda antes de qualquer ação, com todas as verificações ao mesmo tempo
+(caminhos em rede/WSL e resolução de nomes não se enfileiram), e junta todos
+os problemas em uma única lista.
+"""
+
+import os
+import re
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from launcher.actions import (MODE_MANAGED, MODE_TERMINAL, MODE_TMUX, PROBE_TYPES, action_mode,
+                              describe_action, resolve_path, service_name)
+from launcher.monitor import LIMIT_ACTIONS
+from launcher.tools import EDITORS, TERMINALS
+
+# Verificações simultâneas (quase todas são espera de disco ou de rede)
+MAX_CHECKS = 32
+
+# Campos obrigatórios de cada tipo de ação
+REQUIRED_FIELDS = {
+    "run_command": ("command",),
+    "run_wsl": ("commands",),
+    "open_tool": ("tool",),
+    "wait_port": ("port",),
+    "wait_http": ("url",),
+    "wait_file": ("path",),
+    "wait_output": ("service", "pattern"),
+}
+
+# Ações cujo "path" precisa existir antes de executar
+PATH_TYPES = ("open_cursor", "open_terminal", "open_tool", "run_command", "run_wsl")
+
+
+class PreflightError(Exception):
+    """Problemas encontrados na verificação prévia"""
+    
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("; ".join(self.problems))
+
+
+def _check_path(full_path):
+    if not os.path.exists(full_path):
+        return f"Caminho não encontrado: {full_path}"
+
+
+def _check_tools(names, tools):
+    for name in names:
+        if tools.resolve(name) or (tools.spec(name) or {}).get("url"):
+            return None
+    if len(names) == 1:
+        return f"Ferramenta não encontrada: {names[0]}"
+    return f"Nenhuma ferramenta encontrada entre: {', '.join(names)}"
+
+
+def _check_host(host):
+    try:
+        socket.getaddrinfo(host, None)
+    except (socket.gaierror, UnicodeError) as e:
+        return f"Não foi possível resolver o endereço '{host}': {e}"
+
+
+def _number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_fields(project, action, services):
+    """Problemas de campos de uma ação (sem acessar disco nem rede)"""
+    problems = []
+    action_type = action.get("type")
+    for field in REQUIRED_FIELDS.get(action_type, ()):
+        if action.get(field) in (None, "", []):
+            problems.append(f"campo '{field}' ausente")
+    
+    if action_type in ("run_command", "run_wsl"):
+        try:
+            action_mode(project, action)
+        except ValueError as e:
+            problems.append(str(e))
+    if action.get("limit_action", "warn") not in LIMIT_ACTIONS:
+        problems.append("campo 'limit_action' deve ser 'warn' ou 'stop'")
+    for field in ("seconds", "timeout", "interval", "cpu_limit", "memory_limit", "limit_seconds"):
+        if field in action and not _number(action[field]):
+            problems.append(f"campo '{field}' deve ser um número")
+    
+    if action_type == "wait_port" and action.get("port") is not None:
+        try:
+            port = int(action["port"])
+        except (TypeError, ValueError):
+            port = 0
+        if not 0 < port < 65536:
+            problems.append(f"porta inválida: {action['port']}")
+    elif action_type == "wait_http" and action.get("url"):
+        parsed = urlparse(str(action["url"]))
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            problems.append(f"URL inválida: {action['url']}")
+    elif action_type == "wait_output" and action.get("pattern"):
+        try:
+            re.compile(action["pattern"])
+        except re.error as e:
+            problems.append(f"padrão inválido: {e}")
+        if action.get("service") and action["service"] not in services:
+            problems.append(f"serviço '{action['service']}' não é iniciado antes nesta opção")
+    return problems
+
+
+def _collect(entry, running_services):
+    """Separa as verificações de uma opção em campos (na hora) e E/S (em paralelo)
+    
+    Os rótulos são (índice da ação, texto), para ordenar os problemas.
+    """
+    project = entry.project
+    problems = []  # (índice, texto)
+    io_checks = []  # ((índice, texto), chave da verificação)
+    services = set(running_services)
+    
+    if not project.get("path"):
+        problems.append((0, f"{entry.option_path}: projeto sem 'path'"))
+    
+    for index, action in enumerate(entry.actions, start=1):
+        label = (index, f"{entry.option_path}, ação {index} ({describe_action(action)})")
+        for problem in check_fields(project, action, services):
+            problems.append((index, f"{label[1]}: {problem}"))
+        
+        action_type = action.get("type")
+        if action_type in PATH_TYPES and (action_type != "open_tool" or action.get("path") is not None):
+            io_checks.append((label, ("path", resolve_path(project["path"], action.get("path", "")))))
+        
+        if action_type == "open_cursor":
+            io_checks.append((label, ("tools", tuple(EDITORS))))
+        elif action_type in ("open_postman", "open_dbeaver"):
+            io_checks.append((label, ("tools", (action_type[len("open_"):],))))
+        elif action_type == "open_tool" and action.get("tool"):
+            io_checks.append((label, ("tools", (action["tool"],))))
+        elif action_type in ("open_terminal", "run_command", "run_wsl"):
+            try:
+                mode = action_mode(project, action)
+            except ValueError:
+                mode = None
+            if action_type == "run_wsl" and sys.platform == "win32":
+                io_checks.append((label, ("tools", ("wsl",))))
+            elif (action_type == "open_terminal" or mode == MODE_TERMINAL) and sys.platform.startswith("linux"):
+                io_checks.append((label, ("tools", tuple(TERMINALS))))
+            if mode == MODE_TMUX:
+                io_checks.append((label, ("tools", ("tmux",))))
+            if mode == MODE_MANAGED:
+                services.add(service_name(project, action))
+        elif action_type in PROBE_TYPES:
+            host = None
+            if action_type == "wait_port":
+                host = action.get("host", "localhost")
+            elif action_type == "wait_http" and action.get("url"):
+                host = urlparse(str(action["url"])).hostname
+            if host:
+                io_checks.append((label, ("host", host)))
+    return problems, io_checks
+
+
+def preflight(plan, tools, running_services=()):
+    """Verifica todas as opções do plano e retorna a lista de problemas
+    
+    Verificações repetidas (mesmo caminho, mesma ferramenta, mesmo host) são
+    feitas uma vez só; as de disco/rede rodam todas em paralelo.
+    """
+    problems, io_checks = [], []
+    for position, entry in enumerate(plan):
+        entry_problems, entry_checks = _collect(entry, running_services)
+        problems.extend(((position, index), text) for index, text in entry_problems)
+        io_checks.extend((((position, label[0]), label[1]), key) for label, key in entry_checks)
+    
+    unique = list(dict.fromkeys(key for _, key in io_checks))
+    if unique:
+        def run_check(key):
+            kind, target = key
+            if kind == "path":
+                return _check_path(target)
+            if kind == "tools":
+                return _check_tools(list(target), tools)
+            return _check_host(target)
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_CHECKS, len(unique)),
+                                thread_name_prefix="verificacao") as pool:
+            results = dict(zip(unique, pool.map(run_check, unique)))
+        
+        reported = set()
+        for (order, label), key in io_checks:
+            if results[key] and key not in reported:
+                reported.add(key)
+                problems.append((order, f"{label}: {results[key]}"))
+    
+    # Ordem da configuração (sort é estável: campos antes de E/S na mesma ação)
+    problems.sort(key=lambda problem: problem[0])
+    return [text for _, text in problems]
+
+
+def check_plan(plan, tools, running_services=()):
+    """Como preflight(), mas lança PreflightError se houver problemas"""
+    problems = preflight(plan, tools, running_services)
+    if problems:
+        raise PreflightError(problems)
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Pré-aquecimento das opções mais prováveis enquanto a máquina está ociosa
+
+Opcional ("_settings.prewarm"). O histórico de execuções (launcher.history)
+diz quais opções costumam ser abertas e em que horário; cada execução conta
+mais quanto mais recente e quanto mais perto da hora atual do dia. Com a
+máquina parada há `idle_seconds`, na tomada e com a CPU livre, as opções com
+maior pontuação têm os passos sem efeito visível adiantados:
+
+- instalações com "cache_inputs" cujo carimbo não vale mais (npm ci,
+  pip install...), rodadas em segundo plano com prioridade baixa e
+  carimbadas no sucesso; o lançamento de verdade pula a ação;
+- a partida da distro do WSL (Windows);
+- a localização das ferramentas (editores, terminais, tmux...).
+
+Nada abre janela nem inicia serviço. Qualquer tecla ou clique no launcher, e
+qualquer execução, cancela o pré-aquecimento na hora. Uma ação fica de fora
+com "prewarm": false.
+
+    "_settings": {"prewarm": {"enabled": true, "idle_seconds": 300, "max_options": 3}}
+"""
+
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from launcher.actions import resolve_path, service_name
+from launcher.config import resolve_option
+from launcher.processes import popen_group_kwargs, stop_trees, terminate_tree
+from launcher.tools import EDITORS, TERMINALS
+
+# Máquina parada há quanto tempo antes de pré-aquecer (segundos)
+DEFAULT_IDLE_SECONDS = 300
+
+# Intervalo entre verificações (segundos)
+CHECK_INTERVAL = 60
+
+# Quantas opções pré-aquecer por rodada
+DEFAULT_MAX_OPTIONS = 3
+
+# Carga média por núcleo acima da qual a CPU é considerada ocupada
+DEFAULT_MAX_LOAD = 0.5
+
+# Pontuação: execuções dos últimos HISTORY_DAYS, valendo metade a cada HALF_LIFE_DAYS;
+# as que foram longe da hora atual (mais de HOUR_WINDOW horas) valem OFF_HOURS_WEIGHT
+HISTORY_DAYS = 30
+HALF_LIFE_DAYS = 7
+HOUR_WINDOW = 1.5
+OFF_HOURS_WEIGHT = 0.2
+MIN_SCORE = 1.5  # Menos que duas aberturas recentes neste horário não vale a CPU
+
+# Uma opção pré-aquecida não é verificada de novo antes disso (segundos)
+PREWARM_AGAIN_AFTER = 3600
+
+# Prazo para encerrar uma instalação cancelada (segundos)
+CANCEL_GRACE = 2.0
+
+DAY = 24 * 3600
+
+
+def likely_options(launches, now=None, limit=DEFAULT_MAX_OPTIONS):
+    """Opções mais prováveis agora, como [(caminho, pontuação)]
+    
+    `launches` são (caminho, início em hora de parede), como em
+    RunHistory.launches.
+    """
+    now = now or time.time()
+    current = time.localtime(now)
+    hour = current.tm_hour + current.tm_min / 60
+    scores = {}
+    for option, started in launches:
+        age_days = max(0.0, now - started) / DAY
+        moment = time.localtime(started)
+        distance = abs(moment.tm_hour + moment.tm_min / 60 - hour)
+        distance = min(distance, 24 - distance)  # 23h e 1h estão a 2 horas
+        weight = 1.0 if distance <= HOUR_WINDOW else OFF_HOURS_WEIGHT
+        scores[option] = scores.get(option, 0.0) + weight * 0.5 ** (age_days / HALF_LIFE_DAYS)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(option, score) for option, score in ranked if score >= MIN_SCORE][:limit]
+
+
+def system_idle_seconds():
+    """Segundos desde a última tecla/mouse em qualquer programa (None se não der para saber)"""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+            
+            info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO))
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+            return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000
+        if sys.platform == "darwin":
+            output = subprocess.run(["ioreg", "-c", "IOHIDSystem", "-d", "4"],
+                                    capture_output=True, text=True, timeout=5).stdout
+            match = re.search(r'"HIDIdleTime" = (\d+)', output)
+            return int(match.group(1)) / 1e9 if match else None
+        if os.environ.get("DISPLAY") and shutil.which("xprintidle"):
+            output = subprocess.run(["xprintidle"], capture_output=True, text=True, timeout=5).stdout
+            return int(output.strip()) / 1000
+    except (OSError, ValueError, subprocess.SubprocessError, AttributeError):
+        pass
+    return None
+
+
+def on_battery():
+    """Se a máquina está na bateria (na dúvida, não está)"""
+    if psutil is not None and hasattr(psutil, "sensors_battery"):
+        battery = psutil.sensors_battery()
+        return battery is not None and not battery.power_plugged
+    
+    if sys.platform == "darwin":
+        try:
+            output = subprocess.run(["pmset", "-g", "batt"], capture_output=True, text=True,
+                                    timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return False
+        return "Battery Power" in output
+    
+    supplies = "/sys/class/power_supply"
+    try:
+        names = os.listdir(supplies)
+    except OSError:
+        return False
+    plugged = None
+    for name in names:
+        try:
+            with open(os.path.join(supplies, name, "type")) as f:
+                kind = f.read().strip()
+            if kind == "Mains":
+                with open(os.path.join(supplies, name, "online")) as f:
+                    plugged = plugged or f.read().strip() == "1"
+        except OSError:
+            continue
+    return plugged is False
+
+
+def cpu_busy(max_load=DEFAULT_MAX_LOAD):
+    """Se a carga média por núcleo passou de `max_load` (sem como medir, não está)"""
+    cores = os.cpu_count() or 1
+    if hasattr(os, "getloadavg"):
+        return os.getloadavg()[0] / cores > max_load
+    if psutil is None:
+        return False
+    return psutil.cpu_percent(interval=0.5) / 100 > max_load
+
+
+def action_tools(project, action):
+    """Ferramentas que uma ação vai procurar, como listas de alternativas"""
+    action_type = action.get("type")
+    mode = action.get("mode") or project.get("mode")
+    if action_type in ("open_terminal", "run_command", "run_wsl"):
+        if mode == "tmux":
+            return [("tmux",)]
+        if action_type == "run_wsl" and sys.platform == "win32":
+            return [("wsl",)]
+        if mode in (None, "terminal") and sys.platform not in ("win32", "darwin"):
+            return [TERMINALS]
+        return []
+    if action_type == "open_cursor":
+        return [EDITORS]
+    if action_type == "open_postman":
+        return [("postman",)]
+    if action_type == "open_dbeaver":
+        return [("dbeaver",)]
+    if action_type == "open_tool":
+        return [(action.get("tool", ""),)]
+    return []
+
+
+class PrewarmStep:
+    """Um passo adiantável de uma opção"""
+    
+    def __init__(self, kind, option, description, project=None, action=None, tools=None):
+        self.kind = kind  # "install", "wsl" ou "tools"
+        self.option = option
+        self.description = description
+        self.project = project
+        self.action = action
+        self.tools = tools
+    
+    def to_dict(self):
+        return {"kind": self.kind, "option": self.option, "description": self.description}
+
+
+def prewarm_steps(option, project, option_data, runner):
+    """Passos sem efeito visível das ações de uma opção (instalações só se estiverem velhas)"""
+    steps, tools, wsl = [], [], False
+    for action in option_data.get("actions", []):
+        if action.get("prewarm") is False:
+            continue
+        for alternatives in action_tools(project, action):
+            if alternatives not in tools:
+                tools.append(alternatives)
+        if action.get("type") == "run_wsl" and sys.platform == "win32":
+            wsl = True
+        
+        if action.get("type") not in ("run_command", "run_wsl") or not action.get("cache_inputs"):
+            continue
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        if os.path.isdir(full_path) and not runner.stamps.is_fresh(project["path"], full_path, action):
+            steps.append(PrewarmStep("install", option, service_name(project, action), project, action))
+    
+    if wsl:
+        steps.insert(0, PrewarmStep("wsl", option, "Iniciando a distro do WSL"))
+    if tools:
+        names = ", ".join("/".join(alternatives) for alternatives in tools)
+        steps.insert(0, PrewarmStep("tools", option, f"Localizando {names}", tools=tools))
+    return steps
+
+
+class PrewarmScheduler:
+    """Thread que pré-aquece as opções mais prováveis com a máquina ociosa
+    
+    `projects()` retorna os projetos atuais; `status(mensagem)` recebe o
+    andamento. `touch()` marca uma interação do usuário (e cancela o que
+    estiver rodando); `cancel(wait=True)` também espera o cancelamento, antes
+    de uma execução de verdade mexer nas mesmas pastas.
+    """
+    
+    def __init__(self, runner, history, projects, status=None):
+        self.runner = runner
+        self.history = history
+        self.projects = projects
+        self.status = status or (lambda message: None)
+        self.settings = {}
+        self.last_input = time.monotonic()
+        self.round_started = math.inf  # Interação depois disso cancela a rodada
+        self.prewarmed = {}  # opção -> instante do último pré-aquecimento
+        self.cancelled = threading.Event()
+        self.idle = threading.Event()  # Nenhum pré-aquecimento em andamento
+        self.idle.set()
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self._thread = None
+    
+    @property
+    def enabled(self):
+        return bool(self.settings.get("enabled"))
+    
+    def configure(self, settings):
+        """Aplica "_settings.prewarm" (a thread só existe se estiver ligado)"""
+        self.settings = dict(settings or {})
+        if not self.enabled:
+            self.cancel()
+            return
+        with self.lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="prewarm", daemon=True)
+                self._thread.start()
+    
+    def touch(self):
+        """O usuário mexeu no launcher: o relógio de ociosidade recomeça"""
+        self.last_input = time.monotonic()
+        if not self.idle.is_set():
+            self.cancelled.set()
+    
+    def cancel(self, wait=False, timeout=CANCEL_GRACE + 1):
+        """Interrompe o pré-aquecimento em andamento"""
+        self.touch()
+        if wait:
+            self.idle.wait(timeout)
+    
+    def interrupted(self):
+        return self.cancelled.is_set() or self.last_input > self.round_started
+    
+    def ready(self):
+        """Motivo para não pré-aquecer agora, ou None se pode"""
+        idle_seconds = self.settings.get("idle_seconds", DEFAULT_IDLE_SECONDS)
+        if time.monotonic() - self.last_input < idle_seconds:
+            return "o launcher foi usado há pouco"
+        idle = system_idle_seconds()
+        if idle is not None and idle < idle_seconds:
+            return "o computador está em uso"
+        return self.busy()
+    
+    def busy(self):
+        """Motivo de recursos para não pré-aquecer (instalações, bateria, CPU), ou None"""
+        if self.runner.heavy.active:
+            return "há instalações em andamento"
+        if not self.settings.get("on_battery") and on_battery():
+            return "na bateria"
+        if cpu_busy(self.settings.get("max_load", DEFAULT_MAX_LOAD)):
+            return "CPU ocupada"
+        return None
+    
+    def _loop(self):
+        while True:
+            self.wakeup.wait(CHECK_INTERVAL)
+            self.wakeup.clear()
+            if not self.enabled or self.ready() is not None:
+                continue
+            try:
+                self.run_round()
+            except Exception as e:
+                # Pré-aquecer é só um atalho: erro aqui nunca chega ao usuário como falha
+                self.status(f"Pré-aquecimento interrompido: {str(e)}")
+    
+    def plan(self, now=None):
+        """[(opção, pontuação, passos)] das opções que valem pré-aquecer agora"""
+        now = now or time.time()
+        launches = self.history.launches(now - HISTORY_DAYS * DAY)
+        projects = self.projects()
+        planned = []
+        for option, score in likely_options(launches, now,
+                                            self.settings.get("max_options", DEFAULT_MAX_OPTIONS)):
+            try:
+                project_name, data = resolve_option(projects, option)
+            except KeyError:
+                continue  # Opção removida do config.json
+            steps = prewarm_steps(option, projects[project_name], data, self.runner)
+            if steps:
+                planned.append((option, score, steps))
+        return planned
+    
+    def run_round(self, force=False):
+        """Pré-aquece as opções prováveis; retorna os passos concluídos
+        
+        Com `force` opções pré-aquecidas há pouco entram de novo.
+        """
+        self.round_started = time.monotonic()
+        self.idle.clear()
+        self.cancelled.clear()
+        done = []
+        try:
+            for option, _, steps in self.plan():
+                if not force and time.monotonic() - self.prewarmed.get(option, -math.inf) < PREWARM_AGAIN_AFTER:
+                    continue
+                for step in steps:
+                    if self.interrupted():
+                        self.status("Pré-aquecimento cancelado")
+                        return done
+                    self.status(f"Pré-aquecendo {option}: {step.description}")
+                    if self._run_step(step):
+                        done.append(step)
+                if not self.interrupted():
+                    self.prewarmed[option] = time.monotonic()
+        finally:
+            self.round_started = math.inf
+            self.idle.set()
+        if done:
+            self.status(f"Pré-aquecido: {', '.join(sorted({step.option for step in done}))}")
+        return done
+    
+    def _run_step(self, step):
+        if step.kind == "tools":
+            for alternatives in step.tools:
+                self.runner.tools.first(alternatives)
+            return True
+        if step.kind == "wsl":
+            return self._run_quietly(self.runner.wsl_argv("true"), None, shell=False)
+        
+        project, action = step.project, step.action
+        full_path = resolve_path(project["path"], action.get("path", ""))
+        # Divide as vagas de ações pesadas com as execuções de verdade (e nunca espera por elas)
+        if not self.runner.heavy.try_acquire():
+            return False
+        try:
+            stamp = self.runner.stamps.prepare(project["path"], full_path, action)
+            args, shell, env = self.runner.process_args(project, action)
+            if self._run_quietly(args, full_path, shell, env):
+                self.runner.stamps.mark(stamp)
+                return True
+            return False
+        finally:
+            self.runner.heavy.release()
+    
+    def _run_quietly(self, args, cwd, shell, env=None):
+        """Roda um comando sem janela e com prioridade baixa; False se falhou ou foi cancelado"""
+        kwargs = popen_group_kwargs()
+        if sys.platform == "win32":
+            kwargs["creationflags"] |= subprocess.BELOW_NORMAL_PRIORITY_CLASS | subprocess.CREATE_NO_WINDOW
+        try:
+            process = subprocess.Popen(args, cwd=cwd, shell=shell, env=env, stdin=subprocess.DEVNULL,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs)
+        except OSError:
+            return False
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PGRP, process.pid, 10)
+            except OSError:
+                pass
+        
+        while process.poll() is None:
+            if self.cancelled.wait(0.1) or self.interrupted():
+                # O shell é filho daqui: esperar por ele (e não pelo grupo) já o recolhe
+                terminate_tree(process.pid)
+                try:
+                    process.wait(CANCEL_GRACE)
+                except subprocess.TimeoutExpired:
+                    pass
+                stop_trees([process.pid], grace=0)
+                process.wait()
+                return False
+        return process.returncode == 0
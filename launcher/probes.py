@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Sondas de prontidão: esperam um serviço ficar pronto em vez de um tempo fixo
+
+Todas as sondas verificam a condição a cada `interval` segundos e lançam
+TimeoutError se ela não for atendida em `timeout` segundos.
+"""
+
+import os
+import re
+import socket
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_INTERVAL = 0.5
+
+
+def poll(check, timeout, interval, description):
+    """Chama `check()` até retornar verdadeiro ou o tempo acabar"""
+    deadline = time.monotonic() + timeout
+    while True:
+        if check():
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Tempo esgotado ({timeout}s) aguardando {description}")
+        time.sleep(min(interval, remaining))
+
+
+def wait_port(host, port, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL):
+    """Espera uma porta TCP aceitar conexões"""
+    def check():
+        try:
+            with socket.create_connection((host, port), timeout=interval):
+                return True
+        except OSError:
+            return False
+    
+    poll(check, timeout, interval, f"a porta {host}:{port}")
+
+
+def wait_http(url, status=200, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL):
+    """Espera uma URL responder com o status HTTP esperado"""
+    def check():
+        try:
+            with urllib.request.urlopen(url, timeout=max(interval, 1)) as response:
+                return response.status == status
+        except urllib.error.HTTPError as e:
+            return e.code == status
+        except (urllib.error.URLError, OSError):
+            return False
+    
+    poll(check, timeout, interval, f"{url} responder {status}")
+
+
+def wait_file(path, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL):
+    """Espera um arquivo existir"""
+    poll(lambda: os.path.exists(path), timeout, interval, f"o arquivo {path}")
+
+
+def wait_output(process, pattern, timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL):
+    """Espera uma linha da saída de um processo gerenciado casar com `pattern`
+    
+    Considera também as linhas emitidas antes da sonda começar.
+    """
+    regex = re.compile(pattern)
+    state = {"seen": 0}
+    
+    def check():
+        lines, state["seen"] = process.output.since(state["seen"])
+        if any(regex.search(line) for _, line in lines):
+            return True
+        if not process.running:
+            raise RuntimeError(
+                f"Serviço '{process.name}' terminou (código {process.returncode}) "
+                f"sem exibir /{pattern}/"
+            )
+        return False
+    
+    poll(check, timeout, interval, f"/{pattern}/ na saída de '{process.name}'")
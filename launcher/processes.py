@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+"""
+Processos gerenciados: o launcher é dono do processo filho, acompanha
+stdout/stderr e guarda as últimas linhas de cada serviço em um buffer circular
+
+A saída vai para arquivos de log no cache do usuário, gravados por uma bomba
+de log (launcher.logpump) e não por pipes até o launcher, então o serviço
+continua rodando se o launcher fechar ou cair; na próxima abertura ele é
+reanexado pelo diário de serviços (launcher.store), com o log de volta.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+
+from launcher.logpump import pump_argv, remove_log, segment_path, segments
+from launcher.paths import cache_dir
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Número padrão de linhas mantidas por serviço
+DEFAULT_LOG_LINES = 5000
+
+# Espera entre leituras do log sem saída nova: começa curta e dobra até o máximo
+TAIL_MIN_INTERVAL = 0.02
+TAIL_MAX_INTERVAL = 0.25
+CHUNK_CHARS = 64 * 1024
+
+# Verificação de serviços reanexados (não são filhos: não dá para esperar com wait)
+ATTACHED_POLL = 1.0
+
+# Tempo entre o pedido de encerramento e o SIGKILL (segundos)
+DEFAULT_GRACE = 5.0
+
+
+def popen_group_kwargs():
+    """Argumentos do Popen para o filho ganhar um grupo de processos próprio"""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def terminate_tree(pid):
+    """Encerra um processo e todos os filhos dele"""
+    try:
+        if sys.platform == "win32":
+            subprocess.call(["taskkill", "/F", "/T", "/PID", str(pid)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            # O shell de `shell=True` não repassa o sinal para os filhos
+            os.killpg(pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def process_start_time(pid):
+    """Instante de início do processo segundo o sistema (None se não der para saber)"""
+    if sys.platform.startswith("linux"):
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return int(data[data.rindex(b")") + 2:].split()[19])
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return None
+    return None
+
+
+def _windows_pids():
+    """PIDs em execução no Windows (uma chamada ao tasklist para todos)"""
+    output = subprocess.run(["tasklist", "/NH", "/FO", "CSV"], capture_output=True, text=True,
+                            errors="replace").stdout
+    pids = set()
+    for line in output.splitlines():
+        fields = line.split('","')
+        if len(fields) > 1 and fields[1].isdigit():
+            pids.add(int(fields[1]))
+    return pids
+
+
+def pid_alive(pid):
+    """Se o processo existe"""
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if sys.platform == "win32":
+        return pid in _windows_pids()
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def tree_alive(pid):
+    """Se ainda resta algum processo do grupo liderado por `pid`
+    
+    No Windows não há grupo para consultar: vale o próprio processo.
+    """
+    if sys.platform == "win32":
+        return pid_alive(pid)
+    try:
+        os.killpg(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _signal_trees(pids, force):
+    """Pede o fim (ou mata, com `force`) de várias árvores sem esperar uma por uma"""
+    if sys.platform == "win32":
+        if force:
+            killers = [subprocess.Popen(["taskkill", "/F", "/T", "/PID", str(pid)],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                       for pid in pids]
+            for killer in killers:
+                killer.wait()
+            return
+        for pid in pids:
+            try:
+                # Equivalente ao SIGTERM para o grupo criado com CREATE_NEW_PROCESS_GROUP
+                os.kill(pid, signal.CTRL_BREAK_EVENT)
+            except OSError:
+                pass
+        return
+    
+    for pid in pids:
+        try:
+            os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+        except OSError:
+            pass
+
+
+def stop_trees(pids, grace=DEFAULT_GRACE, poll=0.05):
+    """Encerra várias árvores de processos ao mesmo tempo
+    
+    Todas recebem SIGTERM (CTRL_BREAK no Windows) de uma vez; o que ainda
+    estiver vivo depois de `grace` segundos recebe SIGKILL (taskkill /F).
+    Dez serviços levam no máximo `grace` segundos, não dez vezes isso.
+    Retorna os PIDs que precisaram ser mortos à força.
+    """
+    pids = list(dict.fromkeys(pids))
+    _signal_trees(pids, force=False)
+    
+    deadline = time.monotonic() + grace
+    while True:
+        if sys.platform == "win32":
+            running = _windows_pids()
+            pids = [pid for pid in pids if pid in running]
+        else:
+            pids = [pid for pid in pids if tree_alive(pid)]
+        if not pids or time.monotonic() >= deadline:
+            break
+        time.sleep(poll)
+    
+    if pids:
+        _signal_trees(pids, force=True)
+    return pids
+
+
+def new_log_paths():
+    """Logs (stdout e stderr) de um novo serviço (base dos segmentos)"""
+    prefix = os.path.join(cache_dir("logs"), uuid.uuid4().hex[:12])
+    return {"stdout": f"{prefix}.out", "stderr": f"{prefix}.err"}
+
+
+class OutputBuffer:
+    """Buffer circular de linhas com contador para leitura incremental"""
+    
+    def __init__(self, max_lines=DEFAULT_LOG_LINES):
+        self.lines = deque(maxlen=max_lines)
+        self.count = 0  # Total de linhas já recebidas (inclusive as descartadas)
+        self.lock = threading.Lock()
+    
+    def append(self, stream, line):
+        with self.lock:
+            self.lines.append((stream, line))
+            self.count += 1
+    
+    def since(self, seen):
+        """Retorna (linhas novas desde `seen`, novo contador)
+        
+        Se o leitor ficou para trás mais do que o tamanho do buffer, recebe
+        apenas as linhas que ainda estão guardadas.
+        """
+        with self.lock:
+            missing = self.count - seen
+            if missing <= 0:
+                return [], self.count
+            lines = list(self.lines)
+            return lines[-missing:] if missing < len(lines) else lines, self.count
+
+
+class ManagedProcess:
+    """Um serviço iniciado pelo launcher
+    
+    Com `attach` (um registro do diário de serviços) nada é iniciado: o
+    objeto passa a acompanhar um serviço que sobreviveu a uma execução
+    anterior do launcher. Nesse caso o código de saída não é conhecido
+    (`returncode` fica None depois do fim) e `attached` é True.
+    """
+    
+    def __init__(self, name, args, cwd, shell=False, max_lines=DEFAULT_LOG_LINES,
+                 on_output=None, on_exit=None, project=None, limits=None,
+                 option=None, ports=None, attach=None, env=None):
+        self.name = name
+        self.args = args
+        self.cwd = cwd
+        self.project = project  # Para somar o consumo por projeto
+        self.limits = limits  # Limites de CPU/memória (launcher.monitor)
+        self.option = option  # Opção que iniciou o serviço ("Projeto/Opção")
+        self.ports = list(ports or [])
+        self.output = OutputBuffer(max_lines)
+        self.returncode = None
+        self.finished = False
+        self.exited = threading.Event()  # Sinalizado após os avisos de término
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self._exit_callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._ended = threading.Event()  # O processo acabou: os leitores esvaziam o log e param
+        
+        self.attached = attach is not None
+        if self.attached:
+            self.popen = None
+            self.pid = attach["pid"]
+            self.logs = attach.get("logs") or {}
+        else:
+            self.logs = new_log_paths()
+            # Grupo de processos próprio (bomba de log + serviço) para encerrar a árvore inteira
+            kwargs = popen_group_kwargs()
+            if sys.platform == "win32":
+                kwargs["creationflags"] |= subprocess.CREATE_NO_WINDOW
+            self.popen = subprocess.Popen(
+                pump_argv(args, shell, self.logs), cwd=cwd, env=env,
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+            )
+            self.pid = self.popen.pid
+        
+        self._readers = [
+            threading.Thread(target=self._tail, args=(stream, path), daemon=True)
+            for stream, path in self.logs.items()
+        ]
+        for reader in self._readers:
+            reader.start()
+        threading.Thread(target=self._wait, daemon=True).start()
+    
+    @property
+    def running(self):
+        return not self.finished
+    
+    def _emit(self, stream, line):
+        self.output.append(stream, line)
+        if self.on_output:
+            try:
+                self.on_output(self, stream, line)
+            except Exception:
+                # Um ouvinte com erro não pode parar a leitura do log
+                pass
+    
+    def _feed(self, stream, partial, text):
+        """Emite as linhas completas de `partial + text` e retorna o resto"""
+        lines = (partial + text).split("\n")
+        for line in lines[:-1]:
+            self._emit(stream, line.rstrip("\r"))
+        return lines[-1]
+    
+    def _open_segment(self, base, index):
+        """Abre o primeiro segmento a partir de `index` (None: o processo acabou sem mais log)"""
+        interval = TAIL_MIN_INTERVAL
+        while True:
+            ended = self._ended.is_set()
+            # Segmentos que a bomba já apagou (leitor atrasado) ficam para trás
+            available = [item for item in segments(base) if index is None or item >= index]
+            if available:
+                try:
+                    return open(segment_path(base, available[0]), 'r', encoding="utf-8",
+                                errors="replace"), available[0]
+                except OSError:
+                    continue
+            if ended:
+                return None, index
+            self._ended.wait(interval)
+            interval = min(interval * 2, TAIL_MAX_INTERVAL)
+    
+    def _tail(self, stream, base):
+        """Acompanha os segmentos do log enquanto o processo roda (como `tail -f`)
+        
+        Um segmento só está completo quando o próximo já existe (a bomba
+        fecha um antes de criar o outro) ou quando o processo acabou; nos dois
+        casos é lido até o fim mais uma vez antes de passar adiante.
+        """
+        partial, index = "", None
+        while True:
+            log, index = self._open_segment(base, index)
+            if log is None:
+                if partial:
+                    self._emit(stream, partial.rstrip("\r"))
+                return
+            interval = TAIL_MIN_INTERVAL
+            with log:
+                while True:
+                    chunk = log.read(CHUNK_CHARS)
+                    if chunk:
+                        interval = TAIL_MIN_INTERVAL
+                        partial = self._feed(stream, partial, chunk)
+                        continue
+                    if self._ended.is_set() or os.path.exists(segment_path(base, index + 1)):
+                        partial = self._feed(stream, partial, log.read())
+                        index += 1
+                        break
+                    self._ended.wait(interval)
+                    interval = min(interval * 2, TAIL_MAX_INTERVAL)
+    
+    def _wait(self):
+        if self.attached:
+            # Não é filho deste processo: acompanha o grupo até ele sumir
+            while tree_alive(self.pid):
+                time.sleep(ATTACHED_POLL)
+            returncode = None
+        else:
+            returncode = self.popen.wait()
+        self._ended.set()
+        # Garante que a saída final foi lida antes de anunciar o término
+        for reader in self._readers:
+            reader.join()
+        for base in self.logs.values():
+            remove_log(base)
+        self.returncode = returncode
+        self.finished = True
+        try:
+            if self.on_exit:
+                self.on_exit(self, returncode)
+        finally:
+            with self._callbacks_lock:
+                callbacks, self._exit_callbacks = self._exit_callbacks, None
+                self.exited.set()
+            for callback in callbacks:
+                try:
+                    callback(self, returncode)
+                except Exception:
+                    pass
+    
+    def add_exit_callback(self, callback):
+        """Chama `callback(process, returncode)` quando o processo sair
+        
+        Se ele já saiu, o callback é chamado na hora.
+        """
+        with self._callbacks_lock:
+            if not self.exited.is_set():
+                self._exit_callbacks.append(callback)
+                return
+        callback(self, self.returncode)
+    
+    def stop(self):
+        """Pede o encerramento do serviço (e dos processos filhos dele)"""
+        if self.running:
+            terminate_tree(self.pid)
+
+
+class ProcessManager:
+    """Registro dos serviços gerenciados, um por nome
+    
+    Com um `store` (launcher.store.ServiceStore) cada início e fim de serviço
+    é anotado em disco, para reanexar depois.
+    """
+    
+    def __init__(self, max_lines=DEFAULT_LOG_LINES, store=None):
+        self.max_lines = max_lines
+        self.store = store
+        self.processes = {}
+        self.reserved = set()  # Nomes escolhidos cujo processo ainda está sendo iniciado
+        self.lock = threading.Lock()
+        self.output_listeners = []
+        self.exit_listeners = []
+    
+    def unique_name(self, name):
+        """Reserva um nome livre, reaproveitando o de serviços já encerrados
+        
+        A reserva vale até `_register`, para inícios simultâneos do mesmo
+        serviço (lotes, ramos paralelos) não ficarem com o mesmo nome.
+        """
+        with self.lock:
+            candidate, n = name, 2
+            while candidate in self.reserved or (candidate in self.processes
+                                                 and self.processes[candidate].running):
+                candidate = f"{name} ({n})"
+                n += 1
+            self.reserved.add(candidate)
+            return candidate
+    
+    def _register(self, name, process):
+        """Troca a reserva do nome pelo processo (None: o início falhou)"""
+        with self.lock:
+            self.reserved.discard(name)
+            if process is not None:
+                self.processes[name] = process
+    
+    def start(self, name, args, cwd, shell=False, max_lines=None, on_exit=None,
+              project=None, limits=None, option=None, ports=None, env=None):
+        """Inicia um serviço gerenciado e retorna o ManagedProcess
+        
+        `on_exit(process, returncode)` é chamado só para este processo, além
+        dos ouvintes globais. `env` (ambiente completo) substitui o herdado.
+        """
+        name = self.unique_name(name)
+        
+        def notify_exit(process, returncode):
+            if on_exit:
+                on_exit(process, returncode)
+            self._notify_exit(process, returncode)
+        
+        process = None
+        try:
+            process = ManagedProcess(
+                name, args, cwd, shell=shell,
+                max_lines=max_lines or self.max_lines,
+                on_output=self._notify_output,
+                on_exit=notify_exit,
+                project=project, limits=limits, option=option, ports=ports, env=env
+            )
+        finally:
+            self._register(name, process)
+        if self.store:
+            self.store.record_start(process)
+        return process
+    
+    def reattach(self):
+        """Volta a acompanhar os serviços do diário que ainda estão rodando
+        
+        Retorna os ManagedProcess reanexados.
+        """
+        if not self.store:
+            return []
+        with self.lock:
+            known = {process.pid for process in self.processes.values() if process.running}
+        
+        attached = []
+        for record in self.store.alive():
+            if record["pid"] in known:
+                continue
+            name = self.unique_name(record.get("name") or str(record["pid"]))
+            process = None
+            try:
+                process = ManagedProcess(
+                    name, None, record.get("cwd"),
+                    max_lines=self.max_lines,
+                    on_output=self._notify_output, on_exit=self._notify_exit,
+                    project=record.get("project"), option=record.get("option"),
+                    ports=record.get("ports"), attach=record
+                )
+            finally:
+                self._register(name, process)
+            attached.append(process)
+        return attached
+    
+    def get(self, name):
+        with self.lock:
+            return self.processes.get(name)
+    
+    def all(self):
+        with self.lock:
+            return list(self.processes.values())
+    
+    def running(self):
+        return [process for process in self.all() if process.running]
+    
+    def stop_all(self, grace=DEFAULT_GRACE):
+        """Encerra todos os serviços em execução, em paralelo (SIGKILL após `grace`)"""
+        return stop_trees([process.pid for process in self.running()], grace)
+    
+    def _notify_output(self, process, stream, line):
+        for listener in self.output_listeners:
+            listener(process, stream, line)
+    
+    def _notify_exit(self, process, returncode):
+        if self.store:
+            self.store.record_exit(process.pid)
+        for listener in self.exit_listeners:
+            listener(process, returncode)
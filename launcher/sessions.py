@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Sessões de shell persistentes (bash ou WSL) por projeto
+
+A sessão é iniciada na primeira vez que o projeto precisa dela e reaproveitada
+pelas próximas ações e opções, então comandos repetidos não pagam a partida do
+interpretador, a inicialização do login (nvm, pyenv...) nem o boot da distro
+WSL. Os comandos são enviados pelo stdin da sessão, um por vez, e cada um
+termina com uma linha-marcador com o código de saída. Sessões paradas por mais
+de `idle_timeout` segundos são encerradas.
+"""
+
+import os
+import re
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+
+from launcher.packages import shell_exports
+from launcher.processes import OutputBuffer, DEFAULT_LOG_LINES, popen_group_kwargs, terminate_tree
+
+# Tempo sem uso até a sessão ser encerrada (segundos)
+DEFAULT_IDLE_TIMEOUT = 900
+# Intervalo de verificação de sessões paradas (segundos)
+REAP_INTERVAL = 30
+
+
+class SessionError(Exception):
+    """A sessão terminou ou não respondeu"""
+
+
+class ShellSession:
+    """Um bash de longa duração controlado pelo stdin"""
+    
+    def __init__(self, name, argv, cwd, wsl=False, max_lines=DEFAULT_LOG_LINES):
+        self.name = name
+        self.argv = argv
+        self.wsl = wsl  # Caminhos precisam passar por wslpath
+        self.project = os.path.basename(cwd.rstrip("/\\"))
+        self.limits = None
+        self.output = OutputBuffer(max_lines)
+        self.returncode = None
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()  # Um comando por vez
+        
+        self._token = uuid.uuid4().hex
+        self._marker = re.compile(rf"^__LAUNCHER_{self._token}_(\d+)__$")
+        self._current = None  # {"done": Event, "code": int, "on_line": callable}
+        
+        self.popen = subprocess.Popen(
+            argv, cwd=cwd,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            encoding="utf-8", errors="replace", bufsize=1, **popen_group_kwargs()
+        )
+        self.pid = self.popen.pid
+        threading.Thread(target=self._read, daemon=True).start()
+    
+    @property
+    def running(self):
+        return self.returncode is None
+    
+    def _read(self):
+        pending_blank = False  # Linha em branco que antecede o marcador
+        for line in iter(self.popen.stdout.readline, ""):
+            line = line.rstrip("\r\n")
+            match = self._marker.match(line)
+            current = self._current
+            if match and current is not None:
+                pending_blank = False
+                current["code"] = int(match.group(1))
+                current["done"].set()
+                continue
+            
+            if pending_blank:
+                self._emit(current, "")
+            pending_blank = line == ""
+            if not pending_blank:
+                self._emit(current, line)
+        
+        self.returncode = self.popen.wait()
+        current = self._current
+        if current is not None:
+            current["done"].set()
+    
+    def _emit(self, current, line):
+        self.output.append("stdout", line)
+        if current is not None and current["on_line"]:
+            try:
+                current["on_line"](line)
+            except Exception:
+                pass
+    
+    def _cd_command(self, cwd):
+        if self.wsl:
+            return f'cd "$(wslpath {shlex.quote(cwd)})"'
+        return f"cd {shlex.quote(cwd)}"
+    
+    def run(self, command, cwd, on_line=None, timeout=None, env=None):
+        """Executa `command` em `cwd` e retorna o código de saída
+        
+        O comando roda em um subshell (mudanças de diretório e variáveis não
+        vazam para o próximo) com stdin em /dev/null, para não consumir o
+        canal de controle da sessão. `env` são variáveis só deste comando.
+        """
+        with self.lock:
+            if not self.running:
+                raise SessionError(f"Sessão '{self.name}' não está mais ativa")
+            
+            current = {"done": threading.Event(), "code": None, "on_line": on_line}
+            self._current = current
+            self.last_used = time.monotonic()
+            self.output.append("stdout", f"$ {command}")
+            
+            script = (
+                f"( {self._cd_command(cwd)} && {shell_exports(env)}{{\n{command}\n}} ) </dev/null 2>&1\n"
+                f"printf '\\n__LAUNCHER_%s_%s__\\n' '{self._token}' \"$?\"\n"
+            )
+            try:
+                self.popen.stdin.write(script)
+                self.popen.stdin.flush()
+            except OSError:
+                self._current = None
+                raise SessionError(f"Sessão '{self.name}' não está mais ativa")
+            
+            finished = current["done"].wait(timeout)
+            self._current = None
+            self.last_used = time.monotonic()
+            if not finished:
+                # Sem como interromper só o comando: a sessão é descartada
+                self.stop()
+                raise SessionError(f"Tempo esgotado ({timeout}s) na sessão '{self.name}'")
+            if current["code"] is None:
+                raise SessionError(f"Sessão '{self.name}' terminou durante o comando")
+            return current["code"]
+    
+    def stop(self):
+        """Encerra a sessão"""
+        if self.running:
+            terminate_tree(self.pid)
+
+
+class SessionManager:
+    """Sessões por chave (projeto + tipo), iniciadas sob demanda"""
+    
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self._reaper = None
+    
+    def get(self, name, argv, cwd, wsl=False):
+        """Retorna a sessão `name`, iniciando uma nova se preciso"""
+        with self.lock:
+            session = self.sessions.get(name)
+            if session is None or not session.running:
+                session = ShellSession(name, argv, cwd, wsl=wsl)
+                self.sessions[name] = session
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper",
+                                                daemon=True)
+                self._reaper.start()
+            return session
+    
+    def all(self):
+        with self.lock:
+            return list(self.sessions.values())
+    
+    def reap(self):
+        """Encerra sessões paradas há mais de `idle_timeout` segundos"""
+        now = time.monotonic()
+        for session in self.all():
+            idle = now - session.last_used
+            if session.running and not session.lock.locked() and idle > self.idle_timeout:
+                session.output.append("stdout", f"[sessão encerrada após {int(idle)}s sem uso]")
+                session.stop()
+    
+    def _reap_loop(self):
+        while True:
+            # Ao menos 1 s entre verificações, mesmo com um prazo minúsculo
+            time.sleep(max(1, min(REAP_INTERVAL, self.idle_timeout)))
+            self.reap()
+    
+    def stop_all(self):
+        for session in self.all():
+            session.stop()
+
+
+def session_argv(wsl_path=None, shell=None):
+    """Comando que inicia o bash da sessão (login, lendo do stdin)"""
+    shell = shell or ["bash", "-l", "-s"]
+    if wsl_path:
+        return [wsl_path, "-d", "Ubuntu", "-e"] + shell
+    return list(shell)
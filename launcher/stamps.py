@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de carimbos para pular instalações que não mudaram
+
+Uma ação com "cache_inputs" (ex.: package-lock.json, requirements.txt) só é
+executada de novo quando o hash desses arquivos muda ou quando alguma pasta de
+"cache_outputs" (ex.: node_modules, .venv) some ou é alterada depois do último
+sucesso. O carimbo é um arquivo vazio cujo nome contém o hash das entradas;
+ele é criado só depois que o comando termina com sucesso (pelo próprio
+terminal ou pelo launcher, no modo gerenciado).
+"""
+
+import glob
+import hashlib
+import os
+
+from launcher.paths import cache_dir
+
+# Folga para diferenças de resolução de mtime entre sistemas de arquivos
+MTIME_TOLERANCE = 1.0
+
+
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def hash_inputs(full_path, action):
+    """Hash do comando e do conteúdo dos arquivos de "cache_inputs" """
+    h = hashlib.sha256()
+    h.update(repr((action.get("command"), action.get("commands"))).encode("utf-8"))
+    for name in action.get("cache_inputs", []):
+        h.update(b"\0" + name.encode("utf-8") + b"\0")
+        try:
+            with open(os.path.join(full_path, name), "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        except FileNotFoundError:
+            h.update(b"<ausente>")
+    return h.hexdigest()
+
+
+class StampCache:
+    """Carimbos de ações bem-sucedidas, um diretório por projeto"""
+    
+    def __init__(self, root=None):
+        self.root = root
+    
+    def _project_dir(self, project_path):
+        name = _digest(os.path.abspath(project_path))[:16]
+        if self.root:
+            path = os.path.join(self.root, name)
+            os.makedirs(path, exist_ok=True)
+            return path
+        return cache_dir("stamps", name)
+    
+    def _action_key(self, full_path, action):
+        command = action.get("command") or repr(action.get("commands"))
+        return _digest(os.path.abspath(full_path), action.get("type", ""), command)[:16]
+    
+    def marker(self, project_path, full_path, action):
+        """Caminho do carimbo que corresponde às entradas atuais"""
+        key = self._action_key(full_path, action)
+        digest = hash_inputs(full_path, action)[:32]
+        return os.path.join(self._project_dir(project_path), f"{key}-{digest}.ok")
+    
+    def is_fresh(self, project_path, full_path, action):
+        """Verdadeiro se a ação pode ser pulada"""
+        if not action.get("cache_inputs"):
+            return False
+        
+        marker = self.marker(project_path, full_path, action)
+        try:
+            stamped_at = os.path.getmtime(marker)
+        except OSError:
+            return False
+        
+        for name in action.get("cache_outputs", []):
+            try:
+                if os.path.getmtime(os.path.join(full_path, name)) > stamped_at + MTIME_TOLERANCE:
+                    return False
+            except OSError:
+                return False
+        return True
+    
+    def prepare(self, project_path, full_path, action):
+        """Remove carimbos antigos da ação e retorna o caminho do novo"""
+        marker = self.marker(project_path, full_path, action)
+        key = os.path.basename(marker).split("-", 1)[0]
+        for old in glob.glob(os.path.join(os.path.dirname(marker), f"{key}-*.ok")):
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return marker
+    
+    def mark(self, marker):
+        """Grava o carimbo (ação terminou com sucesso)"""
+        with open(marker, "w"):
+            pass
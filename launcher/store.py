@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Diário em disco dos serviços gerenciados, para reanexar depois de reiniciar
+
+Cada serviço iniciado vira uma linha JSON em "services.jsonl" no cache do
+usuário (nome, PID, grupo, opção, projeto, portas, arquivos de log e o
+instante de início do processo no sistema); quando ele termina, outra linha
+marca o fim. Gravar é só anexar uma linha. Na abertura o diário é relido, os
+serviços que ainda estão vivos (mesmo PID *e* mesmo instante de início, para
+não confundir com um PID reaproveitado) são devolvidos e o arquivo é
+reescrito só com eles.
+"""
+
+import json
+import os
+import threading
+import time
+
+from launcher.logpump import remove_log
+from launcher.paths import cache_dir
+from launcher.processes import pid_alive, process_start_time, tree_alive
+
+STORE_FILE = "services.jsonl"
+
+
+def _still_running(record):
+    """O serviço do registro ainda roda (e não é outro processo com o mesmo PID)"""
+    pid, started = record["pid"], record.get("started")
+    if pid_alive(pid):
+        return started is None or process_start_time(pid) == started
+    # O shell que iniciou o serviço saiu, mas os filhos continuam no grupo dele
+    return tree_alive(record.get("group", pid))
+
+
+def _remove_logs(record):
+    for base in (record.get("logs") or {}).values():
+        remove_log(base)
+
+
+class ServiceStore:
+    """Serviços gerenciados em execução, gravados em um diário JSON"""
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+    
+    def _path(self):
+        return self.path or os.path.join(cache_dir(), STORE_FILE)
+    
+    def _append(self, record):
+        with self.lock:
+            try:
+                with open(self._path(), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+    
+    def record_start(self, process):
+        """Anota um serviço recém-iniciado"""
+        self._append({
+            "op": "start",
+            "pid": process.pid,
+            "group": process.pid,  # Cada serviço lidera o próprio grupo de processos
+            "name": process.name,
+            "option": process.option,
+            "project": process.project,
+            "cwd": process.cwd,
+            "ports": process.ports,
+            "logs": process.logs,
+            "started": process_start_time(process.pid),
+            "time": time.time(),
+        })
+    
+    def record_exit(self, pid):
+        """Anota o fim de um serviço"""
+        self._append({"op": "exit", "pid": pid})
+    
+    def forget(self, record):
+        """Anota o fim de um serviço encerrado de fora (CLI) e apaga os logs dele"""
+        self.record_exit(record["pid"])
+        _remove_logs(record)
+    
+    def _replay(self):
+        """Serviços sem linha de fim, por PID (a última partida vale)"""
+        records = {}
+        try:
+            with open(self._path(), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Linha cortada por uma queda no meio da gravação
+                    if record.get("op") == "start":
+                        records[record["pid"]] = record
+                    elif record.get("op") == "exit":
+                        records.pop(record.get("pid"), None)
+        except OSError:
+            pass
+        return records
+    
+    def alive(self):
+        """Serviços do diário que ainda estão rodando (e compacta o diário)
+        
+        Logs de serviços que morreram sem o launcher ver são apagados.
+        """
+        with self.lock:
+            alive, dead = [], []
+            for pid, record in self._replay().items():
+                (alive if _still_running(record) else dead).append(record)
+            
+            path = self._path()
+            tmp = f"{path}.tmp"
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    for record in alive:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        
+        for record in dead:
+            _remove_logs(record)
+        return alive
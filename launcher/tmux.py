@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Alvo de execução tmux: uma sessão por projeto, uma janela por comando
+
+Com "mode": "tmux" os comandos não abrem um emulador de terminal cada: viram
+janelas da sessão tmux do projeto ("launcher-<pasta>"), criada no primeiro
+comando e reaproveitada nos próximos lançamentos. Rodar de novo o mesmo
+comando reinicia a janela dele em vez de criar outra. A janela continua
+aberta depois que o comando termina (remain-on-exit), com a saída e o código
+de saída, sem deixar um shell parado para trás.
+
+Nenhum terminal é aberto para rodar comandos: para ver a sessão é preciso
+anexar sob demanda (botão "Abrir tmux", `project_launcher.py attach` ou uma
+ação open_terminal no modo tmux).
+"""
+
+import os
+import re
+import shlex
+import subprocess
+import threading
+
+SESSION_PREFIX = "launcher-"
+
+# Comando que segura a janela recém-criada até o comando de verdade entrar
+# no lugar (assim o remain-on-exit já vale mesmo para comandos instantâneos)
+PLACEHOLDER = "cat"
+
+# Shell interativo das janelas abertas por open_terminal
+SHELL_COMMAND = 'exec "${SHELL:-/bin/sh}"'
+
+
+class TmuxError(Exception):
+    """O tmux não foi encontrado ou recusou o comando"""
+
+
+def session_name(project_path):
+    """Nome da sessão tmux de um projeto (tmux não aceita '.' nem ':')"""
+    folder = os.path.basename(project_path.rstrip("/\\")) or "projeto"
+    return SESSION_PREFIX + re.sub(r"[^\w-]", "_", folder)
+
+
+class TmuxTarget:
+    """Sessões tmux dos projetos, criadas e reaproveitadas sob demanda"""
+    
+    def __init__(self, tools):
+        self.tools = tools
+        # Ações paralelas do mesmo projeto não podem criar a sessão duas vezes
+        self.lock = threading.Lock()
+    
+    def argv(self):
+        """Comando do tmux (lança TmuxError se não estiver instalado)"""
+        argv = self.tools.resolve("tmux")
+        if argv is None:
+            raise TmuxError("tmux não encontrado (instale o tmux ou use outro 'mode')")
+        return argv
+    
+    def _run(self, *args):
+        return subprocess.run(self.argv() + list(args), capture_output=True, text=True)
+    
+    def _tmux(self, *args):
+        result = self._run(*args)
+        if result.returncode != 0:
+            raise TmuxError(f"tmux {args[0]} falhou: {result.stderr.strip() or result.returncode}")
+        return result.stdout
+    
+    def has_session(self, session):
+        return self._run("has-session", "-t", f"={session}").returncode == 0
+    
+    def windows(self, session):
+        """Janelas da sessão como {nome: (id, comando já terminou)}"""
+        output = self._tmux("list-windows", "-t", f"={session}", "-F",
+                            "#{window_id}\t#{pane_dead}\t#{window_name}")
+        windows = {}
+        for line in output.splitlines():
+            window_id, dead, name = line.split("\t", 2)
+            windows.setdefault(name, (window_id, dead == "1"))
+        return windows
+    
+    def run(self, session, window, command, cwd, restart=True, env=None):
+        """Roda `command` na janela `window` da sessão (criando o que faltar)
+        
+        Se a janela já existe (lançamento anterior), o que estiver rodando
+        nela é encerrado e o comando recomeça no mesmo lugar; com
+        `restart=False` uma janela ainda viva é só reaproveitada. `env` são
+        variáveis só deste comando. Retorna o id da janela.
+        """
+        with self.lock:
+            if not self.has_session(session):
+                window_id = self._tmux("new-session", "-d", "-P", "-F", "#{window_id}", "-s", session,
+                                       "-n", window, "-c", cwd, PLACEHOLDER).strip()
+            else:
+                window_id, dead = self.windows(session).get(window, (None, True))
+                if window_id is not None and not dead and not restart:
+                    return window_id
+                if window_id is None:
+                    window_id = self._tmux("new-window", "-d", "-P", "-F", "#{window_id}",
+                                           "-t", f"={session}:", "-n", window, "-c", cwd,
+                                           PLACEHOLDER).strip()
+            
+            variables = [arg for name, value in (env or {}).items() for arg in ("-e", f"{name}={value}")]
+            self._tmux("set-option", "-w", "-t", window_id, "remain-on-exit", "on", ";",
+                       "respawn-window", "-k", "-t", window_id, "-c", cwd, *variables, command)
+            return window_id
+    
+    def select(self, window_id):
+        self._tmux("select-window", "-t", window_id)
+    
+    def attached(self, session):
+        """Quantos terminais estão anexados à sessão"""
+        output = self._tmux("display-message", "-p", "-t", f"={session}:", "#{session_attached}")
+        return int(output.strip() or 0)
+    
+    def attach_command(self, session):
+        """Linha de shell que anexa um terminal à sessão"""
+        return " ".join(shlex.quote(part) for part in self.argv() + ["attach-session", "-t", f"={session}"])
+    
+    def kill(self, session):
+        """Encerra a sessão e tudo que roda nela"""
+        if self.has_session(session):
+            self._tmux("kill-session", "-t", f"={session}")
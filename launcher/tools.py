@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de ferramentas externas (editores, Postman, DBeaver, WSL, terminais)
+
+Cada ferramenta é localizada uma única vez (PATH e locais conhecidos) e o
+resultado fica salvo no cache do usuário. Na próxima abertura basta um stat do
+executável salvo para confirmar que ele continua lá (mesmo mtime); depois a
+ferramenta é executada diretamente, sem shell.
+
+Novas ferramentas podem ser declaradas no config.json em "_settings.tools":
+
+    "insomnia": {
+        "commands": ["insomnia"],
+        "paths": {"win32": ["%LOCALAPPDATA%\\\\insomnia\\\\Insomnia.exe"]},
+        "mac_app": "Insomnia"
+    }
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+from launcher.paths import cache_dir
+
+BUILTIN_TOOLS = {
+    "cursor": {
+        "commands": ["cursor"],
+        "paths": {
+            "win32": [r"%LOCALAPPDATA%\Programs\cursor\Cursor.exe"],
+            "darwin": ["/Applications/Cursor.app/Contents/Resources/app/bin/cursor"],
+        },
+    },
+    "code": {
+        "commands": ["code"],
+        "paths": {
+            "win32": [r"%LOCALAPPDATA%\Programs\Microsoft VS Code\Code.exe",
+                      r"%ProgramFiles%\Microsoft VS Code\Code.exe"],
+            "darwin": ["/Applications/Visual Studio Code.app/Contents/Resources/app/bin/code"],
+        },
+    },
+    "postman": {
+        "commands": ["postman", "Postman"],
+        "paths": {
+            "win32": [r"%LOCALAPPDATA%\Postman\Postman.exe",
+                      r"%ProgramFiles%\Postman\Postman.exe",
+                      r"%ProgramFiles(x86)%\Postman\Postman.exe"],
+        },
+        "mac_app": "Postman",
+        "url": "postman://",
+    },
+    "dbeaver": {
+        "commands": ["dbeaver"],
+        "paths": {
+            "win32": [r"%LOCALAPPDATA%\DBeaver\dbeaver.exe",
+                      r"%ProgramFiles%\DBeaver\dbeaver.exe",
+                      r"%ProgramFiles(x86)%\DBeaver\dbeaver.exe",
+                      r"%APPDATA%\DBeaverData\workspace6\General\.dbeaver\dbeaver.exe"],
+        },
+        "mac_app": "DBeaver",
+    },
+    "wsl": {
+        "commands": ["wsl"],
+        "paths": {"win32": [r"%SystemRoot%\System32\wsl.exe"]},
+    },
+    "tmux": {
+        "commands": ["tmux"],
+        "paths": {"darwin": ["/opt/homebrew/bin/tmux", "/usr/local/bin/tmux"]},
+    },
+    # Emuladores de terminal (Linux); "exec_args" precede o comando a executar
+    "gnome-terminal": {"commands": ["gnome-terminal"], "exec_args": ["--"]},
+    "konsole": {"commands": ["konsole"], "exec_args": ["-e"]},
+    "xfce4-terminal": {"commands": ["xfce4-terminal"], "exec_args": ["-x"]},
+    "xterm": {"commands": ["xterm"], "exec_args": ["-e"]},
+}
+
+# Ordem de preferência dos emuladores de terminal
+TERMINALS = ("gnome-terminal", "konsole", "xfce4-terminal", "xterm")
+
+# Editores para open_cursor, em ordem de preferência
+EDITORS = ("cursor", "code")
+
+
+def _platform_key():
+    if sys.platform == "win32":
+        return "win32"
+    if sys.platform == "darwin":
+        return "darwin"
+    return "linux"
+
+
+def _fingerprint(spec):
+    return json.dumps(spec, sort_keys=True)
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def locate(spec):
+    """Procura a ferramenta e retorna {"argv", "source"} ou None"""
+    for command in spec.get("commands", []):
+        found = shutil.which(command)
+        if found:
+            return {"argv": [found], "source": found}
+    
+    for path in spec.get("paths", {}).get(_platform_key(), []):
+        expanded = os.path.expandvars(os.path.expanduser(path))
+        if os.path.isfile(expanded):
+            return {"argv": [expanded], "source": expanded}
+    
+    app = spec.get("mac_app")
+    if app and sys.platform == "darwin":
+        for folder in ("/Applications", os.path.expanduser("~/Applications")):
+            bundle = os.path.join(folder, f"{app}.app")
+            if os.path.isdir(bundle):
+                return {"argv": ["open", "-a", bundle], "source": bundle}
+    return None
+
+
+class ToolRegistry:
+    """Resolve ferramentas uma vez e guarda o resultado em disco"""
+    
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file
+        self.specs = dict(BUILTIN_TOOLS)
+        self.lock = threading.Lock()
+        self._entries = None  # Carregado do disco na primeira consulta
+        self._missing = set()  # Não encontradas nesta sessão
+    
+    def configure(self, custom_tools):
+        """Aplica ferramentas declaradas no config.json (sobrepõem as internas)"""
+        with self.lock:
+            self.specs = dict(BUILTIN_TOOLS)
+            self.specs.update(custom_tools or {})
+            self._missing.clear()
+    
+    def _cache_path(self):
+        return self.cache_file or os.path.join(cache_dir(), "tools.json")
+    
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self._cache_path(), 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+    
+    def _save(self):
+        path = self._cache_path()
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=2)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    
+    def spec(self, name):
+        return self.specs.get(name)
+    
+    def resolve(self, name):
+        """Retorna o argv da ferramenta (lista) ou None se não estiver instalada"""
+        with self.lock:
+            spec = self.specs.get(name)
+            if spec is None or name in self._missing:
+                return None
+            
+            entries = self._load()
+            entry = entries.get(name)
+            fingerprint = _fingerprint(spec)
+            if (entry and entry.get("spec") == fingerprint
+                    and _mtime(entry["source"]) == entry.get("mtime")):
+                return list(entry["argv"])
+            
+            found = locate(spec)
+            if found is None:
+                entries.pop(name, None)
+                self._missing.add(name)
+                self._save()
+                return None
+            
+            found["spec"] = fingerprint
+            found["mtime"] = _mtime(found["source"])
+            entries[name] = found
+            self._save()
+            return list(found["argv"])
+    
+    def first(self, names):
+        """Primeira ferramenta instalada da lista, como (nome, argv)"""
+        for name in names:
+            argv = self.resolve(name)
+            if argv:
+                return name, argv
+        return None, None
+    
+    def forget(self):
+        """Descarta o que foi resolvido (próxima consulta procura de novo)"""
+        with self.lock:
+            self._entries = {}
+            self._missing.clear()
+            self._save()
+    
+    def open(self, name, args=(), cwd=None):
+        """Abre a ferramenta com uma única execução direta (sem shell)"""
+        argv = self.resolve(name)
+        if argv:
+            return subprocess.Popen(argv + list(args), cwd=cwd)
+        
+        # Último recurso: protocolo registrado pela ferramenta (ex.: postman://)
+        url = (self.specs.get(name) or {}).get("url")
+        if url:
+            if sys.platform == "win32":
+                os.startfile(url)
+            else:
+                subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", url])
+            return None
+        raise FileNotFoundError(f"Ferramenta não encontrada: {name}")
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Rastreamento das execuções: um span por opção e um por ação
+
+Cada span de ação guarda quando entrou na fila, quando começou, quando ficou
+pronta (a ação retornou e liberou as dependentes) e quando terminou (para
+serviços gerenciados, quando o processo saiu). Os spans podem ser exportados
+no formato Chrome trace-event (abre no Perfetto / chrome://tracing).
+"""
+
+import itertools
+import json
+import threading
+import time
+
+from launcher.actions import SKIPPED, describe_action
+
+# Quantas execuções de opções o rastreador guarda
+MAX_OPTION_SPANS = 100
+
+
+class Span:
+    """Intervalo de uma opção ou ação"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, name, kind, parent=None, args=None):
+        self.id = next(self._ids)
+        self.name = name
+        self.kind = kind  # "option" ou "action"
+        self.parent = parent
+        self.args = dict(args or {})
+        self.children = []
+        self.queued = time.monotonic()
+        self.start = None
+        self.ready = None
+        self.end = None
+        self.outcome = None  # "ok", "skipped", "error" ou "running"
+    
+    @property
+    def finished(self):
+        return self.end is not None
+
+
+class Tracer:
+    """Coleta spans de forma segura entre threads"""
+    
+    def __init__(self, max_options=MAX_OPTION_SPANS, history=None):
+        self.epoch = time.monotonic()
+        self.wall_epoch = time.time()
+        self.max_options = max_options
+        self.history = history  # launcher.history.RunHistory (opcional)
+        self.options = []
+        self.lock = threading.Lock()
+    
+    def option_span(self, option_path, project=None):
+        """Inicia o span de uma execução de opção"""
+        span = Span(option_path, "option", args={"project": project})
+        span.start = span.queued
+        with self.lock:
+            self.options.append(span)
+            del self.options[:-self.max_options]
+        return span
+    
+    def action_span(self, parent, action, node_id=None):
+        """Cria o span de uma ação no momento em que ela entra na fila"""
+        args = {"type": action.get("type"), "id": node_id}
+        for key in ("path", "command", "commands", "tool", "url", "port", "service"):
+            if action.get(key) is not None:
+                args[key] = action[key]
+        span = Span(describe_action(action), "action", parent, args)
+        if parent is not None:
+            with self.lock:
+                parent.children.append(span)
+        return span
+    
+    def started(self, span):
+        span.start = time.monotonic()
+    
+    def finish_action(self, span, result=None, error=None):
+        """Fecha o span da ação de acordo com o retorno de ActionRunner.run"""
+        now = time.monotonic()
+        span.ready = now
+        if error is not None:
+            span.outcome = "error"
+            span.args["error"] = str(error)
+            span.end = now
+        elif result == SKIPPED:
+            span.outcome = "skipped"
+            span.end = now
+        elif hasattr(result, "add_exit_callback"):
+            # Serviço gerenciado: o span vai até o processo sair
+            span.outcome = "running"
+            span.args["pid"] = result.pid
+            result.add_exit_callback(lambda process, code: self._service_exited(span, code))
+        else:
+            span.outcome = "ok"
+            span.end = now
+    
+    def _service_exited(self, span, returncode):
+        span.args["returncode"] = returncode
+        span.outcome = "ok" if returncode == 0 else "error"
+        span.end = time.monotonic()
+    
+    def finish_option(self, span, error=None):
+        span.ready = span.end = time.monotonic()
+        span.outcome = "error" if error is not None else "ok"
+        if error is not None:
+            span.args["error"] = str(error)
+        if self.history is not None:
+            # Só enfileira: a gravação em disco é da thread do histórico
+            self.history.record(span, self.wall_epoch + (span.start - self.epoch))
+    
+    def latest(self):
+        """Último span de opção (ou None)"""
+        with self.lock:
+            return self.options[-1] if self.options else None
+    
+    def to_chrome(self, options=None):
+        """Converte os spans em um documento Chrome trace-event"""
+        with self.lock:
+            options = list(options if options is not None else self.options)
+        now = time.monotonic()
+        
+        def us(moment):
+            return round((moment - self.epoch) * 1_000_000)
+        
+        events = []
+        for option in options:
+            pid = option.id
+            events.append({"name": "process_name", "ph": "M", "pid": pid,
+                           "args": {"name": option.name}})
+            events.append({"name": option.name, "cat": "opcao", "ph": "X", "pid": pid, "tid": 0,
+                           "ts": us(option.start), "dur": us(option.end or now) - us(option.start),
+                           "args": dict(option.args, outcome=option.outcome)})
+            
+            for lane, span in enumerate(list(option.children), start=1):
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                               "args": {"name": f"{lane}. {span.name}"}})
+                args = dict(span.args, outcome=span.outcome)
+                start = span.start or span.ready or now
+                if start > span.queued:
+                    events.append({"name": "fila", "cat": "fila", "ph": "X", "pid": pid,
+                                   "tid": lane, "ts": us(span.queued),
+                                   "dur": us(start) - us(span.queued), "args": args})
+                if span.start is None:
+                    continue
+                ready = span.ready or now
+                events.append({"name": span.name, "cat": span.args.get("type") or "acao",
+                               "ph": "X", "pid": pid, "tid": lane, "ts": us(span.start),
+                               "dur": us(ready) - us(span.start), "args": args})
+                end = span.end or now
+                if span.ready is not None and end > span.ready:
+                    events.append({"name": f"rodando: {span.name}", "cat": "servico", "ph": "X",
+                                   "pid": pid, "tid": lane, "ts": us(span.ready),
+                                   "dur": us(end) - us(span.ready), "args": args})
+        
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"epoch": self.wall_epoch},
+        }
+    
+    def export(self, path, options=None):
+        """Grava o trace em `path` (JSON)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome(options), f, ensure_ascii=False)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Observador do config.json: inotify no Linux, verificação de mtime nos demais
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+# Espera após a última alteração antes de avisar (editores salvam em rajadas)
+DEFAULT_DEBOUNCE = 0.3
+# Intervalo de verificação do modo por mtime
+DEFAULT_INTERVAL = 1.0
+
+# Máscara do inotify: fim de escrita, renomeação para o arquivo, criação e remoção
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MODIFY = 0x00000002
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Acesso mínimo ao inotify via ctypes (sem dependências externas)"""
+    
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_MODIFY
+        # Observa a pasta: muitos editores salvam gravando um temporário e renomeando
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, "inotify_add_watch falhou")
+    
+    def wait(self, filename, timeout):
+        """Espera até `timeout` segundos por um evento no arquivo"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        
+        offset, hit = 0, False
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if os.fsdecode(name) == filename:
+                hit = True
+        return hit
+    
+    def close(self):
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Chama `on_change()` (na thread do observador) quando o arquivo muda"""
+    
+    def __init__(self, path, on_change, debounce=DEFAULT_DEBOUNCE, interval=DEFAULT_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.interval = interval
+        self.mode = None  # "inotify" ou "mtime", definido ao iniciar
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _open_inotify(self):
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            return _Inotify(os.path.dirname(self.path))
+        except (OSError, AttributeError):
+            return None
+    
+    def _run(self):
+        notifier = self._open_inotify()
+        self.mode = "inotify" if notifier else "mtime"
+        filename = os.path.basename(self.path)
+        last = self._signature()
+        
+        try:
+            while not self._stop.is_set():
+                if notifier:
+                    if not notifier.wait(filename, self.interval):
+                        continue
+                elif self._stop.wait(self.interval) or self._signature() == last:
+                    continue
+                
+                # Debounce: espera o arquivo ficar quieto por `debounce` segundos
+                while not self._stop.is_set():
+                    before = self._signature()
+                    if notifier:
+                        busy = notifier.wait(filename, self.debounce)
+                    else:
+                        busy = self._stop.wait(self.debounce) or self._signature() != before
+                    if not busy:
+                        break
+                
+                current = self._signature()
+                if current != last and not self._stop.is_set():
+                    last = current
+                    self.on_change()
+        finally:
+            if notifier:
+                notifier.close()
@@ -4,16 +4,68 @@
 Launcher de Projetos - Executável para gerenciar e executar projetos
 """
 
+import sys
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Modo linha de comando: executa sem carregar o tkinter
+    from launcher.cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import itertools
 import json
 import os
+import queue
 import subprocess
-import sys
-from pathlib import Path
 import threading
 import time
 
+from launcher.actions import ActionRunner
+from launcher.control import ControlError, ControlServer
+from launcher.config import (CONFIG_FILE, load_config, create_default_config, validate_config,
+                             split_config, resolve_option, PATH_SEPARATOR)
+from launcher.executor import ActionExecutor, BatchExecutor
+from launcher.history import RunHistory
+from launcher.monitor import MB, by_project
+from launcher.processes import stop_trees
+from launcher.palette import OptionIndex
+from launcher.plan import build_plan, describe_plan
+from launcher.prewarm import PrewarmScheduler
+from launcher.preflight import PreflightError, check_plan
+from launcher.trace import Tracer
+from launcher.watch import ConfigWatcher
+
+# Intervalo de leitura da saída dos serviços gerenciados (ms)
+LOG_POLL_MS = 100
+# Intervalo de verificação de recarga do config.json (ms)
+RELOAD_POLL_MS = 200
+
+# Intervalo de atualização da interface com os eventos das threads (ms, ~20 quadros/s)
+UI_POLL_MS = 50
+
+# Máximo de eventos aplicados por quadro (o resto fica para o próximo)
+UI_MAX_EVENTS = 2000
+
+# Itens de um nível inseridos por vez na árvore de opções (o resto entra ao rolar)
+TREE_CHUNK = 200
+
+# Sufixos dos itens auxiliares da árvore (o iid dos itens reais é o caminho da opção)
+TREE_PLACEHOLDER = "\0carregando"
+TREE_MORE = "\0mais"
+
+# Atualização da linha do tempo enquanto houver ações em andamento (ms)
+TIMELINE_POLL_MS = 500
+
+# Cores das barras da linha do tempo
+TIMELINE_COLORS = {
+    "queued": "#d0d0d0",
+    "ok": "#4a90d9",
+    "running": "#6cbf6c",
+    "skipped": "#a0a0a0",
+    "error": "#d9534f",
+}
+
 class ProjectLauncher:
     def __init__(self):
         self.root = tk.Tk()
@@ -22,79 +74,67 @@ class ProjectLauncher:
         self.root.resizable(True, True)
         
         # Configurações
-        self.config_file = "config.json"
+        self.config_file = CONFIG_FILE
         self.projects = {}
+        self.settings = {}  # Ajustes globais ("_settings" no config.json)
         self.current_project = None
-        self.current_options = []
-        self.option_stack = []  # Para navegação entre opções
+        self.tree_loaded = {}  # iid -> quantos filhos já foram inseridos na árvore
+        self.runner = ActionRunner()  # Dono dos processos gerenciados
+        self.log_tabs = {}  # Nome do serviço -> estado da aba de log
+        self.config_changed = threading.Event()  # Sinalizado pelo observador
+        self.palette = None  # Janela da paleta de busca (Ctrl+P)
+        self.history = RunHistory()  # Tempos de cada execução, em SQLite (gravado em segundo plano)
+        self.tracer = Tracer(history=self.history)  # Spans das execuções (linha do tempo)
+        self.timeline = None  # Janela da linha do tempo
+        self.history_window = None  # Janela do histórico (p50/p95)
+        # Adianta instalações das opções prováveis com a máquina ociosa ("_settings.prewarm")
+        self.prewarm = PrewarmScheduler(self.runner, self.history, lambda: self.projects,
+                                        status=self.post_status)
+        # Eventos das threads de trabalho para a interface (só a thread do Tk mexe nos widgets)
+        self.ui_events = queue.SimpleQueue()
+        self.active_batches = {}  # id do lote -> [concluídas, total]
+        self.batch_ids = itertools.count(1)
+        self.usage_generation = 0  # Última amostra do monitor mostrada na tabela
+        self.control = None  # Servidor de controle local ("_settings.control")
+        self.control_settings = None
+        # Avisos de limite de CPU/memória chegam da thread do monitor
+        self.runner.monitor.limit_listeners.append(self.on_service_limit)
         
         # Carregar configurações
         self.load_config()
         
         # Criar interface
         self.create_interface()
+        self.reattach_services()
+        self.configure_control()
+        self.prewarm.configure(self.settings.get("prewarm"))
+        # Qualquer tecla, clique ou movimento no launcher adia/cancela o pré-aquecimento
+        for sequence in ("<KeyPress>", "<ButtonPress>", "<Motion>"):
+            self.root.bind_all(sequence, self.on_user_input, add="+")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-p>", self.open_palette)
+        self.root.bind("<Control-P>", self.open_palette)
+        self.root.after(LOG_POLL_MS, self.poll_services)
+        self.root.after(UI_POLL_MS, self.drain_ui_events)
+        
+        # Recarregar automaticamente quando o config.json for salvo
+        self.config_watcher = ConfigWatcher(self.config_file, self.config_changed.set)
+        self.config_watcher.start()
+        self.root.after(RELOAD_POLL_MS, self.poll_config)
         
     def load_config(self):
         """Carrega configurações do arquivo JSON"""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.projects = json.load(f)
-            else:
-                self.create_default_config()
+            self.projects, self.settings = split_config(load_config(self.config_file))
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar configurações: {str(e)}")
             self.create_default_config()
+        self.option_index = OptionIndex(self.projects)
+        self.runner.configure(self.settings)
     
     def create_default_config(self):
         """Cria arquivo de configuração padrão"""
-        default_config = {
-            "Super Pagamentos": {
-                "path": "C:/projetos/super-pagamentos",
-                "options": {
-                    "Front Dashboard": {
-                        "type": "execute",
-                        "actions": [
-                            {"type": "open_cursor", "path": "front-dashboard"},
-                            {"type": "run_command", "command": "npm install", "path": "front-dashboard"},
-                            {"type": "run_command", "command": "npm start", "path": "front-dashboard"}
-                        ]
-                    },
-                    "Back Dashboard": {
-                        "type": "execute",
-                        "actions": [
-                            {"type": "open_cursor", "path": "back-dashboard"},
-                            {"type": "run_command", "command": "npm install", "path": "back-dashboard"},
-                            {"type": "run_command", "command": "npm run dev", "path": "back-dashboard"}
-                        ]
-                    },
-                    "Back API": {
-                        "type": "execute",
-                        "actions": [
-                            {"type": "open_cursor", "path": "back-api"},
-                            {"type": "run_command", "command": "pip install -r requirements.txt", "path": "back-api"},
-                            {"type": "run_command", "command": "python app.py", "path": "back-api"}
-                        ]
-                    },
-                    "Todos": {
-                        "type": "execute",
-                        "actions": [
-                            {"type": "open_cursor", "path": "front-dashboard"},
-                            {"type": "open_cursor", "path": "back-dashboard"},
-                            {"type": "open_cursor", "path": "back-api"},
-                            {"type": "run_command", "command": "npm install", "path": "front-dashboard"},
-                            {"type": "run_command", "command": "npm install", "path": "back-dashboard"},
-                            {"type": "run_command", "command": "pip install -r requirements.txt", "path": "back-api"}
-                        ]
-                    }
-                }
-            }
-        }
-        
-        with open(self.config_file, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=4, ensure_ascii=False)
-        
-        self.projects = default_config
+        self.projects, self.settings = split_config(create_default_config(self.config_file))
     
     def create_interface(self):
         """Cria a interface gráfica"""
@@ -126,33 +166,80 @@ class ProjectLauncher:
         self.options_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), 
                                pady=20)
         self.options_frame.columnconfigure(0, weight=1)
+        self.options_frame.rowconfigure(0, weight=1)
+        main_frame.rowconfigure(2, weight=1)
         
-        # Lista de opções
-        self.options_listbox = tk.Listbox(self.options_frame, height=8)
-        self.options_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        self.options_listbox.bind('<Double-1>', self.on_option_selected)
+        # Árvore de opções (filhos carregados só ao expandir)
+        self.options_tree = ttk.Treeview(self.options_frame, show="tree", height=10,
+                                         selectmode="extended")
+        self.options_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.options_tree.bind('<<TreeviewOpen>>', self.on_tree_open)
+        self.options_tree.bind('<<TreeviewSelect>>', self.on_option_selected)
+        self.options_tree.bind('<Double-1>', self.on_tree_activate)
+        self.options_tree.bind('<Return>', self.on_tree_activate)
         
-        # Scrollbar para lista
-        scrollbar = ttk.Scrollbar(self.options_frame, orient="vertical", command=self.options_listbox.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.options_listbox.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar para a árvore (também carrega o próximo trecho de níveis grandes)
+        self.options_scrollbar = ttk.Scrollbar(self.options_frame, orient="vertical",
+                                               command=self.options_tree.yview)
+        self.options_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.options_tree.configure(yscrollcommand=self.on_tree_scroll)
+        
+        # Erro de recarga do config.json (visível só quando houver erro)
+        self.config_error_var = tk.StringVar()
+        self.config_error_label = ttk.Label(self.options_frame, textvariable=self.config_error_var,
+                                            foreground="red", wraplength=520)
         
         # Botões
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=3, column=0, columnspan=2, pady=10)
         
-        self.back_button = ttk.Button(button_frame, text="← Voltar", 
-                                    command=self.go_back, state="disabled")
-        self.back_button.pack(side=tk.LEFT, padx=5)
-        
         self.execute_button = ttk.Button(button_frame, text="Executar", 
                                        command=self.execute_option, state="disabled")
         self.execute_button.pack(side=tk.LEFT, padx=5)
         
+        self.preview_button = ttk.Button(button_frame, text="Pré-visualizar",
+                                         command=self.preview_plan, state="disabled")
+        self.preview_button.pack(side=tk.LEFT, padx=5)
+        
         self.config_button = ttk.Button(button_frame, text="Configurar", 
                                       command=self.open_config)
         self.config_button.pack(side=tk.LEFT, padx=5)
         
+        self.timeline_button = ttk.Button(button_frame, text="Linha do tempo",
+                                          command=self.open_timeline)
+        self.timeline_button.pack(side=tk.LEFT, padx=5)
+        
+        self.history_button = ttk.Button(button_frame, text="Histórico",
+                                         command=self.open_history)
+        self.history_button.pack(side=tk.LEFT, padx=5)
+        
+        # Encerram o que as opções/projetos selecionados iniciaram
+        self.stop_option_button = ttk.Button(button_frame, text="Parar opção",
+                                             command=self.stop_selected_options, state="disabled")
+        self.stop_option_button.pack(side=tk.LEFT, padx=5)
+        
+        self.stop_project_button = ttk.Button(button_frame, text="Parar projeto",
+                                              command=self.stop_selected_projects, state="disabled")
+        self.stop_project_button.pack(side=tk.LEFT, padx=5)
+        
+        # Anexa um terminal à sessão tmux dos projetos selecionados (modo "tmux")
+        self.tmux_button = ttk.Button(button_frame, text="Abrir tmux",
+                                      command=self.attach_tmux, state="disabled")
+        if sys.platform != "win32":
+            self.tmux_button.pack(side=tk.LEFT, padx=5)
+        
+        # Ignorar o cache de carimbos (reinstalar dependências)
+        self.force_var = tk.BooleanVar(value=False)
+        self.force_check = ttk.Checkbutton(button_frame, text="Forçar (reinstalar e reabrir)",
+                                           variable=self.force_var)
+        self.force_check.pack(side=tk.LEFT, padx=5)
+        
+        # Desmarcado, as ações rodam como estão no config (igual a --no-optimize)
+        self.optimize_var = tk.BooleanVar(value=True)
+        self.optimize_check = ttk.Checkbutton(button_frame, text="Otimizar plano",
+                                              variable=self.optimize_var)
+        self.optimize_check.pack(side=tk.LEFT, padx=5)
+        
         # Barra de progresso (inicialmente oculta)
         self.progress = ttk.Progressbar(main_frame, mode='determinate')
         # Não adicionar ao grid inicialmente - será mostrada apenas durante execução
@@ -162,294 +249,1018 @@ class ProjectLauncher:
         status_label = ttk.Label(main_frame, textvariable=self.status_var)
         status_label.grid(row=5, column=0, columnspan=2, pady=5)
         
+        # Painel de logs dos serviços gerenciados (inicialmente oculto)
+        self.main_frame = main_frame
+        self.logs_frame = ttk.LabelFrame(main_frame, text="Serviços", padding="5")
+        self.logs_frame.columnconfigure(0, weight=1)
+        self.logs_frame.rowconfigure(0, weight=1)
+        self.logs_notebook = ttk.Notebook(self.logs_frame)
+        self.logs_notebook.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.stop_service_button = ttk.Button(self.logs_frame, text="Parar serviço",
+                                              command=self.stop_selected_service)
+        self.stop_service_button.grid(row=1, column=0, sticky=tk.E, pady=(5, 0))
+        
+        # Consumo por projeto (linhas) e por serviço (filhos), atualizado pelo monitor
+        self.usage_tree = ttk.Treeview(self.logs_frame, columns=("cpu", "rss", "children"), height=4)
+        self.usage_tree.heading("#0", text="Projeto / serviço")
+        self.usage_tree.heading("cpu", text="CPU")
+        self.usage_tree.heading("rss", text="Memória")
+        self.usage_tree.heading("children", text="Processos filhos")
+        for column in ("cpu", "rss", "children"):
+            self.usage_tree.column(column, width=90, anchor=tk.E, stretch=False)
+        self.usage_tree.tag_configure("over", foreground="red")
+        self.usage_tree.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        
         # Atualizar lista de projetos
         self.update_project_list()
     
     def update_project_list(self):
-        """Atualiza a lista de projetos no combobox"""
+        """Atualiza a lista de projetos no combobox e na árvore"""
         projects = list(self.projects.keys())
         self.project_combo['values'] = projects
+        self.sync_tree()
         if projects:
             self.project_combo.set(projects[0])
             self.on_project_selected()
     
     def on_project_selected(self, event=None):
-        """Callback quando um projeto é selecionado"""
+        """Callback quando um projeto é selecionado: expande e mostra o projeto na árvore"""
         project_name = self.project_var.get()
         if project_name in self.projects:
             self.current_project = project_name
-            self.option_stack = []
-            self.show_options(self.projects[project_name]["options"])
-    
-    def show_options(self, options):
-        """Mostra as opções disponíveis"""
-        self.current_options = options
-        self.options_listbox.delete(0, tk.END)
-        
-        for option_name, option_data in options.items():
-            option_type = option_data.get("type", "execute")
-            icon = "📁" if option_type == "options" else "▶️"
-            self.options_listbox.insert(tk.END, f"{icon} {option_name}")
-        
-        self.execute_button.config(state="disabled")
-        self.back_button.config(state="disabled" if not self.option_stack else "normal")
-    
-    def on_option_selected(self, event):
-        """Callback quando uma opção é selecionada"""
-        selection = self.options_listbox.curselection()
-        if selection:
-            index = selection[0]
-            option_name = list(self.current_options.keys())[index]
-            option_data = self.current_options[option_name]
-            
-            if option_data.get("type") == "options":
-                # Navegar para sub-opções
-                self.option_stack.append((self.current_options, option_name))
-                self.show_options(option_data["options"])
-            else:
-                # Marcar para execução
-                self.execute_button.config(state="normal")
+            self.expand_option(project_name)
+            self.options_tree.selection_set(project_name)
+            self.options_tree.focus(project_name)
+    
+    def option_children(self, iid):
+        """Filhos (nome, dados) de um item da árvore; "" é a raiz com os projetos"""
+        if iid == "":
+            return [(name, {"type": "options", "options": project.get("options", {})})
+                    for name, project in self.projects.items()]
+        try:
+            _, data = resolve_option(self.projects, iid)
+        except KeyError:
+            return []
+        if data.get("type", "execute") != "options":
+            return []
+        return list(data.get("options", {}).items())
     
-    def go_back(self):
-        """Volta para o nível anterior de opções"""
-        if self.option_stack:
-            self.current_options, _ = self.option_stack.pop()
-            self.show_options(self.current_options)
+    def option_label(self, iid, data):
+        """Texto do item na árvore"""
+        name = iid.rsplit(PATH_SEPARATOR, 1)[-1]
+        if PATH_SEPARATOR not in iid:
+            return name  # Projeto
+        icon = "📁" if data.get("type", "execute") == "options" else "▶️"
+        return f"{icon} {name}"
     
-    def execute_option(self):
-        """Executa a opção selecionada"""
-        selection = self.options_listbox.curselection()
-        if not selection:
-            messagebox.showwarning("Aviso", "Selecione uma opção para executar")
+    def child_iid(self, parent, name):
+        return f"{parent}{PATH_SEPARATOR}{name}" if parent else name
+    
+    def insert_tree_item(self, parent, iid, data, index="end"):
+        """Insere um item; pastas ganham um filho provisório para exibir a seta"""
+        folder = data.get("type", "execute") == "options"
+        self.options_tree.insert(parent, index, iid=iid, text=self.option_label(iid, data),
+                                 tags=("folder" if folder else "execute",))
+        if folder:
+            self.options_tree.insert(iid, "end", iid=iid + TREE_PLACEHOLDER, text="…")
+    
+    def load_tree_children(self, iid, upto=None):
+        """Insere os filhos de `iid` até o índice `upto` (por padrão, mais um trecho)"""
+        tree = self.options_tree
+        children = self.option_children(iid)
+        loaded = self.tree_loaded.get(iid, 0)
+        upto = min(len(children), loaded + TREE_CHUNK if upto is None else upto)
+        if iid in self.tree_loaded and upto <= loaded:
+            return
+        
+        for helper in (iid + TREE_PLACEHOLDER, iid + TREE_MORE):
+            if tree.exists(helper):
+                tree.delete(helper)
+        for name, data in children[loaded:upto]:
+            self.insert_tree_item(iid, self.child_iid(iid, name), data)
+        if upto < len(children):
+            tree.insert(iid, "end", iid=iid + TREE_MORE,
+                        text=f"… mais {len(children) - upto} opções")
+        self.tree_loaded[iid] = upto
+    
+    def forget_tree_branch(self, iid):
+        """Esquece o estado de carregamento de `iid` e dos descendentes"""
+        prefix = iid + PATH_SEPARATOR
+        for key in [key for key in self.tree_loaded if key == iid or key.startswith(prefix)]:
+            del self.tree_loaded[key]
+    
+    def on_tree_open(self, event=None):
+        """Carrega os filhos do item expandido na primeira vez"""
+        iid = self.options_tree.focus()
+        if iid and iid not in self.tree_loaded:
+            self.load_tree_children(iid)
+    
+    def on_tree_scroll(self, first, last):
+        """Atualiza a barra e carrega o próximo trecho quando "… mais" aparece na tela"""
+        self.options_scrollbar.set(first, last)
+        for iid in list(self.tree_loaded):
+            more = iid + TREE_MORE
+            if self.options_tree.exists(more) and self.options_tree.bbox(more):
+                self.root.after_idle(self.load_tree_children, iid,
+                                     self.tree_loaded[iid] + TREE_CHUNK)
+    
+    def expand_option(self, iid):
+        """Carrega e abre os ancestrais de `iid` (e ele mesmo) e rola até ele"""
+        parts = iid.split(PATH_SEPARATOR)
+        parent = ""
+        for depth in range(len(parts)):
+            item = PATH_SEPARATOR.join(parts[:depth + 1])
+            names = [name for name, _ in self.option_children(parent)]
+            if parts[depth] not in names:
+                return
+            self.load_tree_children(parent, max(names.index(parts[depth]) + 1,
+                                                self.tree_loaded.get(parent, 0), TREE_CHUNK))
+            parent = item
+        if iid not in self.tree_loaded and self.option_children(iid):
+            self.load_tree_children(iid)
+        for depth in range(len(parts)):
+            self.options_tree.item(PATH_SEPARATOR.join(parts[:depth + 1]), open=True)
+        self.options_tree.see(iid)
+    
+    def sync_tree(self, iid=""):
+        """Aplica a configuração atual aos níveis já carregados da árvore
+        
+        Os iids são os caminhos das opções, então itens que continuam
+        existindo são mantidos (com seleção e expansão); só o que mudou é
+        inserido, removido, renomeado ou movido.
+        """
+        tree = self.options_tree
+        children = self.option_children(iid)
+        if iid and not children:
+            # Deixou de ser pasta (ou ficou vazia)
+            if tree.get_children(iid):
+                tree.delete(*tree.get_children(iid))
+            self.forget_tree_branch(iid)
             return
         
-        index = selection[0]
-        option_name = list(self.current_options.keys())[index]
-        option_data = self.current_options[option_name]
+        if iid not in self.tree_loaded:
+            if iid == "":
+                self.load_tree_children("")
+            return
         
-        if option_data.get("type") == "execute":
-            self.run_actions(option_data["actions"])
-        else:
-            messagebox.showinfo("Info", "Esta opção não pode ser executada diretamente")
+        loaded = min(len(children), max(self.tree_loaded[iid], TREE_CHUNK))
+        wanted = [(self.child_iid(iid, name), data) for name, data in children[:loaded]]
+        wanted_ids = {child for child, _ in wanted}
+        
+        current = [child for child in tree.get_children(iid)
+                   if not child.endswith((TREE_PLACEHOLDER, TREE_MORE))]
+        removed = [child for child in current if child not in wanted_ids]
+        if removed:
+            tree.delete(*removed)
+            for child in removed:
+                self.forget_tree_branch(child)
+        
+        existing = set(current) - set(removed)
+        for child, data in wanted:
+            if child not in existing:
+                self.insert_tree_item(iid, child, data)
+                continue
+            label = self.option_label(child, data)
+            if tree.item(child, "text") != label:
+                tree.item(child, text=label)
+            folder = data.get("type", "execute") == "options"
+            tag = "folder" if folder else "execute"
+            if tree.item(child, "tags") != (tag,):
+                tree.item(child, tags=(tag,))
+            if folder and child not in self.tree_loaded and not tree.get_children(child):
+                tree.insert(child, "end", iid=child + TREE_PLACEHOLDER, text="…")
+            self.sync_tree(child)
+        
+        # Reordena só se a ordem mudou
+        order = [child for child, _ in wanted]
+        more = iid + TREE_MORE
+        if tree.exists(more):
+            tree.delete(more)
+        if list(tree.get_children(iid)) != order:
+            tree.set_children(iid, *order)
+        if loaded < len(children):
+            tree.insert(iid, "end", iid=more, text=f"… mais {len(children) - loaded} opções")
+        self.tree_loaded[iid] = loaded
     
-    def run_actions(self, actions):
-        """Executa uma lista de ações"""
+    def selected_options(self):
+        """Opções executáveis selecionadas na árvore, como (caminho, dados)"""
+        selected = []
+        for iid in self.options_tree.selection():
+            if PATH_SEPARATOR not in iid or "\0" in iid:
+                continue
+            try:
+                _, data = resolve_option(self.projects, iid)
+            except KeyError:
+                continue
+            if data.get("type", "execute") == "execute":
+                selected.append((iid, data))
+        return selected
+    
+    def selected_projects(self):
+        """Projetos das linhas selecionadas na árvore (sem repetir)"""
+        names = []
+        for iid in self.options_tree.selection():
+            name = iid.split(PATH_SEPARATOR, 1)[0]
+            if name in self.projects and name not in names:
+                names.append(name)
+        return names
+    
+    def on_option_selected(self, event=None):
+        """Callback quando a seleção muda"""
+        count = len(self.selected_options())
+        self.execute_button.config(state="normal" if count else "disabled",
+                                   text=f"Executar ({count})" if count > 1 else "Executar")
+        self.preview_button.config(state="normal" if count else "disabled")
+        has_project = "normal" if self.selected_projects() else "disabled"
+        self.tmux_button.config(state=has_project)
+        self.stop_option_button.config(state=has_project)
+        self.stop_project_button.config(state=has_project)
+        
+        for iid in self.options_tree.selection():
+            if iid.endswith(TREE_MORE):
+                self.load_tree_children(iid[:-len(TREE_MORE)])
+    
+    def on_tree_activate(self, event=None):
+        """Duplo clique/Enter: executa opções; pastas abrem e fecham sozinhas"""
+        if self.selected_options():
+            self.execute_option()
+    
+    def execute_option(self):
+        """Executa as opções selecionadas (várias, inclusive de projetos diferentes, como um lote)"""
+        selected = self.selected_options()
+        if not selected:
+            if self.options_tree.selection():
+                messagebox.showinfo("Info", "Esta opção não pode ser executada diretamente")
+            else:
+                messagebox.showwarning("Aviso", "Selecione uma opção para executar")
+            return
+        self.run_batch(selected)
+    
+    def run_batch(self, options, force=None, listener=None):
+        """Executa as ações de várias opções ao mesmo tempo
+        
+        `options` é uma lista de (caminho, dados da opção). As ações passam
+        antes pelo plano otimizado (sem aberturas repetidas, comandos
+        consecutivos unidos). Cada opção respeita as próprias dependências;
+        instalações e builds passam pelo limite global de ações pesadas do
+        runner e o progresso soma todas as opções.
+        
+        `listener(evento)` recebe status, progresso e o resultado do lote
+        (execuções pedidas pelo servidor de controle, que não abrem diálogos).
+        """
+        if force is None:
+            force = self.force_var.get()
+        plan = self.build_plan(options, force)
+        spans = [self.tracer.option_span(entry.option_path, entry.project_name) for entry in plan]
+        
+        batch_id = next(self.batch_ids)
+        self.begin_batch(batch_id, sum(len(entry.actions) for entry in plan))
+        
+        def notify(event, **fields):
+            record = dict(event=event, batch=batch_id, **fields)
+            if listener:
+                listener(record)
+            if self.control:
+                self.control.publish(record)
+        
+        def report(message):
+            self.post_status(message)
+            notify("status", message=message)
+        
+        def show(func, *args):
+            if listener is None:
+                self.post_call(func, *args)
+        
         def run_in_thread():
-            # Mostrar barra de progresso
-            self.progress.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
-            self.progress['maximum'] = len(actions)
-            self.progress['value'] = 0
-            self.status_var.set("Executando ações...")
+            def on_progress(done, total, action):
+                # Atualizar progresso com o número de ações concluídas no lote
+                self.post_progress(batch_id, done, total)
+                notify("progress", done=done, total=total)
+            
+            def run_in(entry):
+                return lambda action: self.run_action(entry.project, action, force, entry.option_path, report)
             
             try:
-                project_path = self.projects[self.current_project]["path"]
+                # Um pré-aquecimento não pode instalar nas mesmas pastas ao mesmo tempo
+                self.prewarm.cancel(wait=True)
+                # Caminhos, ferramentas, portas e campos antes de qualquer ação
+                report("Verificando o plano...")
+                check_plan(plan, self.runner.tools,
+                           [process.name for process in self.runner.processes.running()])
+                report("Executando ações...")
                 
-                for i, action in enumerate(actions):
-                    action_type = action.get("type")
-                    
-                    # Atualizar status com ação atual
-                    if action_type == "open_cursor":
-                        self.status_var.set(f"Abrindo projeto: {action.get('path', '')}")
-                        self.open_cursor(project_path, action.get("path", ""))
-                    elif action_type == "open_postman":
-                        self.status_var.set("Abrindo Postman...")
-                        self.open_postman()
-                    elif action_type == "open_dbeaver":
-                        self.status_var.set("Abrindo DBeaver...")
-                        self.open_dbeaver()
-                    elif action_type == "open_terminal":
-                        self.status_var.set(f"Abrindo terminal em: {action.get('path', '')}")
-                        self.open_terminal(project_path, action.get("path", ""))
-                    elif action_type == "run_command":
-                        self.status_var.set(f"Executando: {action.get('command', '')}")
-                        self.run_command(project_path, action.get("path", ""), action.get("command", ""))
-                    elif action_type == "run_wsl":
-                        self.status_var.set(f"Executando no WSL: {action.get('commands', '')}")
-                        self.run_wsl_command(project_path, action.get("path", ""), action.get("commands", ""))
-                    elif action_type == "wait":
-                        self.status_var.set(f"Aguardando {action.get('seconds', 1)} segundos...")
-                        time.sleep(action.get("seconds", 1))
-                    
-                    # Atualizar progresso
-                    self.progress['value'] = i + 1
-                    self.root.update_idletasks()
-                    
-                    # Pequena pausa entre ações
-                    time.sleep(0.5)
+                executors = []
+                for entry, (_, data), span in zip(plan, options, spans):
+                    executors.append(ActionExecutor(
+                        entry.actions,
+                        run_in(entry),
+                        max_workers=data.get("max_workers"),
+                        tracer=self.tracer, parent_span=span
+                    ))
+                errors = BatchExecutor(executors, on_progress).run()
                 
-                self.status_var.set("Ações executadas com sucesso!")
-                messagebox.showinfo("Sucesso", "Todas as ações foram executadas com sucesso!")
+                for span, error in zip(spans, errors):
+                    self.tracer.finish_option(span, error)
+                failures = [(path, error) for (path, _), error in zip(options, errors) if error]
+                if not failures:
+                    report("Ações executadas com sucesso!")
+                    show(messagebox.showinfo, "Sucesso", "Todas as ações foram executadas com sucesso!")
+                elif len(options) == 1:
+                    report(f"Erro: {str(failures[0][1])}")
+                    show(messagebox.showerror, "Erro", f"Erro ao executar ações: {str(failures[0][1])}")
+                else:
+                    report(f"Erro em {len(failures)} de {len(options)} opções")
+                    details = "\n".join(f"• {path}: {str(error)}" for path, error in failures)
+                    show(messagebox.showerror, "Erro", f"Erro ao executar ações:\n{details}")
+                notify("result", ok=not failures, errors={path: str(error) for path, error in failures})
                 
+            except PreflightError as e:
+                for span in spans:
+                    self.tracer.finish_option(span, e)
+                report(f"Verificação prévia falhou: {len(e.problems)} problema(s)")
+                details = "\n".join(f"• {problem}" for problem in e.problems)
+                show(messagebox.showerror, "Erro", f"Nada foi executado. Problemas encontrados:\n{details}")
+                notify("result", ok=False, problems=[str(problem) for problem in e.problems])
             except Exception as e:
-                self.status_var.set(f"Erro: {str(e)}")
-                messagebox.showerror("Erro", f"Erro ao executar ações: {str(e)}")
+                for span in spans:
+                    if not span.finished:
+                        self.tracer.finish_option(span, e)
+                report(f"Erro: {str(e)}")
+                show(messagebox.showerror, "Erro", f"Erro ao executar ações: {str(e)}")
+                notify("result", ok=False, error=str(e))
             finally:
-                # Ocultar barra de progresso
-                self.progress.grid_remove()
-                self.progress['value'] = 0
+                # Ocultar barra de progresso (se for o último lote em andamento)
+                self.post_call(self.end_batch, batch_id)
         
         # Executar em thread separada para não travar a interface
         thread = threading.Thread(target=run_in_thread)
         thread.daemon = True
         thread.start()
     
-    def open_cursor(self, project_path, sub_path=""):
-        """Abre o projeto no Cursor"""
-        full_path = os.path.join(project_path, sub_path) if sub_path else project_path
+    def build_plan(self, options, force=False):
+        """Plano de um lote; com "Forçar" os editores abertos são reabertos
         
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        Só é otimizado com "Otimizar plano" marcado.
+        """
+        opened = () if force else self.runner.opened_editors
+        return build_plan(self.projects, options, opened_editors=opened,
+                          optimize=self.optimize_var.get(), default_mode=self.settings.get("mode"))
+    
+    def attach_tmux(self):
+        """Mostra a sessão tmux de cada projeto selecionado (um terminal por sessão)"""
+        projects = [self.projects[name] for name in self.selected_projects()]
         
-        try:
-            # Tentar abrir com Cursor
-            subprocess.Popen(["cursor", full_path], shell=True)
-            self.status_var.set(f"Abrindo {full_path} no Cursor...")
-        except Exception as e:
-            # Fallback para VS Code se Cursor não estiver disponível
+        def attach_in_thread():
+            for project in projects:
+                try:
+                    self.runner.attach_tmux(project, status=self.post_status)
+                except Exception as e:
+                    self.post_status(f"Erro: {str(e)}")
+                    self.post_call(messagebox.showerror, "Erro", f"Erro ao abrir o tmux: {str(e)}")
+        
+        threading.Thread(target=attach_in_thread, daemon=True).start()
+    
+    def preview_plan(self):
+        """Mostra o plano otimizado das opções selecionadas, sem executar"""
+        selected = self.selected_options()
+        if not selected:
+            return
+        text = describe_plan(self.build_plan(selected, self.force_var.get()))
+        
+        window = tk.Toplevel(self.root)
+        window.title("Plano de execução")
+        window.geometry("640x360")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        
+        plan_text = tk.Text(window, wrap="none", height=16)
+        plan_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(window, orient="vertical", command=plan_text.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        plan_text.configure(yscrollcommand=scrollbar.set)
+        plan_text.insert("1.0", text)
+        plan_text.configure(state="disabled")
+        
+        buttons = ttk.Frame(window, padding="5")
+        buttons.grid(row=1, column=0, columnspan=2, sticky=tk.E)
+        
+        def execute():
+            window.destroy()
+            self.run_batch(selected)
+        
+        ttk.Button(buttons, text="Executar", command=execute).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Fechar", command=window.destroy).pack(side=tk.LEFT, padx=5)
+    
+    def run_action(self, project, action, force=False, option=None, status=None):
+        """Executa uma única ação"""
+        return self.runner.run(project, action, status or self.post_status, force, option)
+    
+    def on_user_input(self, event=None):
+        self.prewarm.touch()
+    
+    def submit_remote(self, options, force, listener):
+        """Execução pedida pelo servidor de controle (de outra thread)"""
+        def start():
+            # O cliente espera o "result": um erro antes da thread do lote
+            # (ex.: projeto removido por um recarregamento) também precisa dele
             try:
-                subprocess.Popen(["code", full_path], shell=True)
-                self.status_var.set(f"Abrindo {full_path} no VS Code...")
-            except:
-                raise Exception(f"Não foi possível abrir o editor. Caminho: {full_path}")
+                self.run_batch(options, force, listener)
+            except Exception as e:
+                message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                listener({"event": "result", "ok": False, "error": message})
+        
+        self.post_call(start)
     
-    def open_postman(self):
-        """Abre o Postman"""
-        self.status_var.set("Abrindo Postman...")
+    def configure_control(self):
+        """Liga, desliga ou reinicia o servidor de controle (_settings.control)"""
+        wanted = self.settings.get("control") or {}
+        wanted = wanted if wanted.get("enabled") else None
+        if wanted == self.control_settings:
+            return
+        if self.control is not None:
+            self.control.stop()
+            self.control = None
+        self.control_settings = wanted
+        if wanted is None:
+            return
         
+        server = ControlServer(lambda: self.projects, self.runner, self.submit_remote, wanted)
         try:
-            if sys.platform == "win32":
-                # Tentar diferentes formas de abrir o Postman no Windows
-                postman_paths = [
-                    r"C:\Users\%USERNAME%\AppData\Local\Postman\Postman.exe",
-                    r"C:\Program Files\Postman\Postman.exe",
-                    r"C:\Program Files (x86)\Postman\Postman.exe",
-                    "Postman.exe"  # Se estiver no PATH
-                ]
-                
-                for path in postman_paths:
-                    try:
-                        expanded_path = os.path.expandvars(path)
-                        if os.path.exists(expanded_path) or path == "Postman.exe":
-                            subprocess.Popen([expanded_path], shell=True)
-                            self.status_var.set("Postman aberto com sucesso!")
-                            return
-                    except:
-                        continue
-                
-                # Se não encontrou, tentar abrir pelo nome
-                subprocess.Popen(["start", "postman:"], shell=True)
-                self.status_var.set("Tentando abrir Postman...")
-                
-            elif sys.platform == "darwin":  # macOS
-                subprocess.Popen(["open", "-a", "Postman"])
-                self.status_var.set("Postman aberto com sucesso!")
-            else:  # Linux
-                subprocess.Popen(["postman"])
-                self.status_var.set("Postman aberto com sucesso!")
-                
-        except Exception as e:
-            raise Exception(f"Não foi possível abrir o Postman: {str(e)}")
+            address = server.start()
+        except ControlError as e:
+            self.status_var.set(f"Servidor de controle desligado: {str(e)}")
+            return
+        self.control = server
+        self.status_var.set(f"Servidor de controle em {address}")
+    
+    def post_status(self, message):
+        """Atualiza o status a partir de qualquer thread (aplicado no próximo quadro)"""
+        self.ui_events.put(("status", message))
+    
+    def post_progress(self, batch_id, done, total):
+        """Atualiza o progresso de um lote a partir de qualquer thread"""
+        self.ui_events.put(("progress", (batch_id, done, total)))
     
-    def open_dbeaver(self):
-        """Abre o DBeaver"""
-        self.status_var.set("Abrindo DBeaver...")
+    def post_call(self, func, *args):
+        """Agenda `func(*args)` na thread da interface"""
+        self.ui_events.put(("call", (func, args)))
+    
+    def drain_ui_events(self):
+        """Aplica os eventos das threads: status e progresso só com o último valor do quadro
+        
+        Chamadas agendadas (diálogos, fim de lote) rodam na ordem em que
+        chegaram, depois de aplicar o status/progresso que veio antes delas.
+        """
+        status, progress = None, {}
+        
+        def flush():
+            nonlocal status
+            if status is not None:
+                self.status_var.set(status)
+                status = None
+            if progress:
+                for batch_id, counts in progress.items():
+                    if batch_id in self.active_batches:
+                        self.active_batches[batch_id] = list(counts)
+                progress.clear()
+                self.update_progress_bar()
         
         try:
-            if sys.platform == "win32":
-                # Tentar diferentes formas de abrir o DBeaver no Windows
-                dbeaver_paths = [
-                    r"C:\Users\%USERNAME%\AppData\Local\DBeaver\dbeaver.exe",
-                    r"C:\Program Files\DBeaver\dbeaver.exe",
-                    r"C:\Program Files (x86)\DBeaver\dbeaver.exe",
-                    r"C:\Users\%USERNAME%\AppData\Roaming\DBeaverData\workspace6\General\.dbeaver\dbeaver.exe",
-                    "dbeaver.exe"  # Se estiver no PATH
-                ]
-                
-                for path in dbeaver_paths:
-                    try:
-                        expanded_path = os.path.expandvars(path)
-                        if os.path.exists(expanded_path) or path == "dbeaver.exe":
-                            subprocess.Popen([expanded_path], shell=True)
-                            self.status_var.set("DBeaver aberto com sucesso!")
-                            return
-                    except:
-                        continue
-                
-                # Se não encontrou, tentar abrir pelo nome
-                subprocess.Popen(["start", "dbeaver:"], shell=True)
-                self.status_var.set("Tentando abrir DBeaver...")
-                
-            elif sys.platform == "darwin":  # macOS
-                subprocess.Popen(["open", "-a", "DBeaver"])
-                self.status_var.set("DBeaver aberto com sucesso!")
-            else:  # Linux
-                subprocess.Popen(["dbeaver"])
-                self.status_var.set("DBeaver aberto com sucesso!")
-                
-        except Exception as e:
-            raise Exception(f"Não foi possível abrir o DBeaver: {str(e)}")
+            for _ in range(UI_MAX_EVENTS):
+                try:
+                    kind, value = self.ui_events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "status":
+                    status = value
+                elif kind == "progress":
+                    batch_id, done, total = value
+                    progress[batch_id] = (done, total)
+                else:
+                    flush()
+                    func, args = value
+                    func(*args)
+            flush()
+        finally:
+            self.root.after(UI_POLL_MS, self.drain_ui_events)
+    
+    def begin_batch(self, batch_id, total):
+        """Registra um lote e mostra a barra de progresso (thread da interface)"""
+        self.active_batches[batch_id] = [0, total]
+        self.progress.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=10)
+        self.update_progress_bar()
+    
+    def end_batch(self, batch_id):
+        """Tira o lote do progresso; a barra some quando não há mais lotes"""
+        self.active_batches.pop(batch_id, None)
+        if self.active_batches:
+            self.update_progress_bar()
+        else:
+            self.progress.grid_remove()
+            self.progress['value'] = 0
+    
+    def update_progress_bar(self):
+        """Progresso somado de todos os lotes em andamento"""
+        done = sum(done for done, _ in self.active_batches.values())
+        total = sum(total for _, total in self.active_batches.values())
+        self.progress['maximum'] = max(1, total)
+        self.progress['value'] = done
     
-    def open_terminal(self, project_path, sub_path=""):
-        """Abre um terminal no diretório do projeto"""
-        full_path = os.path.join(project_path, sub_path) if sub_path else project_path
+    def poll_services(self):
+        """Copia a saída nova dos serviços gerenciados para as abas de log"""
+        for process in self.runner.processes.all() + self.runner.sessions.all():
+            tab = self.log_tabs.get(process.name)
+            if tab is None or tab["process"] is not process:
+                tab = self.create_log_tab(process)
+            
+            lines, tab["seen"] = process.output.since(tab["seen"])
+            if lines:
+                self.append_log_lines(tab["text"], lines, process.output.lines.maxlen)
+            
+            if not process.running and not tab["announced"]:
+                tab["announced"] = True
+                code = process.returncode
+                if code is None:
+                    # Reanexado: não é filho deste launcher, o código de saída se perdeu
+                    self.logs_notebook.tab(tab["frame"], text=f"■ {process.name}")
+                    self.status_var.set(f"Serviço '{process.name}' terminou")
+                else:
+                    mark = "✓" if code == 0 else "✗"
+                    self.logs_notebook.tab(tab["frame"], text=f"{mark} {process.name}")
+                    self.status_var.set(f"Serviço '{process.name}' terminou (código {code})")
+        
+        generation, usage = self.runner.monitor.snapshot()
+        if generation != self.usage_generation:
+            self.usage_generation = generation
+            self.refresh_usage(usage)
         
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        self.root.after(LOG_POLL_MS, self.poll_services)
+    
+    def refresh_usage(self, usage):
+        """Redesenha a tabela de consumo com a última amostra do monitor"""
+        def values(item):
+            return (f"{item.cpu:.0f}%", f"{item.rss / MB:.0f} MB", item.children)
         
-        self.status_var.set(f"Abrindo terminal em: {full_path}")
+        def tags(item):
+            return ("over",) if item.over_limit else ()
         
-        # Abrir terminal no diretório
-        if sys.platform == "win32":
-            cmd = f'start cmd /k "cd /d "{full_path}""'
-        elif sys.platform == "darwin":  # macOS
-            cmd = f'osascript -e "tell application \\"Terminal\\" to do script \\"cd \\"{full_path}\\"\\""'
-        else:  # Linux
-            cmd = f'gnome-terminal -- bash -c "cd \\"{full_path}\\"; exec bash"'
+        tree = self.usage_tree
+        wanted = set()
+        for project, total in sorted(by_project(usage).items(), key=lambda pair: pair[0] or ""):
+            project_iid = f"projeto\0{project}"
+            wanted.add(project_iid)
+            if tree.exists(project_iid):
+                tree.item(project_iid, values=values(total), tags=tags(total))
+            else:
+                tree.insert("", tk.END, iid=project_iid, text=project or "(sem projeto)",
+                            values=values(total), tags=tags(total), open=True)
+        for name, item in sorted(usage.items()):
+            iid = f"servico\0{name}"
+            wanted.add(iid)
+            parent = f"projeto\0{item.project}"
+            if tree.exists(iid) and tree.parent(iid) == parent:
+                tree.item(iid, values=values(item), tags=tags(item))
+            else:
+                if tree.exists(iid):
+                    tree.delete(iid)
+                tree.insert(parent, tk.END, iid=iid, text=name, values=values(item), tags=tags(item))
         
-        subprocess.Popen(cmd, shell=True)
+        for project_iid in tree.get_children():
+            for iid in tree.get_children(project_iid):
+                if iid not in wanted:
+                    tree.delete(iid)
+            if project_iid not in wanted:
+                tree.delete(project_iid)
+    
+    def on_service_limit(self, process, message):
+        """Serviço acima do limite de CPU/memória (chamado pela thread do monitor)"""
+        self.post_status(message)
     
-    def run_command(self, project_path, sub_path, command):
-        """Executa um comando no terminal"""
-        full_path = os.path.join(project_path, sub_path) if sub_path else project_path
+    def create_log_tab(self, process):
+        """Cria (ou reaproveita) a aba de log de um serviço"""
+        if not self.log_tabs:
+            # Primeiro serviço: mostrar o painel de logs
+            self.logs_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+            self.main_frame.rowconfigure(6, weight=1)
+            self.root.geometry("")
         
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        old = self.log_tabs.get(process.name)
+        if old is not None:
+            frame, text = old["frame"], old["text"]
+            text.configure(state="normal")
+            text.delete("1.0", tk.END)
+            text.configure(state="disabled")
+        else:
+            frame = ttk.Frame(self.logs_notebook)
+            frame.columnconfigure(0, weight=1)
+            frame.rowconfigure(0, weight=1)
+            text = tk.Text(frame, height=12, wrap="none", state="disabled")
+            text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+            text.tag_configure("stderr", foreground="red")
+            scrollbar = ttk.Scrollbar(frame, orient="vertical", command=text.yview)
+            scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+            text.configure(yscrollcommand=scrollbar.set)
+            self.logs_notebook.add(frame)
         
-        self.status_var.set(f"Executando: {command} em {full_path}")
+        self.logs_notebook.tab(frame, text=f"▶ {process.name}")
+        tab = {"process": process, "frame": frame, "text": text, "seen": 0, "announced": False}
+        self.log_tabs[process.name] = tab
+        return tab
+    
+    def append_log_lines(self, text, lines, max_lines):
+        """Adiciona linhas ao log mantendo no máximo `max_lines` linhas"""
+        at_end = text.yview()[1] >= 1.0
+        text.configure(state="normal")
+        for stream, line in lines:
+            text.insert(tk.END, line + "\n", stream)
         
-        # Executar comando em nova janela do terminal
-        if sys.platform == "win32":
-            cmd = f'start cmd /k "cd /d "{full_path}" && {command}"'
-        else:
-            cmd = f'gnome-terminal -- bash -c "cd "{full_path}" && {command}; exec bash"'
+        excess = int(text.index("end-1c").split(".")[0]) - 1 - max_lines
+        if excess > 0:
+            text.delete("1.0", f"{excess + 1}.0")
+        text.configure(state="disabled")
+        if at_end:
+            text.see(tk.END)
+    
+    def stop_selected_service(self):
+        """Encerra o serviço da aba selecionada"""
+        selected = self.logs_notebook.select()
+        for tab in self.log_tabs.values():
+            if str(tab["frame"]) == selected:
+                tab["process"].stop()
+                self.status_var.set(f"Encerrando serviço '{tab['process'].name}'...")
+                return
+    
+    def stop_selected_options(self):
+        """Encerra o que as linhas selecionadas (opções, grupos ou projetos) iniciaram"""
+        targets = [iid for iid in self.options_tree.selection() if "\0" not in iid]
+        self.stop_targets([(target, None) for target in targets])
+    
+    def stop_selected_projects(self):
+        """Encerra tudo dos projetos selecionados, inclusive sessões de shell e tmux"""
+        self.stop_targets([(name, self.projects[name]) for name in self.selected_projects()])
+    
+    def stop_targets(self, targets):
+        """Encerra (opção ou projeto, dados do projeto) em segundo plano, tudo em paralelo"""
+        def stop_in_thread():
+            self.post_status("Encerrando serviços...")
+            stopped = []
+            for target, project in targets:
+                stopped.extend(self.runner.stop(target, project))
+            if stopped:
+                self.post_status(f"Encerrados: {', '.join(stopped)}")
+            else:
+                self.post_status("Nenhum serviço em execução para encerrar")
         
-        subprocess.Popen(cmd, shell=True)
+        threading.Thread(target=stop_in_thread, daemon=True).start()
+    
+    def reattach_services(self):
+        """Volta a acompanhar serviços deixados rodando por uma execução anterior"""
+        attached = self.runner.processes.reattach()
+        if attached:
+            self.runner.monitor.start()
+            self.status_var.set(f"{len(attached)} serviço(s) reanexado(s) da última execução")
     
-    def run_wsl_command(self, project_path, sub_path, wsl_commands):
-        """Executa comandos no WSL Ubuntu"""
-        full_path = os.path.join(project_path, sub_path) if sub_path else project_path
+    def on_close(self):
+        """Fecha a janela, perguntando o que fazer com os serviços em execução
         
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"Caminho não encontrado: {full_path}")
+        Serviços deixados rodando são reanexados na próxima abertura; as
+        sessões de shell sempre terminam junto com o launcher.
+        """
+        running = self.runner.processes.running()
+        if running:
+            answer = messagebox.askyesnocancel(
+                "Serviços em execução",
+                f"Encerrar os {len(running)} serviço(s) em execução antes de sair?\n\n"
+                "Sim: encerra todos\n"
+                "Não: deixa rodando (serão reanexados na próxima abertura)"
+            )
+            if answer is None:
+                return
+            if not answer:
+                running = []
         
-        # Preparar comandos para WSL
-        if isinstance(wsl_commands, list):
-            # Se for lista de comandos, juntar com && para executar sequencialmente
-            wsl_command_string = " && ".join(wsl_commands)
-        else:
-            wsl_command_string = wsl_commands
+        self.config_watcher.stop()
+        self.prewarm.cancel(wait=True)
+        if self.control is not None:
+            self.control.stop()
+        self.status_var.set("Encerrando...")
+        self.root.update_idletasks()
+        stop_trees([process.pid for process in running] +
+                   [session.pid for session in self.runner.sessions.all() if session.running])
+        self.history.close()
+        self.root.destroy()
+    
+    def open_timeline(self):
+        """Mostra a linha do tempo (Gantt) da última execução"""
+        if self.timeline is not None:
+            self.timeline.lift()
+            self.draw_timeline()
+            return
         
-        self.status_var.set(f"Executando no WSL: {wsl_command_string}")
+        self.timeline = tk.Toplevel(self.root)
+        self.timeline.title("Linha do tempo")
+        self.timeline.geometry("760x320")
+        self.timeline.protocol("WM_DELETE_WINDOW", self.close_timeline)
+        self.timeline.columnconfigure(0, weight=1)
+        self.timeline.rowconfigure(0, weight=1)
         
-        # Executar no WSL Ubuntu
-        if sys.platform == "win32":
-            # Abrir WSL Ubuntu e executar comandos
-            cmd = f'start cmd /k "cd /d "{full_path}" && wsl -d Ubuntu -e bash -c "{wsl_command_string}; exec bash""'
-        else:
-            # Para Linux, usar bash normal
-            cmd = f'gnome-terminal -- bash -c "cd "{full_path}" && {wsl_command_string}; exec bash"'
+        self.timeline_canvas = tk.Canvas(self.timeline, background="white", highlightthickness=0)
+        self.timeline_canvas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(self.timeline, orient=tk.VERTICAL,
+                                  command=self.timeline_canvas.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.timeline_canvas.configure(yscrollcommand=scrollbar.set)
+        self.timeline_canvas.bind("<Configure>", lambda event: self.draw_timeline())
+        
+        buttons = ttk.Frame(self.timeline, padding="5")
+        buttons.grid(row=1, column=0, columnspan=2, sticky=tk.E)
+        ttk.Button(buttons, text="Atualizar", command=self.draw_timeline).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Exportar trace...",
+                   command=self.export_trace).pack(side=tk.LEFT, padx=5)
+        
+        self.timeline.after(TIMELINE_POLL_MS, self.poll_timeline)
+    
+    def close_timeline(self):
+        self.timeline.destroy()
+        self.timeline = None
+    
+    def poll_timeline(self):
+        """Redesenha enquanto a última execução tiver ações em andamento"""
+        if self.timeline is None:
+            return
+        option = self.tracer.latest()
+        if option is not None and not (option.finished and all(span.finished for span in option.children)):
+            self.draw_timeline()
+        self.timeline.after(TIMELINE_POLL_MS, self.poll_timeline)
+    
+    def draw_timeline(self):
+        """Desenha uma barra por ação: fila, execução e serviço rodando"""
+        canvas = self.timeline_canvas
+        canvas.delete("all")
+        option = self.tracer.latest()
+        if option is None:
+            canvas.create_text(20, 20, anchor=tk.W, text="Nenhuma execução ainda")
+            return
+        
+        spans = list(option.children)
+        now = time.monotonic()
+        begin = option.start
+        finish = max([option.end or now] + [span.end or now for span in spans])
+        scale_total = max(finish - begin, 0.001)
+        
+        label_width, row_height, top = 240, 24, 30
+        width = max(canvas.winfo_width(), label_width + 100)
+        bar_width = width - label_width - 20
+        
+        def x(moment):
+            return label_width + (moment - begin) / scale_total * bar_width
+        
+        canvas.create_text(10, 12, anchor=tk.W, font=("Arial", 10, "bold"),
+                           text=f"{option.name} — {finish - begin:.2f}s ({option.outcome or 'executando'})")
+        
+        for row, span in enumerate(spans):
+            y = top + row * row_height
+            label = span.name if len(span.name) <= 36 else span.name[:35] + "…"
+            canvas.create_text(10, y + row_height / 2, anchor=tk.W, text=label)
+            
+            start = span.start or now
+            canvas.create_rectangle(x(span.queued), y + 8, x(start), y + row_height - 8,
+                                    fill=TIMELINE_COLORS["queued"], outline="")
+            if span.start is None:
+                continue
+            ready = span.ready or now
+            # Erro/pulo colorem a barra principal; serviços têm a barra de execução à parte
+            failed_here = span.outcome == "error" and span.end == span.ready
+            color = TIMELINE_COLORS["error" if failed_here else
+                                    "skipped" if span.outcome == "skipped" else "ok"]
+            canvas.create_rectangle(x(span.start), y + 4, max(x(ready), x(span.start) + 2),
+                                    y + row_height - 4, fill=color, outline="")
+            if span.ready is not None and (span.end or now) > span.ready:
+                tail = TIMELINE_COLORS["error"] if span.outcome == "error" else TIMELINE_COLORS["running"]
+                canvas.create_rectangle(x(span.ready), y + 8, x(span.end or now),
+                                        y + row_height - 8, fill=tail, outline="")
+        
+        canvas.configure(scrollregion=(0, 0, width, top + len(spans) * row_height + 10))
+    
+    def open_history(self):
+        """Mostra p50/p95 por opção, regressões e as ações mais lentas"""
+        if self.history_window is not None:
+            self.history_window.lift()
+            self.refresh_history()
+            return
+        
+        window = self.history_window = tk.Toplevel(self.root)
+        window.title("Histórico de execuções")
+        window.geometry("760x460")
+        window.protocol("WM_DELETE_WINDOW", self.close_history)
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        window.rowconfigure(1, weight=1)
+        
+        columns = ("p50", "p95", "last", "cache", "runs", "baseline")
+        self.history_options = ttk.Treeview(window, columns=columns, height=8)
+        self.history_options.heading("#0", text="Opção")
+        for column, title in zip(columns, ("p50", "p95", "Última", "Cache", "Execuções", "Linha de base")):
+            self.history_options.heading(column, text=title)
+            self.history_options.column(column, width=80, anchor=tk.E, stretch=False)
+        self.history_options.tag_configure("regressed", foreground="red")
+        self.history_options.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+        
+        columns = ("mean", "max", "count", "cache")
+        self.history_actions = ttk.Treeview(window, columns=columns, height=8)
+        self.history_actions.heading("#0", text="Ações mais lentas")
+        for column, title in zip(columns, ("Média", "Máximo", "Vezes", "Cache")):
+            self.history_actions.heading(column, text=title)
+            self.history_actions.column(column, width=80, anchor=tk.E, stretch=False)
+        self.history_actions.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+        
+        buttons = ttk.Frame(window, padding="5")
+        buttons.grid(row=2, column=0, sticky=tk.E)
+        ttk.Button(buttons, text="Atualizar", command=self.refresh_history).pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_history()
+    
+    def close_history(self):
+        self.history_window.destroy()
+        self.history_window = None
+    
+    def refresh_history(self):
+        """Lê o histórico em segundo plano e preenche a janela"""
+        def load_in_thread():
+            try:
+                stats, slowest = self.history.option_stats(), self.history.slowest_actions(20)
+            except Exception as e:
+                self.post_status(f"Erro ao ler o histórico: {str(e)}")
+                return
+            self.post_call(self.fill_history, stats, slowest)
+        
+        threading.Thread(target=load_in_thread, daemon=True).start()
+    
+    def fill_history(self, stats, slowest):
+        if self.history_window is None:
+            return
+        
+        def seconds(value):
+            return "-" if value is None else f"{value:.2f}s"
+        
+        def rate(value):
+            return "-" if value is None else f"{value:.0%}"
+        
+        self.history_options.delete(*self.history_options.get_children())
+        for item in stats:
+            label = f"⚠ {item.option}" if item.regressed else item.option
+            self.history_options.insert("", tk.END, text=label, tags=("regressed",) if item.regressed else (),
+                                        values=(seconds(item.p50), seconds(item.p95), seconds(item.last),
+                                                rate(item.hit_rate), item.runs, seconds(item.baseline)))
+        
+        self.history_actions.delete(*self.history_actions.get_children())
+        for action in slowest:
+            self.history_actions.insert("", tk.END, text=f"{action['option']}: {action['action']}",
+                                        values=(seconds(action["mean"]), seconds(action["max"]),
+                                                action["count"], rate(action["hit_rate"])))
+        
+        regressed = [item.option for item in stats if item.regressed]
+        if regressed:
+            self.status_var.set(f"Partida mais lenta que o normal: {', '.join(regressed)}")
+    
+    def export_trace(self):
+        """Grava os spans da sessão no formato Chrome trace-event"""
+        path = filedialog.asksaveasfilename(
+            parent=self.timeline, title="Exportar trace", defaultextension=".json",
+            filetypes=[("Trace JSON", "*.json"), ("Todos os arquivos", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            self.tracer.export(path)
+        except OSError as e:
+            messagebox.showerror("Erro", f"Não foi possível gravar o trace: {e}", parent=self.timeline)
+            return
+        self.status_var.set(f"Trace gravado em: {path}")
+    
+    def open_palette(self, event=None):
+        """Abre a paleta de busca por todas as opções executáveis (Ctrl+P)"""
+        if self.palette is not None:
+            self.palette.lift()
+            self.palette_entry.focus_set()
+            return "break"
+        
+        self.palette = tk.Toplevel(self.root)
+        self.palette.title("Buscar opção")
+        self.palette.transient(self.root)
+        self.palette.geometry("520x320")
+        self.palette.protocol("WM_DELETE_WINDOW", self.close_palette)
+        
+        self.palette_var = tk.StringVar()
+        self.palette_entry = ttk.Entry(self.palette, textvariable=self.palette_var)
+        self.palette_entry.pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.palette_list = tk.Listbox(self.palette, height=12, activestyle="none")
+        self.palette_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.palette_results = []
+        
+        self.palette_var.trace_add("write", lambda *args: self.update_palette())
+        self.palette_entry.bind("<Down>", lambda e: self.move_palette_selection(1))
+        self.palette_entry.bind("<Up>", lambda e: self.move_palette_selection(-1))
+        self.palette_entry.bind("<Return>", self.execute_palette_selection)
+        self.palette_list.bind("<Double-1>", self.execute_palette_selection)
+        self.palette.bind("<Escape>", lambda e: self.close_palette())
+        
+        self.update_palette()
+        self.palette_entry.focus_set()
+        return "break"
+    
+    def close_palette(self):
+        """Fecha a paleta de busca"""
+        if self.palette is not None:
+            self.palette.destroy()
+            self.palette = None
+    
+    def update_palette(self):
+        """Refaz a lista de resultados para o texto digitado"""
+        self.palette_results = self.option_index.search(self.palette_var.get())
+        self.palette_list.delete(0, tk.END)
+        if self.palette_results:
+            self.palette_list.insert(tk.END, *self.palette_results)
+            self.palette_list.selection_set(0)
+    
+    def move_palette_selection(self, step):
+        """Move a seleção da paleta com as setas"""
+        if not self.palette_results:
+            return "break"
+        selection = self.palette_list.curselection()
+        index = (selection[0] if selection else 0) + step
+        index = max(0, min(index, len(self.palette_results) - 1))
+        self.palette_list.selection_clear(0, tk.END)
+        self.palette_list.selection_set(index)
+        self.palette_list.see(index)
+        return "break"
+    
+    def execute_palette_selection(self, event=None):
+        """Executa a opção selecionada na paleta"""
+        selection = self.palette_list.curselection()
+        if not selection:
+            return "break"
+        
+        option_path = self.palette_results[selection[0]]
+        self.close_palette()
+        try:
+            project_name, option_data = resolve_option(self.projects, option_path)
+        except KeyError as e:
+            messagebox.showerror("Erro", str(e.args[0]))
+            return "break"
+        
+        self.status_var.set(f"Executando: {option_path}")
+        self.expand_option(option_path)
+        self.options_tree.selection_set(option_path)
+        self.run_batch([(option_path, option_data)])
+        return "break"
+    
+    def poll_config(self):
+        """Aplica a recarga do config.json pedida pelo observador"""
+        if self.config_changed.is_set():
+            self.config_changed.clear()
+            self.reload_config()
+        self.root.after(RELOAD_POLL_MS, self.poll_config)
+    
+    def reload_config(self):
+        """Recarrega o config.json mantendo a posição atual na árvore
+        
+        Se o arquivo tiver erro, mostra o erro e mantém a última configuração válida.
+        """
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            validate_config(config)
+        except Exception as e:
+            self.config_error_var.set(f"Erro no config.json (mantendo a última configuração válida): {str(e)}")
+            self.config_error_label.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+            return
+        
+        self.config_error_label.grid_remove()
+        projects, self.settings = split_config(config)
+        self.projects = projects
+        self.option_index = OptionIndex(projects)
+        self.runner.configure(self.settings)
+        self.configure_control()
+        self.prewarm.configure(self.settings.get("prewarm"))
+        if self.palette is not None:
+            self.update_palette()
+        
+        names = list(projects.keys())
+        if names != list(self.project_combo['values']):
+            self.project_combo['values'] = names
+        
+        # Itens continuam com o mesmo iid (caminho): seleção e expansão são mantidas
+        self.sync_tree()
+        if self.current_project not in projects:
+            # Projeto atual foi removido: voltar ao primeiro
+            self.project_combo.set(names[0] if names else "")
+            self.current_project = None
+            if names:
+                self.on_project_selected()
+        self.on_option_selected()
         
-        subprocess.Popen(cmd, shell=True)
+        self.status_var.set("Configuração recarregada")
     
     def open_config(self):
         """Abre o arquivo de configuração no editor padrão"""
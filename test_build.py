@@ -10,21 +10,24 @@ import sys
 def test_build():
     print("=== Teste do Build ===\n")
     
-    # Verificar se o executável foi movido para a raiz
+    # Verificar se o executável (onefile) ou a pasta (onedir) foi movido para a raiz
     import glob
+    from build_common import bundle_size, executable_name
     exe_files = glob.glob("Iniciador de Projetos - *.exe")
+    exe_files += glob.glob(os.path.join("Iniciador de Projetos - *", executable_name()))
     
     if not exe_files:
         print("✗ Executável não encontrado na raiz!")
-        print("  Procurando por: 'Iniciador de Projetos - *.exe'")
+        print("  Procurando por: 'Iniciador de Projetos - *.exe' ou pasta 'Iniciador de Projetos - *'")
         return False
     
     exe_path = exe_files[0]  # Pegar o primeiro arquivo encontrado
     print(f"✓ Executável encontrado: {exe_path}")
     
-    # Verificar tamanho do arquivo
-    file_size = os.path.getsize(exe_path)
-    print(f"✓ Tamanho do arquivo: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
+    # Verificar tamanho do pacote (arquivo único ou pasta inteira)
+    bundle = os.path.dirname(exe_path) or exe_path
+    file_size = bundle_size(bundle)
+    print(f"✓ Tamanho do pacote: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
     
     # Verificar se config.json existe na raiz
     if os.path.exists("config.json"):
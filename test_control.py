@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do servidor de controle (launcher/control.py) em socket Unix e TCP
+"""
+
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+
+import pytest
+
+from launcher import control
+from launcher.control import ControlError, ControlServer, request
+
+PROJECTS = {"Projeto": {"path": ".", "options": {
+    "Subir": {"type": "execute", "actions": []},
+    "Grupo": {"type": "options", "options": {"Testes": {"type": "execute", "actions": []}}},
+}}}
+
+
+class StubList:
+    def __init__(self):
+        self.exit_listeners = []
+    
+    def all(self):
+        return []
+
+
+class StubMonitor:
+    def snapshot(self):
+        return None, {}
+
+
+class StubRunner:
+    def __init__(self):
+        self.processes = StubList()
+        self.sessions = StubList()
+        self.monitor = StubMonitor()
+
+
+def submit_ok(options, force, listener):
+    """Execução falsa: status, progresso e resultado vindos de outra thread"""
+    def run():
+        listener({"event": "status", "batch": 1, "message": "Executando ações..."})
+        listener({"event": "progress", "batch": 1, "done": 1, "total": 1})
+        listener({"event": "result", "batch": 1, "ok": True, "errors": {}})
+    threading.Thread(target=run).start()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # Caminho curto: socket Unix tem limite de ~100 caracteres
+    folder = tempfile.mkdtemp(prefix="ctl-")
+    monkeypatch.setenv("XDG_CACHE_HOME", folder)
+    yield folder
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+def start(settings, submit=submit_ok):
+    server = ControlServer(lambda: PROJECTS, StubRunner(), submit, settings)
+    server.start()
+    return server
+
+
+def address(server, **extra):
+    return dict(server.address, **{"token": server.token, **extra})
+
+
+def ask(server, message, **extra):
+    return list(request(message, address=address(server, **extra), timeout=5))
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def server(request, cache):
+    if request.param == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            pytest.skip("sem socket Unix")
+        settings = {"socket": os.path.join(cache, "c.sock"), "token": "segredo"}
+    else:
+        settings = {"port": 0}
+    server = start(settings)
+    yield server
+    server.stop()
+
+
+def test_token_errado_ou_ausente_e_recusado(server):
+    for token in ("errado", None):
+        [reply] = ask(server, {"cmd": "list"}, token=token)
+        assert reply == {"ok": False, "error": "Token inválido", "final": True}
+
+
+def test_tcp_gera_token_sozinho(cache):
+    server = start({"port": 0})
+    try:
+        assert server.address["host"] == "127.0.0.1"
+        assert server.address["port"] != 0
+        assert server.token
+    finally:
+        server.stop()
+
+
+def test_socket_unix_so_do_dono(cache):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("sem socket Unix")
+    path = os.path.join(cache, "c.sock")
+    server = start({"socket": path})
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert server.token is None
+        [reply] = ask(server, {"cmd": "list"})
+        assert reply["ok"]
+    finally:
+        server.stop()
+    assert not os.path.exists(path)
+
+
+def test_list_e_status(server):
+    [reply] = ask(server, {"id": 7, "cmd": "list"})
+    assert reply == {"id": 7, "ok": True, "options": ["Projeto/Subir", "Projeto/Grupo/Testes"],
+                     "final": True}
+    [reply] = ask(server, {"cmd": "status"})
+    assert reply == {"ok": True, "services": [], "final": True}
+
+
+def test_run_transmite_eventos_ate_o_resultado(server):
+    replies = ask(server, {"id": 1, "cmd": "run", "options": ["Projeto/Subir"]})
+    assert [reply.get("event") for reply in replies] == ["accepted", "status", "progress", "result"]
+    assert all(reply["id"] == 1 for reply in replies)
+    assert replies[-1]["ok"] and replies[-1]["final"]
+    assert not any(reply.get("final") for reply in replies[:-1])
+
+
+def test_run_sem_esperar_termina_no_aceite(server):
+    [reply] = ask(server, {"cmd": "run", "options": "Projeto/Subir", "wait": False})
+    assert reply["event"] == "accepted" and reply["final"]
+
+
+def test_run_de_opcao_invalida_responde_erro(server):
+    [reply] = ask(server, {"cmd": "run", "options": ["Projeto/Grupo"]})
+    assert reply["ok"] is False and "não é uma opção executável" in reply["error"]
+    [reply] = ask(server, {"cmd": "run", "options": ["Outro/Subir"]})
+    assert reply["ok"] is False and reply["final"]
+
+
+def test_comando_desconhecido_e_json_invalido(server):
+    [reply] = ask(server, {"cmd": "apagar"})
+    assert reply["ok"] is False and "Comando desconhecido" in reply["error"]
+    
+    if "socket" in server.address:
+        raw = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        raw.connect(server.address["socket"])
+    else:
+        raw = socket.create_connection((server.address["host"], server.address["port"]))
+    with raw, raw.makefile("r", encoding="utf-8") as replies:
+        raw.sendall(b"[1, 2]\n")
+        assert '"ok": false' in replies.readline()
+
+
+def test_cliente_desiste_sem_resposta(cache):
+    server = start({"port": 0}, submit=lambda options, force, listener: None)
+    try:
+        with pytest.raises(ControlError, match="não respondeu"):
+            list(request({"cmd": "run", "options": ["Projeto/Subir"]}, address=address(server), timeout=0.5))
+    finally:
+        server.stop()
+
+
+def test_run_demorado_manda_sinal_de_vida(cache, monkeypatch):
+    monkeypatch.setattr(control, "HEARTBEAT_INTERVAL", 0.1)
+    
+    def submit_slow(options, force, listener):
+        timer = threading.Timer(0.35, listener, [{"event": "result", "batch": 1, "ok": True, "errors": {}}])
+        timer.start()
+    
+    server = start({"port": 0}, submit=submit_slow)
+    try:
+        replies = list(request({"cmd": "run", "options": ["Projeto/Subir"]}, address=address(server), timeout=0.3))
+    finally:
+        server.stop()
+    events = [reply.get("event") for reply in replies]
+    assert events[0] == "accepted" and events[-1] == "result"
+    assert "heartbeat" in events
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da ordenação e da execução em grafo das ações (launcher/executor.py)
+"""
+
+import threading
+import time
+
+import pytest
+
+from launcher.executor import ActionExecutor, build_action_graph
+
+
+def test_sem_depends_on_vira_cadeia_na_ordem_do_config():
+    order, deps = build_action_graph([{"type": "a"}, {"type": "b"}, {"type": "c"}])
+    assert order == ["#1", "#2", "#3"]
+    assert deps == {"#1": [], "#2": ["#1"], "#3": ["#2"]}
+
+
+def test_ordem_topologica_estavel():
+    actions = [
+        {"id": "testes", "depends_on": ["build", "banco"]},
+        {"id": "build", "depends_on": "deps"},
+        {"id": "deps"},
+        {"id": "banco"},
+    ]
+    order, deps = build_action_graph(actions)
+    # Entre ações liberadas juntas vale a ordem da lista
+    assert order == ["deps", "banco", "build", "testes"]
+    assert deps["testes"] == ["build", "banco"]
+    assert deps["build"] == ["deps"]
+
+
+def test_com_depends_on_acoes_sem_dependencia_ficam_livres():
+    order, deps = build_action_graph([{"type": "a"}, {"type": "b", "depends_on": []}])
+    assert deps == {"#1": [], "#2": []}
+    assert order == ["#1", "#2"]
+
+
+def test_ciclo_e_detectado():
+    actions = [
+        {"id": "a", "depends_on": ["c"]},
+        {"id": "b", "depends_on": ["a"]},
+        {"id": "c", "depends_on": ["b"]},
+        {"id": "livre"},
+    ]
+    with pytest.raises(ValueError, match="circular") as error:
+        build_action_graph(actions)
+    assert "a, b, c" in str(error.value)
+    assert "livre" not in str(error.value)
+
+
+def test_dependencia_de_si_mesma_e_ciclo():
+    with pytest.raises(ValueError, match="circular"):
+        build_action_graph([{"id": "a", "depends_on": "a"}])
+
+
+def test_dependencia_inexistente_e_id_duplicado():
+    with pytest.raises(ValueError, match="inexistente"):
+        build_action_graph([{"id": "a", "depends_on": ["b"]}])
+    with pytest.raises(ValueError, match="duplicado"):
+        build_action_graph([{"id": "a"}, {"id": "a"}])
+
+
+def test_executor_so_inicia_acao_depois_das_dependencias():
+    actions = [
+        {"id": "lento", "depends_on": [], "seconds": 0.2},
+        {"id": "rapido", "depends_on": [], "seconds": 0},
+        {"id": "final", "depends_on": ["lento", "rapido"], "seconds": 0},
+    ]
+    finished = []
+    lock = threading.Lock()
+    
+    def run_action(action):
+        time.sleep(action["seconds"])
+        with lock:
+            finished.append(action["id"])
+    
+    executor = ActionExecutor(actions, run_action, max_workers=4)
+    assert executor.run() == 3
+    # As duas primeiras rodam em paralelo: a rápida termina antes da lenta
+    assert finished == ["rapido", "lento", "final"]
+
+
+def test_executor_para_no_primeiro_erro():
+    started = []
+    
+    def run_action(action):
+        started.append(action["type"])
+        if action["type"] == "falha":
+            raise RuntimeError("falhou")
+    
+    executor = ActionExecutor([{"type": "ok"}, {"type": "falha"}, {"type": "depois"}], run_action)
+    with pytest.raises(RuntimeError):
+        executor.run()
+    assert started == ["ok", "falha"]
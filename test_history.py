@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Testes dos percentis e das estatísticas do histórico (launcher/history.py)
+"""
+
+from launcher.history import BASELINE_RUNS, RunHistory, median, percentile
+
+
+def test_percentil_por_posicao_mais_proxima():
+    values = list(range(1, 21))  # 1..20
+    assert percentile(values, 50) == 10
+    assert percentile(values, 95) == 19
+    assert percentile(values, 100) == 20
+    assert percentile(values, 0) == 1
+
+
+def test_percentil_devolve_um_valor_da_lista():
+    values = [0.1, 0.2, 0.3, 0.4]
+    assert percentile(values, 50) == 0.2
+    assert percentile(values, 95) == 0.4
+    assert percentile([0.7], 50) == percentile([0.7], 95) == 0.7
+
+
+def test_percentil_de_lista_vazia():
+    assert percentile([], 50) is None
+
+
+def test_mediana_ordena_antes():
+    assert median([3, 1, 2]) == 2
+    assert median([4, 1, 3, 2]) == 2
+
+
+def run(option, duration, outcome="ok"):
+    return {"option": option, "project": "Projeto", "started": 0.0, "duration": duration,
+            "outcome": outcome, "error": None, "actions": []}
+
+
+def test_option_stats_e_regressao(tmp_path):
+    history = RunHistory(path=str(tmp_path / "history.sqlite3"))
+    connection = history._connect()
+    try:
+        for _ in range(BASELINE_RUNS):
+            history._insert(connection, run("Projeto/Subir", 1.0))
+        history._insert(connection, run("Projeto/Subir", 9.0, outcome="error"))
+        for _ in range(3):
+            history._insert(connection, run("Projeto/Subir", 3.0))
+    finally:
+        connection.close()
+    
+    [stats] = history.option_stats("Projeto")
+    assert stats.failures == 1
+    assert stats.runs == BASELINE_RUNS + 3
+    assert stats.p50 == 1.0
+    assert stats.p95 == 3.0
+    assert stats.last == 3.0
+    assert stats.recent == 3.0
+    assert stats.baseline == 1.0
+    assert stats.regressed
+
+
+def test_prefixo_com_curingas_do_like_e_literal(tmp_path):
+    history = RunHistory(path=str(tmp_path / "history.sqlite3"))
+    connection = history._connect()
+    try:
+        for option in ("api_v1/Subir", "apiXv1/Subir", "api_v1", "api_v10/Subir", "100%/Subir"):
+            history._insert(connection, run(option, 1.0))
+    finally:
+        connection.close()
+    
+    assert sorted(item.option for item in history.option_stats("api_v1")) == ["api_v1", "api_v1/Subir"]
+    assert [item.option for item in history.option_stats("1%")] == []
+    assert [item.option for item in history.option_stats("100%")] == ["100%/Subir"]
+    assert len(history.option_stats()) == 5
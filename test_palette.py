@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Testes da busca aproximada da paleta (launcher/palette.py)
+"""
+
+from launcher.palette import OptionIndex, fuzzy_score
+
+
+def execute():
+    return {"type": "execute", "actions": []}
+
+
+PROJECTS = {
+    "Super": {"path": ".", "options": {
+        "Frontend": execute(),
+        "Backend": execute(),
+        "Serviços": {"type": "options", "options": {"Fila": execute(), "Front Admin": execute()}},
+    }},
+    "Loja": {"path": ".", "options": {"Frontend": execute()}},
+}
+
+
+def test_caracteres_precisam_aparecer_em_ordem():
+    assert fuzzy_score("sfr", "super/frontend") is not None
+    assert fuzzy_score("rfs", "super/frontend") is None
+    assert fuzzy_score("x", "super/frontend") is None
+
+
+def test_espaco_casa_com_qualquer_separador():
+    assert fuzzy_score("super front", "super/frontend") is not None
+    assert fuzzy_score("serv fila", "super/serviços/fila") is not None
+    assert fuzzy_score("superfront", "super/frontend") is not None
+    assert fuzzy_score("front end", "super/frontend") is None
+
+
+def test_sequencia_continua_e_inicio_de_palavra_valem_mais():
+    assert fuzzy_score("front", "super/frontend") > fuzzy_score("front", "super/xfxrxoxnxt")
+    assert fuzzy_score("fe", "super/frontend-e") < fuzzy_score("fe", "super/fe")
+
+
+def test_casamento_no_ultimo_nivel_e_texto_curto_ganham():
+    assert fuzzy_score("fila", "super/serviços/fila") > fuzzy_score("fila", "fila/serviços/outro")
+    assert fuzzy_score("front", "loja/frontend") > fuzzy_score("front", "super/serviços/front admin")
+
+
+def test_busca_vazia_lista_na_ordem_do_config():
+    index = OptionIndex(PROJECTS)
+    assert len(index) == 5
+    assert index.search("") == [path for path, _ in index.entries]
+    assert index.search("  ", limit=2) == [path for path, _ in index.entries[:2]]
+
+
+def test_busca_ordena_pela_pontuacao_e_respeita_o_limite():
+    index = OptionIndex(PROJECTS)
+    assert index.search("loja front")[0] == "Loja/Frontend"
+    assert index.search("front", limit=1) == ["Loja/Frontend"]
+
+
+def test_mais_uma_letra_so_procura_entre_os_candidatos_anteriores():
+    index = OptionIndex(PROJECTS)
+    everything = set(index.search("f"))
+    index.search("fr")
+    narrowed = set(index._last_candidates)
+    assert all(index.entries[i][0] in everything for i in narrowed)
+    
+    # Estreitar dá o mesmo resultado que buscar do zero
+    assert index.search("fro") == OptionIndex(PROJECTS).search("fro")
+    assert set(index._last_candidates) <= narrowed
+
+
+def test_busca_que_nao_estende_a_anterior_recomeca_do_zero():
+    index = OptionIndex(PROJECTS)
+    assert index.search("fila") == ["Super/Serviços/Fila"]
+    # "back" não começa com "fila": precisa olhar todas as opções de novo
+    assert index.search("back") == ["Super/Backend"]
+    assert index.search("b") == ["Super/Backend"]
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Testes das otimizações do plano (launcher/plan.py)
+"""
+
+import os
+
+from launcher.plan import build_plan, drop_duplicate_opens, merge_commands
+
+PROJECT = {"path": os.path.abspath("projeto")}
+
+
+def command(text, **extra):
+    return dict({"type": "run_command", "command": text, "mode": "terminal"}, **extra)
+
+
+def test_comandos_sem_merge_continuam_separados():
+    actions = [command("npm run dev"), command("npm test")]
+    notes = []
+    assert merge_commands(PROJECT, actions, notes) == actions
+    assert notes == []
+
+
+def test_comandos_com_merge_sao_unidos():
+    notes = []
+    merged = merge_commands(PROJECT, [command("npm ci", merge=True), command("npm test", merge=True),
+                                      command("npm run dev")], notes)
+    assert [action["command"] for action in merged] == ["npm ci && npm test", "npm run dev"]
+    assert len(notes) == 1
+
+
+def test_merge_precisa_dos_dois_lados_e_mesmo_caminho():
+    assert len(merge_commands(PROJECT, [command("a", merge=True), command("b")], [])) == 2
+    assert len(merge_commands(PROJECT, [command("a", merge=True),
+                                        command("b", merge=True, path="api")], [])) == 2
+
+
+def test_merge_de_run_wsl_junta_as_listas():
+    actions = [
+        {"type": "run_wsl", "commands": ["a", "b"], "mode": "terminal", "merge": True},
+        {"type": "run_wsl", "commands": "c", "mode": "terminal", "merge": True},
+    ]
+    assert merge_commands(PROJECT, actions, [])[0]["commands"] == ["a", "b", "c"]
+
+
+def test_nada_e_unido_em_gerenciado_com_depends_on_ou_chaves_extras():
+    managed = [command("a", merge=True, mode="managed"), command("b", merge=True, mode="managed")]
+    assert len(merge_commands(PROJECT, managed, [])) == 2
+    explicit = [command("a", merge=True), command("b", merge=True, depends_on=[])]
+    assert len(merge_commands(PROJECT, explicit, [])) == 2
+    cached = [command("a", merge=True), command("b", merge=True, cache_inputs=["package-lock.json"])]
+    assert len(merge_commands(PROJECT, cached, [])) == 2
+
+
+def test_aberturas_repetidas_saem_do_lote():
+    seen, notes = set(), []
+    first = drop_duplicate_opens(PROJECT, [{"type": "open_cursor", "path": "front"}], seen, (), notes)
+    second = drop_duplicate_opens(PROJECT, [{"type": "open_cursor", "path": "front/"},
+                                            {"type": "open_postman"}], seen, (), notes)
+    assert len(first) == 1
+    assert second == [{"type": "open_postman"}]
+    assert len(notes) == 1
+
+
+def test_editor_ja_aberto_na_sessao_e_removido():
+    opened = {os.path.normpath(os.path.join(PROJECT["path"], "front"))}
+    kept = drop_duplicate_opens(PROJECT, [{"type": "open_cursor", "path": "front"}], set(), opened, [])
+    assert kept == []
+
+
+def test_dependentes_de_abertura_removida_herdam_as_dependencias():
+    seen = {("open_postman",)}
+    actions = [
+        {"id": "deps", "type": "run_command", "command": "npm ci"},
+        {"id": "postman", "type": "open_postman", "depends_on": ["deps"]},
+        {"id": "testes", "type": "run_command", "command": "npm test", "depends_on": ["postman"]},
+    ]
+    kept = drop_duplicate_opens(PROJECT, actions, seen, (), [])
+    assert [action["id"] for action in kept] == ["deps", "testes"]
+    assert kept[1]["depends_on"] == ["deps"]
+
+
+def test_build_plan_sem_otimizar_mantem_as_acoes():
+    projects = {"Projeto": PROJECT}
+    option = {"actions": [{"type": "open_postman"}, {"type": "open_postman"}]}
+    entries = build_plan(projects, [("Projeto/A", option)], optimize=False)
+    assert len(entries[0].actions) == 2
+    entries = build_plan(projects, [("Projeto/A", option)])
+    assert len(entries[0].actions) == 1
+    assert entries[0].original_count == 2
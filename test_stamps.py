@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Testes do cache de carimbos (launcher/stamps.py)
+"""
+
+import os
+import time
+
+from launcher.stamps import MTIME_TOLERANCE, StampCache
+
+ACTION = {"type": "run_command", "command": "npm ci",
+          "cache_inputs": ["package-lock.json"], "cache_outputs": ["node_modules"]}
+
+
+def write(path, content=""):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def installed(tmp_path, action=ACTION):
+    """Projeto com a instalação já feita e carimbada"""
+    project = tmp_path / "projeto"
+    (project / "node_modules").mkdir(parents=True)
+    write(project / "package-lock.json", '{"v": 1}')
+    cache = StampCache(root=str(tmp_path / "stamps"))
+    marker = cache.prepare(str(project), str(project), action)
+    cache.mark(marker)
+    return cache, str(project)
+
+
+def test_sem_carimbo_nao_esta_fresco(tmp_path):
+    project = tmp_path / "projeto"
+    project.mkdir()
+    write(project / "package-lock.json")
+    assert not StampCache(root=str(tmp_path / "stamps")).is_fresh(str(project), str(project), ACTION)
+
+
+def test_carimbo_vale_enquanto_nada_muda(tmp_path):
+    cache, project = installed(tmp_path)
+    assert cache.is_fresh(project, project, ACTION)
+
+
+def test_mudar_entrada_ou_comando_invalida(tmp_path):
+    cache, project = installed(tmp_path)
+    assert not cache.is_fresh(project, project, dict(ACTION, command="npm install"))
+    write(os.path.join(project, "package-lock.json"), '{"v": 2}')
+    assert not cache.is_fresh(project, project, ACTION)
+
+
+def test_saida_apagada_ou_alterada_depois_invalida(tmp_path):
+    cache, project = installed(tmp_path)
+    outputs = os.path.join(project, "node_modules")
+    later = time.time() + MTIME_TOLERANCE + 5
+    os.utime(outputs, (later, later))
+    assert not cache.is_fresh(project, project, ACTION)
+    os.rmdir(outputs)
+    assert not cache.is_fresh(project, project, ACTION)
+
+
+def test_acao_sem_cache_inputs_nunca_esta_fresca(tmp_path):
+    cache, project = installed(tmp_path)
+    action = {"type": "run_command", "command": "npm ci"}
+    assert not cache.is_fresh(project, project, action)
+
+
+def test_prepare_remove_carimbos_antigos_da_acao(tmp_path):
+    cache, project = installed(tmp_path)
+    old = cache.marker(project, project, ACTION)
+    write(os.path.join(project, "package-lock.json"), '{"v": 2}')
+    new = cache.prepare(project, project, ACTION)
+    assert new != old
+    assert not os.path.exists(old)
+    # O novo só vale depois que o comando terminar com sucesso
+    assert not cache.is_fresh(project, project, ACTION)
+    cache.mark(new)
+    assert cache.is_fresh(project, project, ACTION)